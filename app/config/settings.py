@@ -40,14 +40,18 @@ class Settings(BaseSettings):
     port: int = Field(default=8001, env="PORT")
     reload: bool = Field(default=False)
     workers: int = Field(default=4)
+    threadpool_size: int = Field(default=40)  # Hilos para endpoints síncronos (def)
 
     # ==================== DATABASE ====================
     database_url: str = Field(..., env="DATABASE_URL")
     db_pool_size: int = Field(default=10)
     db_max_overflow: int = Field(default=20)
-    db_pool_timeout: int = Field(default=30)
+    db_pool_timeout: int = Field(default=10)
     db_pool_recycle: int = Field(default=1800)
+    db_pool_pre_ping: bool = Field(default=True)
+    db_pool_use_lifo: bool = Field(default=True)
     db_echo_sql: bool = Field(default=False)
+    db_query_cache_size: int = Field(default=1200)
 
     # ==================== SECURITY ====================
     secret_key: str = Field(..., env="SECRET_KEY")
@@ -137,6 +141,7 @@ class Settings(BaseSettings):
     cache_enabled: bool = Field(default=False)
     cache_backend: str = Field(default="memory")
     cache_default_ttl: int = Field(default=300)
+    cache_redis_url: str = Field(default="redis://localhost:6379/0")  # CACHE_REDIS_URL en .env
 
     # ==================== ENVIRONMENT ====================
     environment: str = Field(default="development", env="ENVIRONMENT")
@@ -182,13 +187,17 @@ class Settings(BaseSettings):
             ("server", "port"): "port",
             ("server", "reload"): "reload",
             ("server", "workers"): "workers",
+            ("server", "threadpool_size"): "threadpool_size",
 
             # Database
             ("database", "pool_size"): "db_pool_size",
             ("database", "max_overflow"): "db_max_overflow",
             ("database", "pool_timeout"): "db_pool_timeout",
             ("database", "pool_recycle"): "db_pool_recycle",
+            ("database", "pool_pre_ping"): "db_pool_pre_ping",
+            ("database", "pool_use_lifo"): "db_pool_use_lifo",
             ("database", "echo_sql"): "db_echo_sql",
+            ("database", "query_cache_size"): "db_query_cache_size",
 
             # Security
             ("security", "algorithm"): "algorithm",
@@ -273,7 +282,9 @@ class Settings(BaseSettings):
         }
 
         for toml_path, setting_name in mappings.items():
-            if setting_name not in kwargs:  # Solo si no viene de .env
+            # Solo si no viene como argumento ni como variable de entorno
+            # (ej. DB_POOL_SIZE), para respetar la precedencia .env > toml
+            if setting_name not in kwargs and setting_name.upper() not in os.environ:
                 value = toml_data
                 try:
                     for key in toml_path:
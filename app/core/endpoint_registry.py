@@ -10,11 +10,20 @@ Funciones principales:
 3. get_endpoint_metadata() - Metadata opcional para UI
 """
 
-from typing import List, Dict, Optional
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, FrozenSet
+from weakref import WeakKeyDictionary
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
 
 
+# Cache de endpoints descubiertos por instancia de FastAPI.
+# Valor: (número de rutas al momento de descubrir, endpoints, set de paths)
+# Se invalida automáticamente si cambia len(app.routes).
+_cache: "WeakKeyDictionary[FastAPI, Tuple[int, List[Dict], FrozenSet[str]]]" = WeakKeyDictionary()
+
+
 def discover_endpoints_from_app(app: FastAPI) -> List[Dict]:
     """
     Auto-descubre todos los endpoints registrados en FastAPI.
@@ -43,7 +52,16 @@ def discover_endpoints_from_app(app: FastAPI) -> List[Dict]:
         # - /api/v1/employees
         # - /api/v1/individuals/with-user
         # - /api/v1/employees/{id}/upload-photo
+
+    Nota:
+        El resultado se cachea por instancia de app y se recalcula solo
+        si cambia el número de rutas registradas. Se retorna una copia:
+        el llamador puede modificarla sin alterar el cache.
     """
+    cached = _cache.get(app)
+    if cached is not None and cached[0] == len(app.routes):
+        return _copy_endpoints(cached[1])
+
     endpoints = []
     seen = set()  # Evitar duplicados
 
@@ -51,26 +69,54 @@ def discover_endpoints_from_app(app: FastAPI) -> List[Dict]:
         if isinstance(route, APIRoute):
             # Filtrar solo rutas API (excluir /docs, /openapi.json, /health)
             if route.path.startswith("/api/"):
+                methods = sorted(route.methods)  # GET, POST, etc.
+
                 # Crear clave única para evitar duplicados
-                key = (route.path, tuple(sorted(route.methods)))
+                key = (route.path, tuple(methods))
 
                 if key not in seen:
                     seen.add(key)
 
                     endpoints.append({
                         "endpoint": route.path,
-                        "methods": sorted(list(route.methods)),  # GET, POST, etc.
+                        "methods": methods,
                         "name": route.name,
-                        "tags": list(route.tags) if route.tags else [],
-                        "description": route.summary if hasattr(route, 'summary') else None
+                        "tags": route.tags or (),
+                        "description": route.summary  # APIRoute siempre define summary
                     })
 
     # Ordenar por endpoint para UI consistente
     endpoints.sort(key=lambda x: x["endpoint"])
 
-    return endpoints
+    _cache[app] = (
+        len(app.routes),
+        endpoints,
+        frozenset(ep["endpoint"] for ep in endpoints)
+    )
 
+    return _copy_endpoints(endpoints)
+
+
+def _copy_endpoints(endpoints: List[Dict]) -> List[Dict]:
+    """Copia la lista cacheada (cada dict y su lista de métodos)."""
+    return [{**ep, "methods": list(ep["methods"])} for ep in endpoints]
+
+
+def _endpoint_set(app: FastAPI) -> FrozenSet[str]:
+    """
+    Retorna el set de paths de endpoints descubiertos (cacheado).
 
+    Args:
+        app: Instancia de FastAPI
+
+    Returns:
+        frozenset con las rutas de todos los endpoints /api/
+    """
+    discover_endpoints_from_app(app)
+    return _cache[app][2]
+
+
+@lru_cache(maxsize=4096)
 def normalize_endpoint(path: str) -> str:
     """
     Normaliza endpoint para validación híbrida.
@@ -92,20 +138,26 @@ def normalize_endpoint(path: str) -> str:
     Uso en validación híbrida:
         1. Buscar permiso ESPECÍFICO: /api/v1/individuals/with-user
         2. Si no existe, buscar BASE: /api/v1/individuals
+
+    Nota:
+        Se invoca en cada request desde PermissionMiddleware, por lo que
+        el resultado se memoiza (LRU acotado a 4096 paths distintos).
     """
     # Remover trailing slash
     path = path.rstrip('/')
 
-    # Dividir por /
-    parts = path.split("/")
+    # Ubicar el 4to '/' (después de /api/v1/entity) sin crear listas
+    index = -1
+    for _ in range(4):
+        index = path.find('/', index + 1)
+        if index < 0:
+            return path
 
     # Retornar primeros 4 segmentos: /api/v1/entity
-    if len(parts) >= 4:
-        return "/".join(parts[:4])
-
-    return path
+    return path[:index]
 
 
+@lru_cache(maxsize=4096)
 def is_normalized_endpoint(path: str) -> bool:
     """
     Verifica si un endpoint ya está normalizado (es ruta base).
@@ -122,10 +174,48 @@ def is_normalized_endpoint(path: str) -> bool:
         /api/v1/individuals/with-user → False (ruta específica)
     """
     path = path.rstrip('/')
-    parts = path.split("/")
 
-    # Ruta base tiene exactamente 4 segmentos: /api/v1/entity
-    return len(parts) == 4
+    # Ruta base tiene exactamente 4 segmentos (3 separadores): /api/v1/entity
+    return path.count('/') == 3
+
+
+# Metadata opcional para UI (agregar según necesidad).
+# Definida a nivel de módulo para no reconstruirla en cada llamada.
+_ENDPOINT_METADATA: Dict[str, Dict] = {
+    "/api/v1/employees": {
+        "display_name": "Gestión de Empleados",
+        "description": "CRUD completo de empleados",
+        "icon": "👥",
+        "category": "Recursos Humanos"
+    },
+    "/api/v1/business-groups": {
+        "display_name": "Grupos Empresariales",
+        "description": "Gestión de grupos empresariales",
+        "icon": "🏢",
+        "category": "Organización"
+    },
+    "/api/v1/user-scopes": {
+        "display_name": "Scopes de Usuario",
+        "description": "Ámbitos de acceso organizacional",
+        "icon": "🗺️",
+        "category": "Permisos"
+    },
+    "/api/v1/individuals": {
+        "display_name": "Individuales",
+        "description": "Gestión de personas individuales",
+        "icon": "👤",
+        "category": "Recursos Humanos"
+    },
+    "/api/v1/individuals/with-user": {
+        "display_name": "Crear Individual con Usuario",
+        "description": "Crea Individual + User en una transacción",
+        "icon": "👤➕",
+        "category": "Recursos Humanos",
+        "is_special": True
+    }
+}
+
+_DEFAULT_METADATA_ICON = "📌"
 
 
 def get_endpoint_metadata(endpoint_path: str) -> Dict:
@@ -150,49 +240,28 @@ def get_endpoint_metadata(endpoint_path: str) -> Dict:
     Uso:
         metadata = get_endpoint_metadata("/api/v1/employees")
         # App móvil usa metadata["icon"] para mostrar icono
-    """
-    # Metadata opcional (agregar según necesidad)
-    ENDPOINT_METADATA = {
-        "/api/v1/employees": {
-            "display_name": "Gestión de Empleados",
-            "description": "CRUD completo de empleados",
-            "icon": "👥",
-            "category": "Recursos Humanos"
-        },
-        "/api/v1/business-groups": {
-            "display_name": "Grupos Empresariales",
-            "description": "Gestión de grupos empresariales",
-            "icon": "🏢",
-            "category": "Organización"
-        },
-        "/api/v1/user-scopes": {
-            "display_name": "Scopes de Usuario",
-            "description": "Ámbitos de acceso organizacional",
-            "icon": "🗺️",
-            "category": "Permisos"
-        },
-        "/api/v1/individuals": {
-            "display_name": "Individuales",
-            "description": "Gestión de personas individuales",
-            "icon": "👤",
-            "category": "Recursos Humanos"
-        },
-        "/api/v1/individuals/with-user": {
-            "display_name": "Crear Individual con Usuario",
-            "description": "Crea Individual + User en una transacción",
-            "icon": "👤➕",
-            "category": "Recursos Humanos",
-            "is_special": True
-        }
-    }
 
+    Nota:
+        Retorna una copia: el llamador puede modificarla sin alterar la
+        tabla de metadata ni los defaults cacheados.
+    """
     # Retornar metadata si existe, sino defaults
-    return ENDPOINT_METADATA.get(endpoint_path, {
+    return dict(_ENDPOINT_METADATA.get(endpoint_path) or _default_metadata(endpoint_path))
+
+
+@lru_cache(maxsize=1024)
+def _default_metadata(endpoint_path: str) -> Dict:
+    """
+    Construye (una sola vez por path) la metadata por defecto de un endpoint.
+
+    El dict cacheado es compartido: solo get_endpoint_metadata lo lee, y retorna una copia.
+    """
+    return {
         "display_name": endpoint_path.split("/")[-1].replace("-", " ").title(),
         "description": "Endpoint estándar",
-        "icon": "📌",
+        "icon": _DEFAULT_METADATA_ICON,
         "category": "General"
-    })
+    }
 
 
 def group_endpoints_by_entity(endpoints: List[Dict]) -> Dict[str, List[Dict]]:
@@ -224,20 +293,17 @@ def group_endpoints_by_entity(endpoints: List[Dict]) -> Dict[str, List[Dict]]:
             for ep in entity_endpoints:
                 render_checkboxes(ep)
     """
-    grouped = {}
+    grouped = defaultdict(list)
 
     for endpoint in endpoints:
         # Extraer entidad de la ruta: /api/v1/employees → employees
-        parts = endpoint["endpoint"].split("/")
+        # (maxsplit=4: no hace falta partir el resto de la ruta)
+        parts = endpoint["endpoint"].split("/", 4)
         if len(parts) >= 4:
             entity = parts[3]  # employees, individuals, business-groups, etc.
-
-            if entity not in grouped:
-                grouped[entity] = []
-
             grouped[entity].append(endpoint)
 
-    return grouped
+    return dict(grouped)
 
 
 def filter_special_endpoints(endpoints: List[Dict]) -> tuple[List[Dict], List[Dict]]:
@@ -11,8 +11,8 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from database import get_db, User
-from auth import verify_token
+from database import SessionLocal, User
+from auth import decode_access_token
 from app.core.permissions import has_permission
 from app.core.endpoint_registry import normalize_endpoint
 
@@ -28,24 +28,11 @@ class PermissionMiddleware(BaseHTTPMiddleware):
     4. Si no tiene permiso → 403 Forbidden
     5. Si tiene permiso → Continuar con el request
 
-    Endpoints excluidos (no requieren validación de permisos):
-    - /token (login)
-    - /docs, /redoc, /openapi.json (documentación)
-    - /health (health check)
-    - Endpoints públicos específicos
+    Solo las rutas /api/* se validan. Las públicas (/token, /docs, /redoc,
+    /openapi.json, /health, estáticos) están fuera de /api/ y se omiten de
+    inmediato, sin leer headers ni abrir sesión de BD.
     """
 
-    def __init__(self, app):
-        super().__init__(app)
-        # Endpoints que NO requieren validación de permisos
-        self.excluded_paths = [
-            "/token",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/health"
-        ]
-
     async def dispatch(self, request: Request, call_next):
         """
         Intercepta cada request y valida permisos antes de continuar.
@@ -57,74 +44,62 @@ class PermissionMiddleware(BaseHTTPMiddleware):
         Returns:
             Response del endpoint o error 403
         """
-        # 1. Verificar si el endpoint está excluido
-        if self._is_excluded_path(request.url.path):
-            # No validar permisos, continuar
+        path = request.url.path
+
+        # 1. Solo endpoints /api/* tienen permisos granulares
+        if not path.startswith("/api/"):
             return await call_next(request)
 
         # 2. Extraer token del header Authorization
         authorization = request.headers.get("Authorization")
-        if not authorization or not authorization.startswith("Bearer "):
+        if not authorization or authorization[:7] != "Bearer ":
             # No hay token, dejar que FastAPI maneje con get_current_user
             return await call_next(request)
 
-        token = authorization.replace("Bearer ", "")
+        token = authorization[7:]
 
-        # 3. Verificar token y obtener user_id
-        payload = verify_token(token)
-        if not payload:
+        # 3. Verificar token y obtener user_id (verificación cacheada hasta su exp)
+        user_id = decode_access_token(token)
+        if user_id is None:
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Token inválido o expirado"}
             )
 
-        user_id = payload.get("user_id")
-        if not user_id:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Token no contiene user_id"}
-            )
-
-        # 4. Obtener sesión de BD
-        db: Session = next(get_db())
+        # 4. Abrir sesión de BD directamente (sin el generador de get_db)
+        db: Session = SessionLocal()
 
         try:
             # 5. Validar permiso granular
-            endpoint = normalize_endpoint(request.url.path)
+            endpoint = normalize_endpoint(path)
             method = request.method
 
+            # Cache con alcance de request (reutilizable por dependencias del endpoint)
+            request.state.permission_cache = {}
+
             # Validación híbrida: específico → base route
-            if not has_permission(db, user_id, endpoint, method):
-                return JSONResponse(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    content={
-                        "detail": f"No tienes permiso para {method} {endpoint}",
-                        "endpoint": endpoint,
-                        "method": method
-                    }
-                )
-
-            # 6. Permiso válido, continuar con el request
-            response = await call_next(request)
-            return response
+            allowed = has_permission(
+                db, user_id, endpoint, method,
+                cache=request.state.permission_cache
+            )
 
         finally:
+            # Liberar la conexión antes de ejecutar el endpoint
             db.close()
 
-    def _is_excluded_path(self, path: str) -> bool:
-        """
-        Verifica si el path está en la lista de exclusiones.
-
-        Args:
-            path: Path del request
+        if not allowed:
+            return JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={
+                    "detail": f"No tienes permiso para {method} {endpoint}",
+                    "endpoint": endpoint,
+                    "method": method
+                }
+            )
 
-        Returns:
-            True si está excluido, False si requiere validación
-        """
-        for excluded in self.excluded_paths:
-            if path.startswith(excluded):
-                return True
-        return False
+        # 6. Permiso válido, continuar con el request
+        response = await call_next(request)
+        return response
 
 
 # ==================== USO DEL MIDDLEWARE ====================
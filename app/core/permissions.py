@@ -9,12 +9,17 @@ placeholders ya que la entidad Employee no existe aún. Se implementarán
 completamente cuando se cree la entidad Employee.
 """
 
-from typing import Optional, List
+import logging
+import time
+from collections import defaultdict
+from typing import Optional, List, Dict, Tuple
 from sqlalchemy.orm import Session
 
 from app.entities.user_scopes.models.user_scope import UserScope
 from app.entities.user_scopes.schemas.enums import ScopeTypeEnum
 
+logger = logging.getLogger(__name__)
+
 
 def get_user_scopes(db: Session, user_id: int, active_only: bool = True) -> List[UserScope]:
     """
@@ -112,8 +117,8 @@ def get_accessible_business_group_ids(db: Session, user_id: int) -> Optional[Lis
     if user_has_global_access(db, user_id):
         return None
 
-    # Obtener scopes de BusinessGroup
-    scopes = db.query(UserScope).filter(
+    # Obtener solo la columna business_group_id (sin materializar UserScope)
+    rows = db.query(UserScope.business_group_id).filter(
         UserScope.user_id == user_id,
         UserScope.scope_type == ScopeTypeEnum.BUSINESS_GROUP,
         UserScope.business_group_id.isnot(None),
@@ -121,7 +126,7 @@ def get_accessible_business_group_ids(db: Session, user_id: int) -> Optional[Lis
         UserScope.is_deleted == False
     ).all()
 
-    return [scope.business_group_id for scope in scopes if scope.business_group_id]
+    return [row[0] for row in rows]
 
 
 # ==================== PLACEHOLDERS PARA EMPLOYEE ====================
@@ -250,11 +255,15 @@ def has_permission(
     db: Session,
     user_id: int,
     endpoint: str,
-    method: str
+    method: str,
+    cache: Optional[dict] = None
 ) -> bool:
     """
     Valida si un usuario tiene permiso para un endpoint y método HTTP.
 
+    Los Admin con acceso global (ver user_has_global_access) siempre
+    tienen permiso.
+
     **Validación Híbrida** (búsqueda en orden):
     1. Busca permiso ESPECÍFICO: /api/v1/individuals/with-user
     2. Si no existe, busca permiso BASE: /api/v1/individuals
@@ -264,6 +273,9 @@ def has_permission(
         user_id: ID del usuario
         endpoint: Ruta del endpoint (/api/v1/employees)
         method: Método HTTP (GET, POST, PUT, DELETE, PATCH)
+        cache: Diccionario opcional con alcance de request
+            (request.state.permission_cache). Evita repetir la consulta
+            cuando el mismo (user_id, endpoint, method) se valida varias veces.
 
     Returns:
         True si tiene permiso, False si no
@@ -273,27 +285,107 @@ def has_permission(
         if has_permission(db, 2, "/api/v1/individuals/with-user", "POST"):
             # ✅ Permitir
     """
-    from app.entities.user_permissions.repositories.user_permission_repository import UserPermissionRepository
+    if cache is None:
+        return _resolve_permission(db, user_id, endpoint, method)
+
+    key = (user_id, endpoint, method)
+    if key not in cache:
+        cache[key] = _resolve_permission(db, user_id, endpoint, method)
+    return cache[key]
+
+
+def _resolve_permission(
+    db: Session,
+    user_id: int,
+    endpoint: str,
+    method: str
+) -> bool:
+    """Aplica la validación híbrida (específico → base) sobre el mapa cacheado."""
     from app.core.endpoint_registry import normalize_endpoint
 
-    repo = UserPermissionRepository(db)
+    is_global_admin, permissions = _get_user_permission_map(db, user_id)
+
+    # 0. Admin con acceso global: permitido sin revisar permisos
+    if is_global_admin:
+        return True
 
     # 1. Buscar permiso ESPECÍFICO primero
-    specific_permission = repo.get_permission(user_id, endpoint, method)
-    if specific_permission:
-        return specific_permission.allowed
+    allowed = permissions.get((endpoint, method))
+    if allowed is not None:
+        return allowed
 
     # 2. Si no hay específico, buscar permiso BASE
     normalized_endpoint = normalize_endpoint(endpoint)
     if normalized_endpoint != endpoint:  # Solo si es diferente
-        base_permission = repo.get_permission(user_id, normalized_endpoint, method)
-        if base_permission:
-            return base_permission.allowed
+        allowed = permissions.get((normalized_endpoint, method))
+        if allowed is not None:
+            return allowed
 
     # 3. Si no existe ningún permiso, denegar por defecto
     return False
 
 
+# ==================== CACHE DE PERMISOS POR USUARIO ====================
+# Los permisos cambian poco (solo operaciones de Admin), así que se cachea
+# el mapa completo de cada usuario por proceso con un TTL corto.
+# Cada proceso/worker mantiene su propia copia; el TTL acota el desfase
+# máximo entre workers tras una actualización.
+
+PERMISSION_CACHE_TTL_SECONDS = 60
+
+# user_id → (timestamp de carga, es admin global, {(endpoint, method): allowed})
+_perm_cache: Dict[int, Tuple[float, bool, Dict[Tuple[str, str], bool]]] = {}
+
+
+def _get_user_permission_map(
+    db: Session,
+    user_id: int
+) -> Tuple[bool, Dict[Tuple[str, str], bool]]:
+    """
+    Retorna (es admin global, mapa {(endpoint, method): allowed}) de un usuario.
+
+    Se carga una sola vez (en el miss) y se reutiliza durante
+    PERMISSION_CACHE_TTL_SECONDS: un hit no consulta la BD. Para un Admin
+    global no se cargan sus permisos, porque no se consultan.
+
+    Los cambios de rol, is_active/is_deleted del usuario y de sus UserScopes
+    llaman a invalidate_user_permissions, así que se reflejan de inmediato
+    en el proceso que los hace (en los demás workers, al expirar el TTL).
+    """
+    from app.entities.user_permissions.repositories.user_permission_repository import UserPermissionRepository
+
+    now = time.monotonic()
+    cached = _perm_cache.get(user_id)
+    if cached is not None and now - cached[0] < PERMISSION_CACHE_TTL_SECONDS:
+        return cached[1], cached[2]
+
+    is_global_admin = user_has_global_access(db, user_id)
+    if is_global_admin:
+        permissions = {}
+    else:
+        repo = UserPermissionRepository(db)
+        permissions = {
+            (endpoint, method): allowed
+            for endpoint, method, allowed in repo.get_permission_rows(user_id, active_only=True)
+        }
+    _perm_cache[user_id] = (now, is_global_admin, permissions)
+    return is_global_admin, permissions
+
+
+def invalidate_user_permissions(user_id: int) -> None:
+    """
+    Descarta del cache los permisos de un usuario.
+
+    Llamar después de crear, actualizar o eliminar permisos del usuario, y
+    al cambiar su rol, is_active/is_deleted o sus UserScopes (el flag de
+    Admin global se cachea junto con los permisos).
+
+    Args:
+        user_id: ID del usuario
+    """
+    _perm_cache.pop(user_id, None)
+
+
 def get_user_permissions_json(db: Session, user_id: int) -> dict:
     """
     Genera JSON completo de permisos de un usuario para app móvil.
@@ -327,30 +419,43 @@ def get_user_permissions_json(db: Session, user_id: int) -> dict:
         json_perms = get_user_permissions_json(db, 2)
         # App móvil usa este JSON para construir UI de checkboxes
     """
+    from sqlalchemy import and_
     from database import User
-    from app.entities.user_permissions.repositories.user_permission_repository import UserPermissionRepository
-
-    # Obtener usuario
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    from app.entities.user_permissions.models.user_permission import UserPermission
+
+    # Usuario + permisos activos en una sola consulta (LEFT JOIN: el usuario
+    # aparece aunque no tenga permisos)
+    rows = db.query(
+        User.id,
+        User.name,
+        User.role,
+        UserPermission.endpoint,
+        UserPermission.method,
+        UserPermission.allowed
+    ).outerjoin(
+        UserPermission,
+        and_(
+            UserPermission.user_id == User.id,
+            UserPermission.is_active == True,
+            UserPermission.is_deleted == False
+        )
+    ).filter(User.id == user_id).all()
+
+    if not rows:
         return {"user_id": user_id, "error": "Usuario no encontrado"}
 
-    # Obtener permisos
-    repo = UserPermissionRepository(db)
-    permissions = repo.get_by_user_id(user_id, active_only=True)
-
     # Construir estructura agrupada por endpoint
-    permissions_dict = {}
-    for perm in permissions:
-        if perm.endpoint not in permissions_dict:
-            permissions_dict[perm.endpoint] = {}
-        permissions_dict[perm.endpoint][perm.method] = perm.allowed
+    permissions_dict = defaultdict(dict)
+    for _, _, _, endpoint, method, allowed in rows:
+        if endpoint is not None:
+            permissions_dict[endpoint][method] = allowed
 
+    user_id, user_name, role = rows[0][:3]
     return {
-        "user_id": user.id,
-        "user_name": user.name,
-        "role": user.role,
-        "permissions": permissions_dict
+        "user_id": user_id,
+        "user_name": user_name,
+        "role": role,
+        "permissions": dict(permissions_dict)
     }
 
 
@@ -363,9 +468,9 @@ def bulk_update_permissions(
     """
     Actualización masiva de permisos desde app móvil.
 
-    Proceso:
-    1. Elimina (soft delete) todos los permisos existentes del usuario
-    2. Crea nuevos permisos según el JSON recibido
+    Proceso (una sola transacción):
+    1. Marca como eliminados los permisos existentes del usuario
+    2. Upsert (INSERT ... ON CONFLICT) de los permisos del JSON recibido
 
     Args:
         db: Sesión de base de datos
@@ -389,33 +494,25 @@ def bulk_update_permissions(
     """
     from app.entities.user_permissions.repositories.user_permission_repository import UserPermissionRepository
 
-    try:
-        repo = UserPermissionRepository(db)
-
-        # 1. Limpiar permisos existentes (soft delete)
-        repo.bulk_delete_by_user(user_id, deleted_by=updated_by)
-
-        # 2. Crear nuevos permisos
-        permissions_to_create = []
-        for endpoint, methods in permissions.items():
-            for method, allowed in methods.items():
-                permissions_to_create.append({
-                    "user_id": user_id,
-                    "endpoint": endpoint,
-                    "method": method,
-                    "allowed": allowed
-                })
-
-        if permissions_to_create:
-            repo.bulk_create(permissions_to_create, created_by=updated_by)
+    repo = UserPermissionRepository(db)
 
-        return True
+    permissions_to_upsert = [
+        {"endpoint": endpoint, "method": method, "allowed": allowed}
+        for endpoint, methods in permissions.items()
+        for method, allowed in methods.items()
+    ]
 
-    except Exception as e:
+    try:
+        # Soft delete + upsert en una sola transacción
+        repo.bulk_replace_by_user(user_id, permissions_to_upsert, updated_by=updated_by)
+    except Exception:
         db.rollback()
-        print(f"Error en bulk_update_permissions: {str(e)}")
+        logger.exception("bulk_update_permissions falló para user_id=%s", user_id)
         return False
 
+    invalidate_user_permissions(user_id)
+    return True
+
 
 def validate_endpoint_exists(app, endpoint: str) -> bool:
     """
@@ -434,9 +531,6 @@ def validate_endpoint_exists(app, endpoint: str) -> bool:
         if not validate_endpoint_exists(app, "/api/v1/fake-endpoint"):
             raise ValueError("Endpoint no existe")
     """
-    from app.core.endpoint_registry import discover_endpoints_from_app
-
-    endpoints = discover_endpoints_from_app(app)
-    existing_endpoints = [ep["endpoint"] for ep in endpoints]
+    from app.core.endpoint_registry import _endpoint_set
 
-    return endpoint in existing_endpoints
+    return endpoint in _endpoint_set(app)
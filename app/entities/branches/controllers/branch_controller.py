@@ -3,21 +3,33 @@ Controller: Branch
 
 Manejo de requests y responses para Branch.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List
 from sqlalchemy.orm import Session
 
 from app.entities.branches.services.branch_service import BranchService
 from app.entities.branches.models.branch import Branch
-from app.shared.exceptions import (
-    EntityNotFoundError,
-    EntityAlreadyExistsError,
-    EntityValidationError,
-    BusinessRuleError
-)
+from app.entities.branches.schemas.branch_schemas import BRANCH_LIST_ADAPTER, BRANCH_RESPONSE_ADAPTER
+from app.shared.cache import cache
+
+
+# Prefijo de claves de cache de listados de Branch (se invalida en cada escritura)
+CACHE_PREFIX = "branches:"
+CACHE_TTL_SECONDS = 60
+
+
+def _serialize(branches) -> list:
+    """Convierte Branches (ORM o mappings) a dicts JSON-serializables."""
+    validated = BRANCH_LIST_ADAPTER.validate_python(branches, from_attributes=True)
+    return BRANCH_LIST_ADAPTER.dump_python(validated, mode="json")
 
 
 class BranchController:
-    """Controller para Branch."""
+    """
+    Controller para Branch.
+
+    Las excepciones del service (EntityNotFoundError, BusinessRuleError, etc.)
+    se propagan sin envolver; el router las traduce a códigos HTTP.
+    """
 
     def __init__(self, db: Session):
         """Inicializa el controller con el servicio."""
@@ -29,21 +41,23 @@ class BranchController:
         current_user_id: Optional[int] = None
     ) -> Branch:
         """Crea una nueva Branch."""
-        try:
-            return self.service.create_branch(data, created_by=current_user_id)
-        except (EntityValidationError, EntityAlreadyExistsError, EntityNotFoundError, BusinessRuleError) as e:
-            raise e
-        except Exception as e:
-            raise Exception(f"Error al crear branch: {str(e)}")
+        branch = self.service.create_branch(data, created_by=current_user_id)
+        cache.delete_prefix(CACHE_PREFIX)
+        return branch
+
+    def bulk_create_branches(
+        self,
+        rows: List[Dict[str, Any]],
+        current_user_id: Optional[int] = None
+    ) -> list:
+        """Crea varias Branches en una sola operación."""
+        created = self.service.bulk_create_branches(rows, created_by=current_user_id)
+        cache.delete_prefix(CACHE_PREFIX)
+        return _serialize(created)
 
     def get_branch(self, branch_id: int) -> Branch:
         """Obtiene una Branch por ID."""
-        try:
-            return self.service.get_branch_by_id(branch_id)
-        except EntityNotFoundError as e:
-            raise e
-        except Exception as e:
-            raise Exception(f"Error al obtener branch: {str(e)}")
+        return self.service.get_branch_by_id(branch_id)
 
     def get_all_branches(
         self,
@@ -52,10 +66,14 @@ class BranchController:
         active_only: bool = True
     ):
         """Obtiene todas las Branches."""
-        try:
-            return self.service.get_all_branches(skip, limit, active_only)
-        except Exception as e:
-            raise Exception(f"Error al listar branches: {str(e)}")
+        key = f"{CACHE_PREFIX}all:{skip}:{limit}:{active_only}"
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = _serialize(self.service.get_all_branches(skip, limit, active_only))
+        cache.set(key, result, ttl=CACHE_TTL_SECONDS)
+        return result
 
     def update_branch(
         self,
@@ -64,12 +82,9 @@ class BranchController:
         current_user_id: Optional[int] = None
     ) -> Branch:
         """Actualiza una Branch."""
-        try:
-            return self.service.update_branch(branch_id, data, updated_by=current_user_id)
-        except (EntityValidationError, EntityAlreadyExistsError, EntityNotFoundError, BusinessRuleError) as e:
-            raise e
-        except Exception as e:
-            raise Exception(f"Error al actualizar branch: {str(e)}")
+        branch = self.service.update_branch(branch_id, data, updated_by=current_user_id)
+        cache.delete_prefix(CACHE_PREFIX)
+        return branch
 
     def delete_branch(
         self,
@@ -77,26 +92,54 @@ class BranchController:
         current_user_id: Optional[int] = None
     ) -> bool:
         """Elimina una Branch (soft delete)."""
-        try:
-            return self.service.delete_branch(branch_id, deleted_by=current_user_id)
-        except (EntityNotFoundError, BusinessRuleError) as e:
-            raise e
-        except Exception as e:
-            raise Exception(f"Error al eliminar branch: {str(e)}")
-
-    def search_branches(self, name: str, limit: int = 50):
+        deleted = self.service.delete_branch(branch_id, deleted_by=current_user_id)
+        cache.delete_prefix(CACHE_PREFIX)
+        return deleted
+
+    def search_branches(self, name: str, limit: int = 50, skip: int = 0):
         """Busca Branches por nombre."""
-        try:
-            return self.service.search_branches(name, limit)
-        except Exception as e:
-            raise Exception(f"Error al buscar branches: {str(e)}")
-
-    def get_branches_by_company(self, company_id: int, active_only: bool = True):
-        """Obtiene Branches por Company."""
-        try:
-            return self.service.get_branches_by_company(company_id, active_only)
-        except Exception as e:
-            raise Exception(f"Error al obtener branches por company: {str(e)}")
+        return _serialize(self.service.search_branches(name, limit, skip))
+
+    def get_branches_by_company(
+        self,
+        company_id: int,
+        active_only: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ):
+        """Obtiene Branches por Company (paginado)."""
+        key = f"{CACHE_PREFIX}company:{company_id}:{active_only}:{skip}:{limit}:{after_id}"
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = _serialize(self.service.get_branches_by_company(
+            company_id, active_only, skip, limit, after_id
+        ))
+        cache.set(key, result, ttl=CACHE_TTL_SECONDS)
+        return result
+
+    def stream_branches_by_company(
+        self,
+        company_id: int,
+        active_only: bool = True
+    ) -> Iterator[bytes]:
+        """
+        Genera el arreglo JSON de Branches de una Company por fragmentos.
+
+        Cada Branch se serializa al recibirse del cursor, así la respuesta
+        comienza a enviarse sin esperar a cargar todas las filas.
+        """
+        rows = self.service.iter_branches_by_company(company_id, active_only)
+
+        yield b"["
+        separator = b""
+        for row in rows:
+            yield separator
+            yield BRANCH_RESPONSE_ADAPTER.dump_json(BRANCH_RESPONSE_ADAPTER.validate_python(row))
+            separator = b","
+        yield b"]"
 
     def paginate_branches(
         self,
@@ -105,7 +148,12 @@ class BranchController:
         filters: Optional[Dict[str, Any]] = None
     ):
         """Obtiene Branches paginadas."""
-        try:
-            return self.service.paginate_branches(page, per_page)
-        except Exception as e:
-            raise Exception(f"Error al paginar branches: {str(e)}")
+        key = f"{CACHE_PREFIX}page:{page}:{per_page}"
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self.service.paginate_branches(page, per_page)
+        result["items"] = _serialize(result["items"])
+        cache.set(key, result, ttl=CACHE_TTL_SECONDS)
+        return result
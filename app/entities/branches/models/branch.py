@@ -4,11 +4,11 @@ Model: Branch
 Sucursales/oficinas de empresas.
 Depende de Company, Country y State.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy import Column, Computed, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
-from database import Base
+from database import Base, utc_now
 
 
 class Branch(Base):
@@ -34,11 +34,21 @@ class Branch(Base):
     email = Column(String(100), nullable=True)
     description = Column(Text, nullable=True)
 
+    # Full-text search (columna generada por Postgres, no se escribe desde la app).
+    # deferred: no se carga al hidratar Branch, solo se usa en filtros
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(code, '') || ' ' || coalesce(city, ''))",
+            persisted=True
+        )
+    ))
+
     # Audit Fields
     is_active = Column(Boolean, default=True, nullable=False, index=True)
     is_deleted = Column(Boolean, default=False, nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=utc_now, nullable=False)
+    updated_at = Column(DateTime, server_default=utc_now, onupdate=utc_now, nullable=False)
     deleted_at = Column(DateTime, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     updated_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
@@ -51,9 +61,20 @@ class Branch(Base):
     departments = relationship("Department", back_populates="branch", foreign_keys="Department.branch_id")
     employees = relationship("Employee", back_populates="branch", foreign_keys="Employee.branch_id")
 
-    # Unique Constraint: code debe ser único por empresa
     __table_args__ = (
+        # Unique Constraint: code debe ser único por empresa
         UniqueConstraint('company_id', 'code', name='uq_company_branch_code'),
+        # Índices parciales para listados de sucursales activas (ordenados por id)
+        Index(
+            'idx_branches_active_company', 'company_id', 'id',
+            postgresql_where=text('is_active = true AND is_deleted = false')
+        ),
+        Index(
+            'idx_branches_active_country', 'country_id', 'id',
+            postgresql_where=text('is_active = true AND is_deleted = false')
+        ),
+        # Índice GIN para búsqueda full-text (BranchRepository.search)
+        Index('idx_branches_fts', 'search_vector', postgresql_using='gin'),
     )
 
     def __repr__(self):
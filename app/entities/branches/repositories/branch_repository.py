@@ -3,11 +3,41 @@ Repository: Branch
 
 Operaciones de base de datos para Branch.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+from sqlalchemy import (
+    Integer, String, exists, func, insert, inspect, lambda_stmt, literal, literal_column, null, or_, select, tuple_, union_all, update
+)
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session, identity_key
 
+from database import utc_now
 from app.shared.base_repository import BaseRepository
+from app.shared.unit_of_work import commit
 from app.entities.branches.models.branch import Branch
+from app.entities.companies.models.company import Company
+from app.entities.departments.models.department import Department
+from app.entities.employees.models.employee import Employee
+from app.entities.countries.models.country import Country
+from app.entities.states.models.state import State
+
+
+# Columnas generadas por Postgres: no se insertan ni se proyectan
+_GENERATED_COLUMNS = frozenset({"search_vector"})
+
+# Columnas proyectadas en lecturas sin hidratar Branch
+_BRANCH_SELECT_COLUMNS = tuple(
+    c for c in Branch.__table__.columns if c.name not in _GENERATED_COLUMNS
+)
+
+# Texto buscable por trigramas. Debe ser idéntico a la expresión del índice
+# ix_branches_trgm (migrations/add_branches_search_trgm_index.sql) para que
+# Postgres lo use
+_SEARCH_TEXT = literal_column(
+    "(coalesce(name, '') || ' ' || coalesce(code, '') || ' ' || coalesce(city, ''))"
+)
+
+# Nombres de columnas de branches (para filtrar datos de INSERT)
+_BRANCH_COLUMNS = frozenset(c.name for c in _BRANCH_SELECT_COLUMNS)
 
 
 class BranchRepository(BaseRepository[Branch]):
@@ -16,57 +46,341 @@ class BranchRepository(BaseRepository[Branch]):
     def __init__(self, db: Session):
         super().__init__(Branch, db)
 
-    def get_by_company(self, company_id: int, active_only: bool = True) -> List[Branch]:
-        """Obtiene todas las sucursales de una empresa."""
+    # ==================== LECTURAS DE SOLO LECTURA (PROYECCIÓN) ====================
+    # Para listados que solo se serializan a BranchResponse: seleccionan columnas
+    # y retornan mappings, sin crear objetos ORM ni registrarlos en la sesión.
+
+    def list_rows(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = True
+    ) -> List[RowMapping]:
+        """Lista sucursales como mappings columna → valor (sin hidratar Branch)."""
+        stmt = select(*_BRANCH_SELECT_COLUMNS)
+
+        if active_only:
+            stmt = stmt.where(Branch.is_active == True)
+
+        stmt = stmt.order_by(Branch.id).offset(skip).limit(limit)
+        return self.db.execute(stmt).mappings().all()
+
+    def create_returning(self, data: Dict[str, Any]) -> Branch:
+        """
+        Crea una sucursal con INSERT ... RETURNING en un solo round-trip.
+
+        A diferencia de BaseRepository.create, no hace refresh (SELECT) después
+        del commit: la fila completa (incluyendo id y defaults del servidor)
+        regresa en el mismo INSERT.
+
+        Args:
+            data: Datos de la sucursal (se ignoran claves que no son columnas)
+
+        Returns:
+            Branch creada (desasociada de la sesión, con todos sus atributos cargados)
+        """
+        values = {k: v for k, v in data.items() if k in _BRANCH_COLUMNS}
+        branch = self.db.execute(
+            insert(Branch).values(**values).returning(Branch)
+        ).scalar_one()
+
+        # Sacar de la sesión antes del commit para que no se expiren sus atributos
+        # (de lo contrario el primer acceso dispararía otro SELECT)
+        self.db.expunge(branch)
+        commit(self.db)
+        return branch
+
+    def create_many_returning(self, rows: List[Dict[str, Any]]) -> List[RowMapping]:
+        """
+        Crea varias sucursales con un solo INSERT ... RETURNING.
+
+        SQLAlchemy agrupa las filas con "insertmanyvalues" (INSERT ... VALUES
+        (...), (...) por lotes) en lugar de un INSERT por fila.
+
+        Args:
+            rows: Datos de cada sucursal (se ignoran claves que no son columnas)
+
+        Returns:
+            Sucursales creadas como mappings de columnas, en el orden de rows
+        """
+        values = [{k: v for k, v in row.items() if k in _BRANCH_COLUMNS} for row in rows]
+        created = self.db.execute(
+            insert(Branch).returning(*_BRANCH_SELECT_COLUMNS, sort_by_parameter_order=True),
+            values
+        ).mappings().all()
+        commit(self.db)
+        return created
+
+    def soft_delete_returning(self, branch_id: int, deleted_by: Optional[int] = None) -> Optional[int]:
+        """
+        Soft delete con UPDATE ... RETURNING en un solo round-trip (sin SELECT previo).
+
+        Solo afecta sucursales no eliminadas; updated_at lo asigna onupdate.
+
+        Args:
+            branch_id: ID de la sucursal
+            deleted_by: ID del usuario que elimina
+
+        Returns:
+            ID de la sucursal eliminada, o None si no existe o ya estaba eliminada
+        """
+        deleted_id = self.db.execute(
+            update(Branch)
+            .where(Branch.id == branch_id, Branch.is_deleted == False)
+            .values(is_active=False, is_deleted=True, deleted_by=deleted_by, deleted_at=utc_now)
+            .returning(Branch.id)
+        ).scalar_one_or_none()
+        commit(self.db)
+        return deleted_id
+
+    def get_by_company(
+        self,
+        company_id: int,
+        active_only: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Branch]:
+        """
+        Obtiene las sucursales de una empresa (paginado en SQL).
+
+        Si se indica after_id se usa paginación keyset (id > after_id)
+        en lugar de OFFSET.
+        """
         query = self.db.query(Branch).filter(Branch.company_id == company_id)
 
         if active_only:
             query = query.filter(Branch.is_active == True, Branch.is_deleted == False)
 
-        return query.all()
+        return self._page(query, skip, limit, after_id)
 
-    def get_by_country(self, country_id: int, active_only: bool = True) -> List[Branch]:
-        """Obtiene todas las sucursales de un país."""
+    def get_by_country(
+        self,
+        country_id: int,
+        active_only: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Branch]:
+        """Obtiene las sucursales de un país (paginado en SQL)."""
         query = self.db.query(Branch).filter(Branch.country_id == country_id)
 
         if active_only:
             query = query.filter(Branch.is_active == True, Branch.is_deleted == False)
 
-        return query.all()
+        return self._page(query, skip, limit, after_id)
+
+    def iter_by_company(
+        self,
+        company_id: int,
+        active_only: bool = True,
+        batch_size: int = 500
+    ) -> Iterator[RowMapping]:
+        """
+        Itera las sucursales de una empresa sin cargarlas todas en memoria.
+
+        Usa yield_per (cursor del lado del servidor): las filas llegan en
+        bloques de batch_size a medida que se consumen.
+
+        Returns:
+            Iterador de mappings columna → valor, ordenado por id
+        """
+        stmt = select(*_BRANCH_SELECT_COLUMNS).where(Branch.company_id == company_id)
+
+        if active_only:
+            stmt = stmt.where(Branch.is_active == True, Branch.is_deleted == False)
+
+        stmt = stmt.order_by(Branch.id).execution_options(yield_per=batch_size)
+        return self.db.execute(stmt).mappings()
+
+    @staticmethod
+    def _page(query, skip: int, limit: int, after_id: Optional[int]) -> List[Branch]:
+        """Aplica orden estable por id y LIMIT con OFFSET o keyset (after_id)."""
+        if after_id is not None:
+            query = query.filter(Branch.id > after_id)
+        else:
+            query = query.offset(skip)
+
+        return query.order_by(Branch.id).limit(limit).all()
 
     def get_by_code(self, company_id: int, code: str) -> Optional[Branch]:
         """
         Obtiene una sucursal por código dentro de una empresa.
         Usado para validar unicidad de código por empresa.
+
+        lambda_stmt: la construcción y el cache key del SELECT se calculan una
+        sola vez; company_id y code viajan como parámetros.
         """
-        return self.db.query(Branch).filter(
+        stmt = lambda_stmt(lambda: select(Branch).where(
             Branch.company_id == company_id,
             Branch.code == code,
             Branch.is_deleted == False
-        ).first()
+        ))
+        return self.db.execute(stmt).scalars().first()
 
-    def has_active_departments(self, branch_id: int) -> bool:
+    def existing_codes(self, pairs: Iterable[Tuple[int, str]]) -> Set[Tuple[int, str]]:
         """
-        Verifica si la sucursal tiene departamentos activos.
-        TODO: Implementar cuando se cree la entidad Department.
+        Retorna cuáles de los pares (company_id, code) ya existen.
+
+        Una sola consulta ((company_id, code) IN (...)) para validar lotes de sucursales.
         """
-        # Placeholder - implementar cuando exista Department
-        return False
+        pairs = list(pairs)
+        if not pairs:
+            return set()
 
-    def has_active_employees(self, branch_id: int) -> bool:
+        rows = self.db.query(Branch.company_id, Branch.code).filter(
+            tuple_(Branch.company_id, Branch.code).in_(pairs),
+            Branch.is_deleted == False
+        ).all()
+        return {(row[0], row[1]) for row in rows}
+
+    def get_reference_rows(
+        self,
+        company_id: Optional[int] = None,
+        country_id: Optional[int] = None,
+        state_id: Optional[int] = None
+    ) -> Dict[str, Mapping[str, Any]]:
         """
-        Verifica si la sucursal tiene empleados activos.
-        TODO: Implementar cuando se cree la entidad Employee.
+        Obtiene Company, Country y State referenciados por una sucursal en un solo round-trip.
+
+        Ver get_reference_map.
+
+        Returns:
+            Diccionario entity ("Company" | "Country" | "State") → fila.
+            Las entidades que no existen no aparecen en el diccionario.
+        """
+        refs = self.get_reference_map(
+            company_ids=() if company_id is None else (company_id,),
+            country_ids=() if country_id is None else (country_id,),
+            state_ids=() if state_id is None else (state_id,)
+        )
+        return {entity: row for (entity, _), row in refs.items()}
+
+    def get_reference_map(
+        self,
+        company_ids: Iterable[int] = (),
+        country_ids: Iterable[int] = (),
+        state_ids: Iterable[int] = ()
+    ) -> Dict[Tuple[str, int], Mapping[str, Any]]:
         """
-        # Placeholder - implementar cuando exista Employee
-        return False
+        Obtiene Companies, Countries y States por id en un solo round-trip.
+
+        Las entidades ya cargadas en la sesión (identity map) se toman de ahí
+        sin consultar, igual que haría Session.get(). El resto se resuelve con
+        un UNION ALL con una rama por entidad (id = :id o id IN (...)); cada
+        fila trae (entity, id, active, country_id). country_id solo aplica a State.
+
+        Returns:
+            Diccionario (entity, id) → fila. Los ids que no existen no aparecen.
+        """
+        refs: Dict[Tuple[str, int], Mapping[str, Any]] = {}
+        selects = []
+
+        for entity, model, entity_ids in (
+            ("Company", Company, company_ids),
+            ("Country", Country, country_ids),
+            ("State", State, state_ids),
+        ):
+            pending = []
+            for entity_id in set(entity_ids):
+                loaded = self._loaded_reference(model, entity_id)
+                if loaded is not None:
+                    refs[(entity, entity_id)] = loaded
+                else:
+                    pending.append(entity_id)
+
+            if not pending:
+                continue
+
+            condition = model.id == pending[0] if len(pending) == 1 else model.id.in_(pending)
+            country_column = State.country_id if model is State else null().cast(Integer)
+            selects.append(select(
+                literal(entity, String).label("entity"),
+                model.id.label("id"),
+                (model.is_active & ~model.is_deleted).label("active"),
+                country_column.label("country_id")
+            ).where(condition))
 
-    def search(self, query: str, limit: int = 50) -> List[Branch]:
-        """Busca sucursales por nombre, código o ciudad."""
-        search_pattern = f"%{query}%"
-        return self.db.query(Branch).filter(
-            (Branch.name.ilike(search_pattern)) |
-            (Branch.code.ilike(search_pattern)) |
-            (Branch.city.ilike(search_pattern)),
+        if selects:
+            stmt = selects[0] if len(selects) == 1 else union_all(*selects)
+            for row in self.db.execute(stmt).mappings():
+                refs[(row["entity"], row["id"])] = row
+
+        return refs
+
+    def _loaded_reference(self, model, entity_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Referencia tomada del identity map de la sesión, sin ir a la BD.
+
+        Retorna None si la instancia no está cargada o si sus atributos
+        están expirados (en ese caso se consulta normalmente).
+        """
+        instance = self.db.identity_map.get(identity_key(model, entity_id))
+        if instance is None:
+            return None
+
+        needed = {"is_active", "is_deleted", "country_id"} if model is State else {"is_active", "is_deleted"}
+        if needed & inspect(instance).unloaded:
+            return None
+
+        return {
+            "entity": model.__name__,
+            "id": entity_id,
+            "active": instance.is_active and not instance.is_deleted,
+            "country_id": instance.country_id if model is State else None,
+        }
+
+    def active_dependencies(self, branch_id: int) -> Tuple[bool, bool]:
+        """
+        Verifica en un solo round-trip si la sucursal tiene departamentos y empleados activos.
+
+        SELECT EXISTS(...), EXISTS(...): cada EXISTS se detiene en la primera
+        coincidencia (índices parciales idx_departments_active_branch e
+        idx_employees_active_branch).
+
+        Returns:
+            (tiene_departments_activos, tiene_employees_activos)
+        """
+        # lambda_stmt: el SELECT se construye una sola vez (branch_id es parámetro)
+        stmt = lambda_stmt(lambda: select(
+            exists().where(
+                Department.branch_id == branch_id,
+                Department.is_active == True,
+                Department.is_deleted == False
+            ).label("departments"),
+            exists().where(
+                Employee.branch_id == branch_id,
+                Employee.is_active == True,
+                Employee.is_deleted == False
+            ).label("employees")
+        ))
+        row = self.db.execute(stmt).one()
+        return row.departments, row.employees
+
+    def search(self, query: str, limit: int = 50, skip: int = 0) -> List[RowMapping]:
+        """
+        Busca sucursales por nombre, código o ciudad.
+
+        Combina dos criterios, ambos resueltos por índices GIN:
+        - Full-text sobre search_vector (idx_branches_fts) con sintaxis web
+          ("buenos aires", "centro -norte", "\"zona sur\""): palabras completas.
+        - Similitud de trigramas sobre _SEARCH_TEXT (ix_branches_trgm): tolera
+          subcadenas y errores de tipeo ("monterey" → "Monterrey").
+
+        Ordena por relevancia full-text y luego por similitud.
+
+        Retorna mappings columna → valor (proyección, sin hidratar Branch).
+        """
+        ts_query = func.websearch_to_tsquery("simple", query)
+        stmt = select(*_BRANCH_SELECT_COLUMNS).where(
+            or_(
+                Branch.search_vector.op("@@")(ts_query),
+                _SEARCH_TEXT.op("%>")(query)
+            ),
             Branch.is_deleted == False
-        ).limit(limit).all()
+        ).order_by(
+            func.ts_rank(Branch.search_vector, ts_query).desc(),
+            func.word_similarity(query, _SEARCH_TEXT).desc(),
+            Branch.id
+        ).offset(skip).limit(limit)
+        return self.db.execute(stmt).mappings().all()
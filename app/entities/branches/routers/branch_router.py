@@ -3,8 +3,9 @@ Router: Branch
 
 Endpoints REST API para gestión de Branches.
 """
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from database import get_db, User
@@ -12,6 +13,7 @@ from auth import get_current_user
 from app.entities.branches.controllers.branch_controller import BranchController
 from app.entities.branches.schemas.branch_schemas import (
     BranchCreate,
+    BranchBulkCreate,
     BranchUpdate,
     BranchResponse,
     BranchListResponse
@@ -29,15 +31,21 @@ router = APIRouter(
 )
 
 
+# ==================== DEPENDENCIAS ====================
+
+def get_branch_controller(db: Session = Depends(get_db)) -> BranchController:
+    """Dependencia para obtener el controller de Branch (uno por request)."""
+    return BranchController(db)
+
+
 @router.post("/", response_model=BranchResponse, status_code=201)
 def create_branch(
     branch_data: BranchCreate,
-    db: Session = Depends(get_db),
+    controller: BranchController = Depends(get_branch_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Crea una nueva Branch."""
     try:
-        controller = BranchController(db)
         data = branch_data.model_dump()
         branch = controller.create_branch(data, current_user_id=current_user.id)
         return branch
@@ -53,18 +61,46 @@ def create_branch(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk", response_model=List[BranchResponse], status_code=201)
+def bulk_create_branches(
+    bulk_data: BranchBulkCreate,
+    controller: BranchController = Depends(get_branch_controller),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Crea varias Branches en una sola operación (todo o nada).
+
+    Valida todas las filas y las inserta con un único INSERT ... RETURNING.
+    Los errores de validación se reportan como "[índice].campo".
+    """
+    try:
+        rows = [branch.model_dump() for branch in bulk_data.branches]
+        created = controller.bulk_create_branches(rows, current_user_id=current_user.id)
+        return ORJSONResponse(created, status_code=201)
+    except EntityValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": e.message, "errors": e.details.get("validation_errors", {})})
+    except EntityAlreadyExistsError as e:
+        raise HTTPException(status_code=409, detail=e.message)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except BusinessRuleError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/", response_model=List[BranchResponse])
 def get_all_branches(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     active_only: bool = Query(True),
-    db: Session = Depends(get_db),
+    controller: BranchController = Depends(get_branch_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Obtiene lista de Branches."""
     try:
-        controller = BranchController(db)
-        return controller.get_all_branches(skip, limit, active_only)
+        # Ya serializado (JSON-ready): se evita la re-validación de response_model
+        return ORJSONResponse(controller.get_all_branches(skip, limit, active_only))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -73,14 +109,13 @@ def get_all_branches(
 def get_branches_paginated(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    controller: BranchController = Depends(get_branch_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Obtiene Branches paginadas."""
     try:
-        controller = BranchController(db)
         result = controller.paginate_branches(page, per_page)
-        return result
+        return ORJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -89,14 +124,14 @@ def get_branches_paginated(
 def search_branches(
     q: str = Query(..., min_length=1),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    controller: BranchController = Depends(get_branch_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Busca Branches por nombre."""
     try:
-        controller = BranchController(db)
-        branches = controller.search_branches(q, limit)
-        return branches
+        branches = controller.search_branches(q, limit, skip)
+        return ORJSONResponse(branches)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -105,26 +140,48 @@ def search_branches(
 def get_branches_by_company(
     company_id: int,
     active_only: bool = Query(True),
-    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = Query(None, ge=0, description="Paginación keyset: id de la última Branch recibida"),
+    controller: BranchController = Depends(get_branch_controller),
     current_user: User = Depends(get_current_user)
 ):
-    """Obtiene Branches por Company."""
+    """Obtiene Branches por Company (paginado)."""
     try:
-        controller = BranchController(db)
-        return controller.get_branches_by_company(company_id, active_only)
+        return ORJSONResponse(
+            controller.get_branches_by_company(company_id, active_only, skip, limit, after_id)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/by-company/{company_id}/stream", response_model=List[BranchResponse])
+def stream_branches_by_company(
+    company_id: int,
+    active_only: bool = Query(True),
+    controller: BranchController = Depends(get_branch_controller),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Obtiene TODAS las Branches de una Company como arreglo JSON en streaming.
+
+    Pensado para empresas con miles de sucursales: las filas se leen del
+    cursor en bloques y se envían conforme se serializan.
+    """
+    return StreamingResponse(
+        controller.stream_branches_by_company(company_id, active_only),
+        media_type="application/json"
+    )
+
+
 @router.get("/{branch_id}", response_model=BranchResponse)
 def get_branch(
     branch_id: int,
-    db: Session = Depends(get_db),
+    controller: BranchController = Depends(get_branch_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Obtiene una Branch por ID."""
     try:
-        controller = BranchController(db)
         return controller.get_branch(branch_id)
     except EntityNotFoundError as e:
         raise HTTPException(status_code=404, detail=e.message)
@@ -136,12 +193,11 @@ def get_branch(
 def update_branch(
     branch_id: int,
     branch_data: BranchUpdate,
-    db: Session = Depends(get_db),
+    controller: BranchController = Depends(get_branch_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Actualiza una Branch."""
     try:
-        controller = BranchController(db)
         data = branch_data.model_dump(exclude_unset=True)
         return controller.update_branch(branch_id, data, current_user_id=current_user.id)
     except EntityNotFoundError as e:
@@ -159,12 +215,11 @@ def update_branch(
 @router.delete("/{branch_id}", response_model=BranchResponse)
 def delete_branch(
     branch_id: int,
-    db: Session = Depends(get_db),
+    controller: BranchController = Depends(get_branch_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Elimina una Branch (soft delete)."""
     try:
-        controller = BranchController(db)
         controller.delete_branch(branch_id, current_user_id=current_user.id)
         return controller.get_branch(branch_id)
     except EntityNotFoundError as e:
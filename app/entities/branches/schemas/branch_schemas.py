@@ -3,7 +3,7 @@ Schemas: Branch
 
 Pydantic schemas para validación y serialización de Branch.
 """
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from typing import Optional
 from datetime import datetime
 
@@ -29,6 +29,14 @@ class BranchCreate(BranchBase):
     pass
 
 
+class BranchBulkCreate(BaseModel):
+    """Schema para crear varias Branches en una sola operación (POST /bulk)."""
+
+    branches: list[BranchCreate] = Field(
+        ..., min_length=1, max_length=1000, description="Branches a crear (todo o nada)"
+    )
+
+
 class BranchUpdate(BaseModel):
     """Schema para actualizar Branch (PUT/PATCH)."""
 
@@ -70,3 +78,9 @@ class BranchListResponse(BaseModel):
     pages: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Adapters precompilados (el schema se construye una sola vez al importar).
+# Serializar listas con un adapter evita validar item por item.
+BRANCH_RESPONSE_ADAPTER = TypeAdapter(BranchResponse)
+BRANCH_LIST_ADAPTER = TypeAdapter(list[BranchResponse])
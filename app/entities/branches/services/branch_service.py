@@ -3,21 +3,115 @@ Service: Branch
 
 Lógica de negocio y validaciones para Branch.
 """
-from typing import Optional, Dict, Any, List
+import re
+from typing import Optional, Dict, Any, Callable, Iterator, List, Mapping, Tuple
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime
 from math import ceil
 
 from app.entities.branches.repositories.branch_repository import BranchRepository
 from app.entities.branches.models.branch import Branch
-from app.entities.companies.repositories.company_repository import CompanyRepository
-from app.entities.countries.repositories.country_repository import CountryRepository
-from app.entities.states.repositories.state_repository import StateRepository
+from app.entities.countries.cache import get_reference, set_reference
+from app.entities.companies.cache import get_company_reference
 from app.shared.exceptions import (
     EntityNotFoundError,
     EntityAlreadyExistsError,
     EntityValidationError,
-    BusinessRuleError
+    BusinessRuleError,
+    handle_sqlalchemy_error
+)
+
+
+# ==================== VALIDADORES DE CAMPOS ====================
+# Cada validador recibe el valor y retorna el mensaje de error o None.
+
+# Email: sin espacios ni caracteres de control (evita inyección de cabeceras con \r\n)
+_EMAIL_RE = re.compile(r"^[^@\s\x00-\x1f\x7f]+@[^@\s\x00-\x1f\x7f]+\.[^@\s\x00-\x1f\x7f]+$", re.ASCII)
+
+# DETAIL de Postgres al violar uq_company_branch_code: Key (company_id, code)=(1, SUC-01)
+_DUPLICATE_CODE_RE = re.compile(r"\(company_id, code\)=\(\d+, (.+?)\) already exists")
+
+
+def _positive_id(field: str) -> Callable[[Any], Optional[str]]:
+    def check(value: Any) -> Optional[str]:
+        if not value:
+            return f"El {field} es obligatorio"
+        if not isinstance(value, int) or value <= 0:
+            return f"El {field} debe ser un entero positivo"
+        return None
+    return check
+
+
+def _check_code(value: Any) -> Optional[str]:
+    code = (value or "").strip()
+    if not code:
+        return "El código es obligatorio"
+    if len(code) > 50:
+        return "El código no puede exceder 50 caracteres"
+    return None
+
+
+def _check_name(value: Any) -> Optional[str]:
+    name = (value or "").strip()
+    if not name:
+        return "El nombre es obligatorio"
+    if len(name) < 2:
+        return "El nombre debe tener al menos 2 caracteres"
+    if len(name) > 200:
+        return "El nombre no puede exceder 200 caracteres"
+    return None
+
+
+def _check_address(value: str) -> Optional[str]:
+    if len(value) > 300:
+        return "La dirección no puede exceder 300 caracteres"
+    return None
+
+
+def _check_city(value: str) -> Optional[str]:
+    city = value.strip()
+    if len(city) < 2:
+        return "La ciudad debe tener al menos 2 caracteres"
+    if len(city) > 100:
+        return "La ciudad no puede exceder 100 caracteres"
+    return None
+
+
+def _check_postal_code(value: str) -> Optional[str]:
+    if len(value.strip()) > 20:
+        return "El código postal no puede exceder 20 caracteres"
+    return None
+
+
+def _check_phone(value: str) -> Optional[str]:
+    if len(value.strip()) > 50:
+        return "El teléfono no puede exceder 50 caracteres"
+    return None
+
+
+def _check_email(value: str) -> Optional[str]:
+    email = value.strip()
+    if len(email) > 100:
+        return "El email no puede exceder 100 caracteres"
+    if not _EMAIL_RE.match(email):
+        return "El email no tiene un formato válido"
+    return None
+
+
+# (campo, obligatorio en creación, validador)
+_FIELD_SPECS: Tuple[Tuple[str, bool, Callable[[Any], Optional[str]]], ...] = (
+    ("company_id", True, _positive_id("company_id")),
+    ("country_id", True, _positive_id("country_id")),
+    ("state_id", True, _positive_id("state_id")),
+    ("code", True, _check_code),
+    ("name", True, _check_name),
+    ("address", False, _check_address),
+    ("city", False, _check_city),
+    ("postal_code", False, _check_postal_code),
+    ("phone", False, _check_phone),
+    ("email", False, _check_email),
 )
 
 
@@ -28,9 +122,6 @@ class BranchService:
         """Inicializa el servicio con el repositorio."""
         self.db = db
         self.repository = BranchRepository(db)
-        self.company_repository = CompanyRepository(db)
-        self.country_repository = CountryRepository(db)
-        self.state_repository = StateRepository(db)
 
     # ==================== OPERACIONES CRUD ====================
 
@@ -58,53 +149,94 @@ class BranchService:
         # Validar datos de entrada
         self._validate_branch_data(data)
 
-        # Validar que company_id existe y está activo
-        company = self.company_repository.get_by_id(data["company_id"])
-        if not company:
-            raise EntityNotFoundError("Company", data["company_id"])
+        # Validar que company, country y state existen (un solo round-trip)
+        self._validate_references(data)
 
-        if not company.is_active or company.is_deleted:
-            raise BusinessRuleError(
-                f"La Company {data['company_id']} no está activa",
-                details={"company_id": data["company_id"]}
-            )
+        # Agregar auditoría
+        if created_by:
+            data["created_by"] = created_by
 
-        # Validar que country_id existe
-        country = self.country_repository.get_by_id(data["country_id"])
-        if not country:
-            raise EntityNotFoundError("Country", data["country_id"])
+        # Crear el registro con INSERT ... RETURNING (sin SELECT posterior).
+        # La unicidad de code por company la garantiza uq_company_branch_code
+        # y las FKs cubren cambios concurrentes entre validación e INSERT
+        try:
+            return self.repository.create_returning(data)
+        except IntegrityError as e:
+            raise self._translate_integrity_error(e, data)
 
-        # Validar que state_id existe y pertenece al country_id
-        state = self.state_repository.get_by_id(data["state_id"])
-        if not state:
-            raise EntityNotFoundError("State", data["state_id"])
+    def bulk_create_branches(
+        self,
+        rows: List[Dict[str, Any]],
+        created_by: Optional[int] = None
+    ) -> List[RowMapping]:
+        """
+        Crea varias Branches en una sola operación (todo o nada).
 
-        if state.country_id != data["country_id"]:
-            raise BusinessRuleError(
-                f"El State {data['state_id']} no pertenece al Country {data['country_id']}",
-                details={
-                    "state_id": data["state_id"],
-                    "country_id": data["country_id"],
-                    "state_country_id": state.country_id
-                }
-            )
+        Round-trips fijos sin importar el número de filas: una consulta para
+        las referencias (Company/Country/State), una para códigos existentes y
+        un INSERT ... RETURNING con todas las filas.
 
-        # Validar que code sea único por company
-        existing_branch = self.repository.get_by_code(data["company_id"], data["code"])
-        if existing_branch:
-            raise EntityAlreadyExistsError(
-                "Branch",
-                "code",
-                data["code"],
-                f"El código '{data['code']}' ya existe para esta empresa"
-            )
+        Args:
+            rows: Datos de cada Branch
+            created_by: ID del usuario que crea los registros
+
+        Returns:
+            Branches creadas (mappings de columnas), en el orden recibido
+
+        Raises:
+            EntityValidationError: Si alguna fila no es válida o hay códigos repetidos
+            EntityAlreadyExistsError: Si algún code ya existe para su company
+            EntityNotFoundError: Si alguna company_id, country_id o state_id no existe
+            BusinessRuleError: Si alguna company no está activa o un state no pertenece al country
+        """
+        # 1. Validación de campos por fila (errores con prefijo de índice)
+        errors = {}
+        for index, data in enumerate(rows):
+            try:
+                self._validate_branch_data(data)
+            except EntityValidationError as e:
+                for field, message in e.details.get("validation_errors", {}).items():
+                    errors[f"[{index}].{field}"] = message
+
+        # 2. Códigos repetidos dentro del mismo lote
+        seen = {}
+        for index, data in enumerate(rows):
+            key = (data.get("company_id"), data.get("code"))
+            if key in seen:
+                errors[f"[{index}].code"] = f"Código repetido en el lote (fila {seen[key]})"
+            else:
+                seen[key] = index
+
+        if errors:
+            raise EntityValidationError("Branch", errors)
+
+        # 3. Referencias de todas las filas en una sola consulta
+        refs = self.repository.get_reference_map(
+            company_ids={data["company_id"] for data in rows},
+            country_ids={data["country_id"] for data in rows},
+            state_ids={data["state_id"] for data in rows}
+        )
+        for data in rows:
+            self._check_references(data, {
+                entity: refs.get((entity, data[column]))
+                for column, entity in self._FK_ENTITIES.items()
+            })
+
+        # 4. Códigos ya existentes en la BD (una consulta)
+        existing = self.repository.existing_codes(seen.keys())
+        if existing:
+            _, code = min(existing)
+            raise EntityAlreadyExistsError("Branch", "code", code)
 
-        # Agregar auditoría
         if created_by:
-            data["created_by"] = created_by
+            for data in rows:
+                data["created_by"] = created_by
 
-        # Crear el registro
-        return self.repository.create(data)
+        # 5. Un solo INSERT ... RETURNING; el constraint cubre carreras con otras escrituras
+        try:
+            return self.repository.create_many_returning(rows)
+        except IntegrityError as e:
+            raise self._translate_integrity_error(e, {})
 
     def get_branch_by_id(self, branch_id: int) -> Branch:
         """
@@ -129,7 +261,7 @@ class BranchService:
         skip: int = 0,
         limit: int = 100,
         active_only: bool = True
-    ) -> List[Branch]:
+    ) -> List[RowMapping]:
         """
         Obtiene todas las Branches con paginación.
 
@@ -139,26 +271,49 @@ class BranchService:
             active_only: Solo activas
 
         Returns:
-            Lista de Branches
+            Lista de Branches como mappings de columnas (solo lectura)
         """
-        return self.repository.get_all(skip, limit, active_only)
+        return self.repository.list_rows(skip, limit, active_only)
 
     def get_branches_by_company(
         self,
         company_id: int,
-        active_only: bool = True
+        active_only: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
     ) -> List[Branch]:
         """
-        Obtiene todas las Branches de una Company.
+        Obtiene las Branches de una Company (paginado).
 
         Args:
             company_id: ID de la Company
             active_only: Solo activas
+            skip: Registros a saltar (ignorado si se usa after_id)
+            limit: Máximo de registros
+            after_id: Paginación keyset: solo Branches con id > after_id
 
         Returns:
             Lista de Branches
         """
-        return self.repository.get_by_company(company_id, active_only)
+        return self.repository.get_by_company(company_id, active_only, skip, limit, after_id)
+
+    def iter_branches_by_company(
+        self,
+        company_id: int,
+        active_only: bool = True
+    ) -> Iterator[RowMapping]:
+        """
+        Itera todas las Branches de una Company en bloques (streaming).
+
+        Args:
+            company_id: ID de la Company
+            active_only: Solo activas
+
+        Returns:
+            Iterador de Branches como mappings de columnas (solo lectura)
+        """
+        return self.repository.iter_by_company(company_id, active_only)
 
     def update_branch(
         self,
@@ -189,61 +344,18 @@ class BranchService:
         # Validar datos de entrada
         self._validate_branch_data(data, is_update=True)
 
-        # Si se actualiza company_id, validar que existe y está activo
-        if "company_id" in data:
-            company = self.company_repository.get_by_id(data["company_id"])
-            if not company:
-                raise EntityNotFoundError("Company", data["company_id"])
-
-            if not company.is_active or company.is_deleted:
-                raise BusinessRuleError(
-                    f"La Company {data['company_id']} no está activa",
-                    details={"company_id": data["company_id"]}
-                )
-
-        # Si se actualiza country_id, validar que existe
-        if "country_id" in data:
-            country = self.country_repository.get_by_id(data["country_id"])
-            if not country:
-                raise EntityNotFoundError("Country", data["country_id"])
-
-        # Si se actualiza state_id, validar que existe y pertenece al country
-        if "state_id" in data:
-            state = self.state_repository.get_by_id(data["state_id"])
-            if not state:
-                raise EntityNotFoundError("State", data["state_id"])
-
-            # Determinar el country_id a validar (nuevo o actual)
-            country_id = data.get("country_id", branch.country_id)
-            if state.country_id != country_id:
-                raise BusinessRuleError(
-                    f"El State {data['state_id']} no pertenece al Country {country_id}",
-                    details={
-                        "state_id": data["state_id"],
-                        "country_id": country_id,
-                        "state_country_id": state.country_id
-                    }
-                )
-
-        # Validar code único por company si se está actualizando
-        if "code" in data:
-            # Determinar el company_id a validar (nuevo o actual)
-            company_id = data.get("company_id", branch.company_id)
-            existing_branch = self.repository.get_by_code(company_id, data["code"])
-            if existing_branch and existing_branch.id != branch_id:
-                raise EntityAlreadyExistsError(
-                    "Branch",
-                    "code",
-                    data["code"],
-                    f"El código '{data['code']}' ya existe para esta empresa"
-                )
+        # Validar las referencias que cambian (un solo round-trip)
+        self._validate_references(data, current_country_id=branch.country_id)
 
         # Agregar auditoría
         if updated_by:
             data["updated_by"] = updated_by
 
-        # Actualizar
-        return self.repository.update(branch_id, data)
+        # Actualizar; si cambia code, uq_company_branch_code valida la unicidad
+        try:
+            return self.repository.update(branch_id, data)
+        except IntegrityError as e:
+            raise self._translate_integrity_error(e, {**self._branch_keys(branch), **data})
 
     def delete_branch(
         self,
@@ -263,50 +375,49 @@ class BranchService:
             True si se eliminó correctamente
 
         Raises:
-            EntityNotFoundError: Si no se encuentra la Branch
+            EntityNotFoundError: Si no se encuentra la Branch (o ya estaba eliminada)
             BusinessRuleError: Si tiene dependencias activas
         """
-        # Verificar que existe
-        branch = self.get_branch_by_id(branch_id)
+        # Validar que no tenga dependencias activas (no requiere cargar la Branch)
+        has_departments, has_employees = self.repository.active_dependencies(branch_id)
 
-        # Validar que no tenga dependencias activas
-        if self.repository.has_active_departments(branch_id):
+        if has_departments:
             raise BusinessRuleError(
                 "No se puede eliminar una Branch con departments activos asociados",
                 details={"branch_id": branch_id}
             )
 
-        if self.repository.has_active_employees(branch_id):
+        if has_employees:
             raise BusinessRuleError(
                 "No se puede eliminar una Branch con employees activos asociados",
                 details={"branch_id": branch_id}
             )
 
-        # Si es soft delete, marcar deleted_by
-        if soft_delete and deleted_by:
-            self.repository.update(branch_id, {
-                "is_active": False,
-                "is_deleted": True,
-                "deleted_by": deleted_by
-            })
+        # Soft delete: UPDATE ... RETURNING, la existencia se verifica en el mismo UPDATE
+        if soft_delete:
+            if self.repository.soft_delete_returning(branch_id, deleted_by) is None:
+                raise EntityNotFoundError("Branch", branch_id)
             return True
 
-        return self.repository.delete(branch_id, soft_delete)
+        if not self.repository.delete(branch_id, soft_delete=False):
+            raise EntityNotFoundError("Branch", branch_id)
+        return True
 
     # ==================== OPERACIONES AVANZADAS ====================
 
-    def search_branches(self, query: str, limit: int = 50) -> List[Branch]:
+    def search_branches(self, query: str, limit: int = 50, skip: int = 0) -> List[RowMapping]:
         """
         Busca Branches por nombre, código o ciudad (case-insensitive).
 
         Args:
             query: Término de búsqueda
             limit: Máximo de resultados
+            skip: Resultados a saltar
 
         Returns:
-            Lista de Branches que coinciden
+            Lista de Branches que coinciden, como mappings de columnas (solo lectura)
         """
-        return self.repository.search(query, limit)
+        return self.repository.search(query, limit, skip)
 
     def paginate_branches(
         self,
@@ -344,6 +455,152 @@ class BranchService:
 
     # ==================== VALIDACIONES ====================
 
+    # Columna FK de Branch → entidad referenciada (para traducir violaciones de FK)
+    _FK_ENTITIES = {
+        "company_id": "Company",
+        "country_id": "Country",
+        "state_id": "State",
+    }
+
+    @staticmethod
+    def _branch_keys(branch: Branch) -> Dict[str, Any]:
+        """Valores actuales de code y FKs de una Branch (para mensajes de error)."""
+        return {
+            "code": branch.code,
+            "company_id": branch.company_id,
+            "country_id": branch.country_id,
+            "state_id": branch.state_id,
+        }
+
+    def _translate_integrity_error(self, error: IntegrityError, data: Dict[str, Any]) -> Exception:
+        """
+        Convierte un IntegrityError de INSERT/UPDATE de Branch en excepción de aplicación.
+
+        Hace rollback de la sesión para que pueda seguir usándose.
+        """
+        self.db.rollback()
+        message = str(error.orig)
+
+        if "uq_company_branch_code" in message:
+            code = data.get("code")
+            if code is None:
+                # Lotes: el code en conflicto viene en el DETAIL de Postgres
+                match = _DUPLICATE_CODE_RE.search(message)
+                code = match.group(1) if match else None
+            return EntityAlreadyExistsError("Branch", "code", code)
+
+        if "foreign key" in message.lower():
+            for column, entity in self._FK_ENTITIES.items():
+                if column in message:
+                    return EntityNotFoundError(entity, data.get(column))
+
+        return handle_sqlalchemy_error(error, "Branch")
+
+    def _validate_references(
+        self,
+        data: Dict[str, Any],
+        current_country_id: Optional[int] = None
+    ) -> None:
+        """
+        Valida company_id, country_id y state_id presentes en data con una sola consulta
+        (o ninguna, si Company/Country/State ya están en cache).
+
+        Args:
+            data: Datos de la Branch (solo se validan las FKs presentes)
+            current_country_id: country_id actual de la Branch (en actualizaciones),
+                usado para validar un state_id nuevo sin country_id nuevo
+
+        Raises:
+            EntityNotFoundError: Si alguna referencia no existe
+            BusinessRuleError: Si company no está activo o state no pertenece al country
+        """
+        company_id = data.get("company_id")
+        country_id = data.get("country_id")
+        state_id = data.get("state_id")
+
+        # Las tres referencias salen de su cache cuando es posible. Company usa el
+        # cache de app.entities.companies.cache (TTL corto); la fila del UNION no
+        # trae business_group_id, así que un fallo de Company no lo llena
+        refs = {}
+        if company_id is not None:
+            company = get_company_reference(company_id)
+            if company is not None:
+                refs["Company"] = {
+                    "id": company_id,
+                    "active": company["is_active"] and not company["is_deleted"]
+                }
+
+        for entity, entity_id in (("Country", country_id), ("State", state_id)):
+            if entity_id is not None:
+                cached = get_reference(entity, entity_id)
+                if cached is not None:
+                    refs[entity] = cached
+
+        fetched = self.repository.get_reference_rows(
+            None if "Company" in refs else company_id,
+            None if "Country" in refs else country_id,
+            None if "State" in refs else state_id
+        )
+        for entity in ("Country", "State"):
+            if entity in fetched:
+                set_reference(entity, fetched[entity])
+        refs.update(fetched)
+
+        self._check_references(data, refs, current_country_id)
+
+    def _check_references(
+        self,
+        data: Dict[str, Any],
+        refs: Dict[str, Optional[Mapping[str, Any]]],
+        current_country_id: Optional[int] = None
+    ) -> None:
+        """
+        Aplica las reglas de referencias de una Branch sobre filas ya obtenidas.
+
+        Args:
+            data: Datos de la Branch (solo se validan las FKs presentes)
+            refs: entity ("Company" | "Country" | "State") → fila de referencia o None
+            current_country_id: country_id actual de la Branch (en actualizaciones)
+
+        Raises:
+            EntityNotFoundError: Si alguna referencia no existe
+            BusinessRuleError: Si company no está activo o state no pertenece al country
+        """
+        company_id = data.get("company_id")
+        country_id = data.get("country_id")
+        state_id = data.get("state_id")
+
+        if company_id is not None:
+            company = refs.get("Company")
+            if company is None:
+                raise EntityNotFoundError("Company", company_id)
+
+            if not company["active"]:
+                raise BusinessRuleError(
+                    f"La Company {company_id} no está activa",
+                    details={"company_id": company_id}
+                )
+
+        if country_id is not None and refs.get("Country") is None:
+            raise EntityNotFoundError("Country", country_id)
+
+        if state_id is not None:
+            state = refs.get("State")
+            if state is None:
+                raise EntityNotFoundError("State", state_id)
+
+            # Determinar el country_id a validar (nuevo o actual)
+            expected_country_id = country_id if country_id is not None else current_country_id
+            if state["country_id"] != expected_country_id:
+                raise BusinessRuleError(
+                    f"El State {state_id} no pertenece al Country {expected_country_id}",
+                    details={
+                        "state_id": state_id,
+                        "country_id": expected_country_id,
+                        "state_country_id": state["country_id"]
+                    }
+                )
+
     def _validate_branch_data(
         self,
         data: Dict[str, Any],
@@ -361,80 +618,18 @@ class BranchService:
         """
         errors = {}
 
-        # Validar company_id (obligatorio en creación)
-        if not is_update or "company_id" in data:
-            company_id = data.get("company_id")
-            if not company_id:
-                errors["company_id"] = "El company_id es obligatorio"
-            elif not isinstance(company_id, int) or company_id <= 0:
-                errors["company_id"] = "El company_id debe ser un entero positivo"
-
-        # Validar country_id (obligatorio en creación)
-        if not is_update or "country_id" in data:
-            country_id = data.get("country_id")
-            if not country_id:
-                errors["country_id"] = "El country_id es obligatorio"
-            elif not isinstance(country_id, int) or country_id <= 0:
-                errors["country_id"] = "El country_id debe ser un entero positivo"
-
-        # Validar state_id (obligatorio en creación)
-        if not is_update or "state_id" in data:
-            state_id = data.get("state_id")
-            if not state_id:
-                errors["state_id"] = "El state_id es obligatorio"
-            elif not isinstance(state_id, int) or state_id <= 0:
-                errors["state_id"] = "El state_id debe ser un entero positivo"
-
-        # Validar code (obligatorio en creación)
-        if not is_update or "code" in data:
-            code = data.get("code", "").strip()
-            if not code:
-                errors["code"] = "El código es obligatorio"
-            elif len(code) > 50:
-                errors["code"] = "El código no puede exceder 50 caracteres"
-
-        # Validar name (obligatorio en creación)
-        if not is_update or "name" in data:
-            name = data.get("name", "").strip()
-            if not name:
-                errors["name"] = "El nombre es obligatorio"
-            elif len(name) < 2:
-                errors["name"] = "El nombre debe tener al menos 2 caracteres"
-            elif len(name) > 200:
-                errors["name"] = "El nombre no puede exceder 200 caracteres"
-
-        # Validar address si se proporciona
-        if "address" in data and data["address"]:
-            if len(data["address"]) > 300:
-                errors["address"] = "La dirección no puede exceder 300 caracteres"
-
-        # Validar city si se proporciona
-        if "city" in data and data["city"]:
-            city = data["city"].strip()
-            if len(city) < 2:
-                errors["city"] = "La ciudad debe tener al menos 2 caracteres"
-            elif len(city) > 100:
-                errors["city"] = "La ciudad no puede exceder 100 caracteres"
-
-        # Validar postal_code si se proporciona
-        if "postal_code" in data and data["postal_code"]:
-            postal_code = data["postal_code"].strip()
-            if len(postal_code) > 20:
-                errors["postal_code"] = "El código postal no puede exceder 20 caracteres"
-
-        # Validar phone si se proporciona
-        if "phone" in data and data["phone"]:
-            phone = data["phone"].strip()
-            if len(phone) > 50:
-                errors["phone"] = "El teléfono no puede exceder 50 caracteres"
-
-        # Validar email si se proporciona
-        if "email" in data and data["email"]:
-            email = data["email"].strip()
-            if len(email) > 100:
-                errors["email"] = "El email no puede exceder 100 caracteres"
-            elif "@" not in email or "." not in email:
-                errors["email"] = "El email no tiene un formato válido"
+        for field, required, check in _FIELD_SPECS:
+            # Obligatorios: se validan siempre en creación y si vienen en update.
+            # Opcionales: solo si se proporcionan con valor
+            if required:
+                if is_update and field not in data:
+                    continue
+            elif not data.get(field):
+                continue
+
+            message = check(data.get(field))
+            if message:
+                errors[field] = message
 
         if errors:
             raise EntityValidationError("Branch", errors)
@@ -3,8 +3,10 @@ Controller: BusinessGroup
 
 Manejo de requests y responses para BusinessGroup.
 """
-from typing import Optional
-from fastapi import HTTPException, status
+import hashlib
+from datetime import datetime
+from typing import Iterator, Optional
+from fastapi import HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.entities.business_groups.services.business_group_service import BusinessGroupService
@@ -12,7 +14,10 @@ from app.entities.business_groups.schemas.business_group_schemas import (
     BusinessGroupCreate,
     BusinessGroupUpdate,
     BusinessGroupResponse,
-    BusinessGroupListResponse
+    BusinessGroupListResponse,
+    BusinessGroupCursorResponse,
+    BUSINESS_GROUP_RESPONSE_ADAPTER,
+    BUSINESS_GROUP_LIST_ADAPTER
 )
 from app.shared.exceptions import (
     EntityNotFoundError,
@@ -21,6 +26,9 @@ from app.shared.exceptions import (
     BusinessRuleError
 )
 
+# Caché HTTP de lecturas (navegador; "private": la respuesta depende del usuario)
+CACHE_CONTROL = "private, max-age=30"
+
 
 class BusinessGroupController:
     """Controller para BusinessGroup."""
@@ -73,22 +81,35 @@ class BusinessGroupController:
                 }
             )
 
-    def get_business_group(self, business_group_id: int) -> BusinessGroupResponse:
+    def get_business_group(
+        self,
+        business_group_id: int,
+        if_none_match: Optional[str] = None
+    ) -> Response:
         """
-        Obtiene un BusinessGroup por ID.
+        Obtiene un BusinessGroup por ID, con ETag.
+
+        Si el cliente envía If-None-Match solo se consulta updated_at; si el
+        ETag coincide se responde 304 sin cargar ni serializar la fila.
 
         Args:
             business_group_id: ID del BusinessGroup
+            if_none_match: Header If-None-Match del request
 
         Returns:
-            BusinessGroup encontrado
+            Response JSON con el BusinessGroup, o 304 Not Modified
 
         Raises:
             HTTPException 404: Si no se encuentra
         """
         try:
+            if if_none_match:
+                updated_at = self.service.get_business_group_updated_at(business_group_id)
+                etag = self._item_etag(business_group_id, updated_at)
+                if self._etag_matches(etag, if_none_match):
+                    return self._not_modified(etag)
+
             business_group = self.service.get_business_group_by_id(business_group_id)
-            return BusinessGroupResponse.model_validate(business_group)
 
         except EntityNotFoundError as e:
             raise HTTPException(
@@ -96,12 +117,21 @@ class BusinessGroupController:
                 detail={"message": e.message}
             )
 
+        return Response(
+            content=BusinessGroupResponse.model_validate(business_group).model_dump_json(),
+            media_type="application/json",
+            headers={
+                "ETag": self._item_etag(business_group.id, business_group.updated_at),
+                "Cache-Control": CACHE_CONTROL
+            }
+        )
+
     def get_all_business_groups(
         self,
         skip: int = 0,
         limit: int = 100,
         active_only: bool = True
-    ) -> list[BusinessGroupResponse]:
+    ) -> Response:
         """
         Obtiene todos los BusinessGroups.
 
@@ -111,13 +141,27 @@ class BusinessGroupController:
             active_only: Solo activos
 
         Returns:
-            Lista de BusinessGroups
+            Response JSON con la lista de BusinessGroups (ya serializada)
         """
         business_groups = self.service.get_all_business_groups(skip, limit, active_only)
-        return [
-            BusinessGroupResponse.model_validate(bg)
-            for bg in business_groups
-        ]
+        return self._json_list(business_groups)
+
+    def stream_all_business_groups(self, active_only: bool = True) -> Iterator[bytes]:
+        """
+        Genera el arreglo JSON de todos los BusinessGroups por fragmentos.
+
+        Cada BusinessGroup se serializa al recibirse del cursor, así la
+        respuesta comienza a enviarse sin esperar a cargar todas las filas.
+        """
+        rows = self.service.iter_all_business_groups(active_only)
+
+        yield b"["
+        separator = b""
+        for row in rows:
+            yield separator
+            yield BUSINESS_GROUP_RESPONSE_ADAPTER.dump_json(BUSINESS_GROUP_RESPONSE_ADAPTER.validate_python(row))
+            separator = b","
+        yield b"]"
 
     def update_business_group(
         self,
@@ -216,22 +260,36 @@ class BusinessGroupController:
                 }
             )
 
-    def search_business_groups(self, name: str, limit: int = 50) -> list[BusinessGroupResponse]:
+    def search_business_groups(
+        self,
+        name: str,
+        limit: int = 50,
+        threshold: Optional[float] = None,
+        if_none_match: Optional[str] = None
+    ) -> Response:
         """
         Busca BusinessGroups por nombre.
 
         Args:
             name: Término de búsqueda
             limit: Máximo de resultados
+            threshold: Similitud mínima por palabra (None = default de Postgres)
+            if_none_match: Header If-None-Match del request
 
         Returns:
-            Lista de BusinessGroups que coinciden
+            Response JSON con los BusinessGroups que coinciden (ya serializada),
+            o 304 Not Modified si el resultado no cambió
         """
-        business_groups = self.service.search_business_groups(name, limit)
-        return [
-            BusinessGroupResponse.model_validate(bg)
-            for bg in business_groups
-        ]
+        business_groups = self.service.search_business_groups(name, limit, threshold)
+
+        etag = self._list_etag(business_groups)
+        if if_none_match and self._etag_matches(etag, if_none_match):
+            return self._not_modified(etag)
+
+        response = self._json_list(business_groups)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        return response
 
     def paginate_business_groups(
         self,
@@ -239,8 +297,9 @@ class BusinessGroupController:
         per_page: int = 20,
         active_only: bool = True,
         order_by: str = "created_at",
-        order_direction: str = "desc"
-    ) -> BusinessGroupListResponse:
+        order_direction: str = "desc",
+        use_estimate: bool = False
+    ) -> Response:
         """
         Obtiene BusinessGroups paginados.
 
@@ -250,24 +309,113 @@ class BusinessGroupController:
             active_only: Solo activos
             order_by: Campo de ordenamiento
             order_direction: Dirección de ordenamiento
+            use_estimate: Total aproximado (sin COUNT) para tablas grandes
 
         Returns:
-            Respuesta paginada
+            Response JSON con la respuesta paginada (ya serializada)
         """
-        filters = {"is_active": True} if active_only else None
+        # Mismo predicado que idx_business_groups_active_created
+        filters = {"is_active": True, "is_deleted": False} if active_only else None
 
         result = self.service.paginate_business_groups(
             page=page,
             per_page=per_page,
             filters=filters,
             order_by=order_by,
-            order_direction=order_direction
+            order_direction=order_direction,
+            use_estimate=use_estimate
         )
 
-        return BusinessGroupListResponse(
-            items=[BusinessGroupResponse.model_validate(bg) for bg in result["items"]],
+        page_response = BusinessGroupListResponse(
+            items=BUSINESS_GROUP_LIST_ADAPTER.validate_python(result["items"], from_attributes=True),
             total=result["total"],
             page=result["page"],
             per_page=result["per_page"],
             pages=result["pages"]
         )
+        return Response(content=page_response.model_dump_json(), media_type="application/json")
+
+    def paginate_business_groups_keyset(
+        self,
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        active_only: bool = True
+    ) -> Response:
+        """
+        Obtiene BusinessGroups paginados por cursor (keyset).
+
+        Args:
+            cursor: Cursor de la página anterior (None para la primera)
+            per_page: Registros por página
+            active_only: Solo activos
+
+        Returns:
+            Response JSON con items, next_cursor y per_page (ya serializada)
+
+        Raises:
+            HTTPException 422: Si el cursor no es válido
+        """
+        try:
+            result = self.service.paginate_business_groups_keyset(cursor, per_page, active_only)
+        except EntityValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "message": e.message,
+                    "errors": e.details.get("validation_errors", {})
+                }
+            )
+
+        page_response = BusinessGroupCursorResponse(
+            items=BUSINESS_GROUP_LIST_ADAPTER.validate_python(result["items"], from_attributes=True),
+            next_cursor=result["next_cursor"],
+            per_page=result["per_page"]
+        )
+        return Response(content=page_response.model_dump_json(), media_type="application/json")
+
+    # ==================== SERIALIZACIÓN ====================
+
+    @staticmethod
+    def _item_etag(business_group_id: int, updated_at: datetime) -> str:
+        """ETag débil de un BusinessGroup: cambia con cada actualización."""
+        return f'W/"{business_group_id}-{int(updated_at.timestamp() * 1_000_000)}"'
+
+    @staticmethod
+    def _list_etag(business_groups) -> str:
+        """ETag débil de una lista: count + max(updated_at) + ids del resultado."""
+        if not business_groups:
+            return 'W/"empty"'
+        latest = max(bg.updated_at for bg in business_groups)
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(f"{len(business_groups)}:{latest.isoformat()}:".encode())
+        digest.update(",".join(str(bg.id) for bg in business_groups).encode())
+        return f'W/"{digest.hexdigest()}"'
+
+    @staticmethod
+    def _etag_matches(etag: str, if_none_match: str) -> bool:
+        """Compara contra If-None-Match (puede traer varios ETags o "*")."""
+        if if_none_match.strip() == "*":
+            return True
+        return etag in (tag.strip() for tag in if_none_match.split(","))
+
+    @staticmethod
+    def _not_modified(etag: str) -> Response:
+        """Respuesta 304 sin cuerpo."""
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+
+    @staticmethod
+    def _json_list(business_groups) -> Response:
+        """
+        Serializa una lista de BusinessGroups directo a bytes JSON (pydantic-core).
+
+        Se retorna un Response para que FastAPI no vuelva a validar y
+        serializar el resultado con response_model.
+        """
+        items = BUSINESS_GROUP_LIST_ADAPTER.validate_python(business_groups, from_attributes=True)
+        return Response(
+            content=BUSINESS_GROUP_LIST_ADAPTER.dump_json(items),
+            media_type="application/json"
+        )
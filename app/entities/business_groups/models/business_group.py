@@ -8,11 +8,9 @@ Relaciones:
 - 1 BusinessGroup → N Company
 - 1 BusinessGroup → N Employee (tracking global)
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime
-
-from database import Base
+from sqlalchemy import Column, Computed, Integer, String, DateTime, Boolean, Text, ForeignKey, Index, text
+from sqlalchemy.orm import deferred, relationship
+from database import Base, utc_now
 
 
 class BusinessGroup(Base):
@@ -50,6 +48,14 @@ class BusinessGroup(Base):
         comment="Identificación fiscal (RFC/RUT/NIT)"
     )
 
+    # Texto de búsqueda (columna generada por Postgres, no se escribe desde la app).
+    # deferred: no se carga al hidratar BusinessGroup, solo se usa en filtros
+    search_blob = deferred(Column(
+        Text,
+        Computed("lower(name) || ' ' || lower(coalesce(legal_name, ''))", persisted=True),
+        comment="lower(name || legal_name) para búsqueda por trigramas"
+    ))
+
     description = Column(
         Text,
         nullable=True,
@@ -73,18 +79,18 @@ class BusinessGroup(Base):
         comment="Soft delete flag"
     )
 
-    # Timestamps automáticos
+    # Timestamps automáticos (calculados por Postgres en UTC)
     created_at = Column(
         DateTime,
-        default=datetime.utcnow,
+        server_default=utc_now,
         nullable=False,
         comment="Fecha y hora de creación del registro"
     )
 
     updated_at = Column(
         DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        server_default=utc_now,
+        onupdate=utc_now,
         nullable=False,
         comment="Fecha y hora de última actualización"
     )
@@ -118,25 +124,47 @@ class BusinessGroup(Base):
     )
 
     # ==================== RELATIONSHIPS ====================
+    # lazy="raise": ninguna relación se carga de forma implícita. Los listados
+    # serializan BusinessGroupResponse (solo columnas y FKs), así que un acceso
+    # accidental a una relación fallaría en lugar de emitir N consultas; quien
+    # la necesite debe pedirla con selectinload()/joinedload() en la query.
+
     # Relaciones de auditoría con Usuario
     creator = relationship(
         "User",
-        foreign_keys=[created_by]
+        foreign_keys=[created_by],
+        lazy="raise"
     )
 
     updater = relationship(
         "User",
-        foreign_keys=[updated_by]
+        foreign_keys=[updated_by],
+        lazy="raise"
     )
 
     deleter = relationship(
         "User",
-        foreign_keys=[deleted_by]
+        foreign_keys=[deleted_by],
+        lazy="raise"
     )
 
     # Relaciones con entidades hijas
-    companies = relationship("Company", back_populates="business_group", foreign_keys="Company.business_group_id")
-    employees = relationship("Employee", back_populates="business_group", foreign_keys="Employee.business_group_id")
+    companies = relationship("Company", back_populates="business_group", foreign_keys="Company.business_group_id", lazy="raise")
+    employees = relationship("Employee", back_populates="business_group", foreign_keys="Employee.business_group_id", lazy="raise")
+
+    # ==================== INDEXES ====================
+    __table_args__ = (
+        # Paginación keyset: ORDER BY created_at DESC, id DESC (excluye eliminados)
+        Index(
+            'idx_business_groups_created_id', created_at.desc(), id.desc(),
+            postgresql_where=text('is_deleted = false')
+        ),
+        # Listados de activos (active_only=True): get_all, paginate y keyset
+        Index(
+            'idx_business_groups_active_created', created_at.desc(), id.desc(),
+            postgresql_where=text('is_active = true AND is_deleted = false')
+        ),
+    )
 
     def __repr__(self):
         return f"<BusinessGroup(id={self.id}, name='{self.name}', tax_id='{self.tax_id}')>"
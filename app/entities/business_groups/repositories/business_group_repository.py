@@ -4,11 +4,24 @@ Repository: BusinessGroup
 Operaciones de base de datos para BusinessGroup.
 Hereda de BaseRepository para operaciones CRUD estándar.
 """
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Tuple
+from sqlalchemy import exists, func, lambda_stmt, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row, RowMapping
 from sqlalchemy.orm import Session
 
+from database import utc_now
 from app.shared.base_repository import BaseRepository
+from app.shared.unit_of_work import commit
 from app.entities.business_groups.models.business_group import BusinessGroup
+from app.entities.companies.models.company import Company
+
+# Los trigramas requieren al menos 3 caracteres; términos más cortos usan ILIKE
+_TRGM_MIN_LENGTH = 3
+
+# Columnas de SELECT/RETURNING (sin columnas generadas como search_blob)
+_BUSINESS_GROUP_COLUMNS = tuple(c for c in BusinessGroup.__table__.columns if c.computed is None)
 
 
 class BusinessGroupRepository(BaseRepository[BusinessGroup]):
@@ -29,10 +42,67 @@ class BusinessGroupRepository(BaseRepository[BusinessGroup]):
     - paginate(page, per_page, filters, order_by, order_direction)
     """
 
+    # Campos por los que se puede ordenar en paginate(); otros valores usan created_at
+    ORDERABLE_FIELDS = frozenset({"created_at", "updated_at", "name", "id"})
+
     def __init__(self, db: Session):
         """Inicializa el repositorio con el modelo BusinessGroup."""
         super().__init__(BusinessGroup, db)
 
+    def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = True
+    ) -> List[BusinessGroup]:
+        """
+        Obtiene BusinessGroups, más recientes primero.
+
+        Con active_only el filtro (is_active AND NOT is_deleted) coincide con
+        el predicado de idx_business_groups_active_created, que además da el
+        orden: Postgres lee solo las filas de la página desde el índice.
+        """
+        query = self.db.query(BusinessGroup)
+
+        if active_only:
+            query = query.filter(BusinessGroup.is_active == True, BusinessGroup.is_deleted == False)
+
+        return query.order_by(
+            BusinessGroup.created_at.desc(),
+            BusinessGroup.id.desc()
+        ).offset(skip).limit(limit).all()
+
+    def paginate(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        order_direction: str = "asc",
+        use_estimate: bool = False,
+        total: Optional[int] = None,
+        rows: bool = False
+    ) -> Dict[str, Any]:
+        """
+        paginate() de BaseRepository restringido a ORDERABLE_FIELDS.
+
+        Evita ordenar por columnas sin índice (o por atributos que no son
+        columnas) cuando el order_by llega desde fuera del router.
+        """
+        if order_by not in self.ORDERABLE_FIELDS:
+            order_by = "created_at"
+
+        return super().paginate(
+            page=page,
+            per_page=per_page,
+            filters=filters,
+            order_by=order_by,
+            order_direction=order_direction,
+            use_estimate=use_estimate,
+            total=total,
+            rows=rows
+        )
+
     # ==================== MÉTODOS PERSONALIZADOS ====================
 
     def get_by_tax_id(self, tax_id: str) -> Optional[BusinessGroup]:
@@ -44,50 +114,224 @@ class BusinessGroupRepository(BaseRepository[BusinessGroup]):
 
         Returns:
             BusinessGroup encontrado o None
+
+        lambda_stmt: el SELECT se construye y compila una sola vez; tax_id
+        viaja como parámetro.
         """
-        return self.db.query(BusinessGroup).filter(
+        stmt = lambda_stmt(lambda: select(BusinessGroup).where(
             BusinessGroup.tax_id == tax_id
-        ).first()
+        ))
+        return self.db.execute(stmt).scalars().first()
+
+    def get_updated_at(self, business_group_id: int) -> Optional[datetime]:
+        """
+        Retorna solo updated_at de un BusinessGroup (para ETag / If-None-Match).
 
-    def search_by_name(self, name: str, limit: int = 50) -> List[BusinessGroup]:
+        Returns:
+            updated_at, o None si no existe
         """
-        Busca BusinessGroups por nombre (case-insensitive).
+        stmt = lambda_stmt(lambda: select(BusinessGroup.updated_at).where(
+            BusinessGroup.id == business_group_id
+        ))
+        return self.db.execute(stmt).scalar_one_or_none()
+
+    def search_by_name(
+        self,
+        name: str,
+        limit: int = 50,
+        threshold: Optional[float] = None
+    ) -> List[BusinessGroup]:
+        """
+        Busca BusinessGroups por name o legal_name (case-insensitive).
+
+        Usa la columna generada search_blob (lower(name) || ' ' || lower(legal_name))
+        con similitud estricta por palabra (:t <<% search_blob, escrito como
+        search_blob %>> :t), resuelta con idx_business_groups_search_trgm y
+        ordenada por strict_word_similarity: coincide con palabras completas,
+        por lo que "global" no trae cualquier nombre que contenga "glo".
+        Términos de menos de 3 caracteres no forman trigramas y se buscan con
+        ILIKE. Excluye eliminados.
 
         Args:
             name: Término a buscar en el nombre
             limit: Máximo de resultados
+            threshold: pg_trgm.strict_word_similarity_threshold para esta
+                transacción (None = valor del servidor, 0.5 por defecto)
 
         Returns:
-            Lista de BusinessGroups que coinciden
+            Lista de BusinessGroups que coinciden, más similares primero
         """
-        return self.search(
-            search_term=name,
-            search_fields=["name", "legal_name"],
-            limit=limit
-        )
+        term = (name or "").strip().lower()
+        if not term:
+            return []
+
+        query = self.db.query(BusinessGroup).filter(BusinessGroup.is_deleted == False)
+
+        if len(term) < _TRGM_MIN_LENGTH:
+            return query.filter(
+                BusinessGroup.search_blob.ilike(f"%{term}%")
+            ).order_by(BusinessGroup.name).limit(limit).all()
+
+        if threshold is not None:
+            # Equivale a SET LOCAL (solo dura la transacción actual), pero admite parámetros
+            self.db.execute(
+                text("SELECT set_config('pg_trgm.strict_word_similarity_threshold', :threshold, true)"),
+                {"threshold": str(threshold)}
+            )
+
+        return query.filter(
+            BusinessGroup.search_blob.op("%>>")(term)
+        ).order_by(
+            func.strict_word_similarity(term, BusinessGroup.search_blob).desc(),
+            BusinessGroup.id
+        ).limit(limit).all()
+
+    def iter_all(self, active_only: bool = True, batch_size: int = 500) -> Iterator[RowMapping]:
+        """
+        Itera los BusinessGroups sin cargarlos todos en memoria.
+
+        Usa yield_per (cursor del lado del servidor): las filas llegan en
+        bloques de batch_size a medida que se consumen.
 
-    def tax_id_exists(self, tax_id: str, exclude_id: Optional[int] = None) -> bool:
+        Returns:
+            Iterador de mappings columna → valor, ordenado por id
         """
-        Verifica si un tax_id ya está en uso.
+        stmt = select(*_BUSINESS_GROUP_COLUMNS)
+
+        if active_only:
+            stmt = stmt.where(BusinessGroup.is_active == True, BusinessGroup.is_deleted == False)
+
+        stmt = stmt.order_by(BusinessGroup.id).execution_options(yield_per=batch_size)
+        return self.db.execute(stmt).mappings()
+
+    def paginate_keyset(
+        self,
+        after: Optional[Tuple[datetime, int]] = None,
+        per_page: int = 20,
+        active_only: bool = True
+    ) -> Tuple[List[BusinessGroup], Optional[Tuple[datetime, int]]]:
+        """
+        Página de BusinessGroups por keyset, del más reciente al más antiguo.
+
+        Usa WHERE (created_at, id) < (:created_at, :id) en lugar de OFFSET,
+        resuelto con el índice idx_business_groups_created_id: el costo no
+        crece con la profundidad de la página. Excluye eliminados.
 
         Args:
-            tax_id: Tax ID a verificar
-            exclude_id: ID a excluir de la búsqueda (útil para updates)
+            after: Posición (created_at, id) de la última fila de la página anterior
+            per_page: Registros por página
+            active_only: Solo activos
 
         Returns:
-            True si el tax_id ya existe, False si no
+            Tupla (items, next_after). next_after es None si no hay más páginas.
         """
-        if not tax_id:
-            return False
+        query = self.db.query(BusinessGroup).filter(BusinessGroup.is_deleted == False)
 
-        query = self.db.query(BusinessGroup).filter(
-            BusinessGroup.tax_id == tax_id
-        )
+        if active_only:
+            query = query.filter(BusinessGroup.is_active == True)
+
+        if after is not None:
+            query = query.filter(tuple_(BusinessGroup.created_at, BusinessGroup.id) < tuple_(*after))
+
+        # Se pide una fila extra para saber si existe una página siguiente
+        rows = query.order_by(
+            BusinessGroup.created_at.desc(),
+            BusinessGroup.id.desc()
+        ).limit(per_page + 1).all()
+
+        items = rows[:per_page]
+        if len(rows) > per_page:
+            last = items[-1]
+            return items, (last.created_at, last.id)
+        return items, None
+
+    def create_returning(self, data: Dict[str, Any]) -> Optional[Row]:
+        """
+        Crea con INSERT ... ON CONFLICT (tax_id) DO NOTHING RETURNING en un solo round-trip.
+
+        La unicidad de tax_id la resuelve Postgres de forma atómica (sin
+        consulta previa ni carrera entre dos requests concurrentes).
 
-        if exclude_id:
-            query = query.filter(BusinessGroup.id != exclude_id)
+        Args:
+            data: Columnas del nuevo BusinessGroup
 
-        return query.first() is not None
+        Returns:
+            Fila creada (atributos como el modelo), o None si el tax_id ya existe
+        """
+        row = self.db.execute(
+            insert(BusinessGroup)
+            .values(**data)
+            .on_conflict_do_nothing(index_elements=[BusinessGroup.tax_id])
+            .returning(*_BUSINESS_GROUP_COLUMNS)
+        ).one_or_none()
+        commit(self.db)
+        return row
+
+    def update_returning(self, business_group_id: int, data: Dict[str, Any]) -> Optional[Row]:
+        """
+        Actualiza con UPDATE ... RETURNING en un solo round-trip (sin SELECT previo).
+
+        Solo afecta grupos no eliminados. Un tax_id duplicado lo rechaza el
+        índice único (IntegrityError), no una consulta previa.
+
+        Args:
+            business_group_id: ID del BusinessGroup
+            data: Columnas a actualizar
+
+        Returns:
+            Fila actualizada (atributos como el modelo), o None si no existe o está eliminado
+        """
+        row = self.db.execute(
+            update(BusinessGroup)
+            .where(BusinessGroup.id == business_group_id, BusinessGroup.is_deleted == False)
+            .values(**data, updated_at=utc_now)
+            .returning(*_BUSINESS_GROUP_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+        commit(self.db)
+        return row
+
+    def soft_delete_returning(self, business_group_id: int, deleted_by: Optional[int] = None) -> Optional[int]:
+        """
+        Soft delete con UPDATE ... RETURNING en un solo round-trip (sin SELECT previo).
+
+        Args:
+            business_group_id: ID del BusinessGroup
+            deleted_by: ID del usuario que elimina
+
+        Returns:
+            ID del BusinessGroup eliminado, o None si no existe o ya estaba eliminado
+        """
+        deleted_id = self.db.execute(
+            update(BusinessGroup)
+            .where(BusinessGroup.id == business_group_id, BusinessGroup.is_deleted == False)
+            .values(is_active=False, is_deleted=True, deleted_by=deleted_by, deleted_at=utc_now)
+            .returning(BusinessGroup.id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        commit(self.db)
+        return deleted_id
+
+    def get_active_map(self, business_group_ids: Iterable[int]) -> Dict[int, bool]:
+        """
+        Indica, en una sola consulta, cuáles BusinessGroups están activos.
+
+        Args:
+            business_group_ids: IDs a consultar
+
+        Returns:
+            Diccionario id → activo (is_active y no eliminado).
+            Los IDs que no existen no aparecen en el diccionario.
+        """
+        ids = list(business_group_ids)
+        if not ids:
+            return {}
+
+        rows = self.db.execute(
+            select(BusinessGroup.id, BusinessGroup.is_active, BusinessGroup.is_deleted)
+            .where(BusinessGroup.id.in_(ids))
+        ).all()
+        return {row.id: row.is_active and not row.is_deleted for row in rows}
 
     def has_active_companies(self, business_group_id: int) -> bool:
         """
@@ -98,15 +342,11 @@ class BusinessGroupRepository(BaseRepository[BusinessGroup]):
 
         Returns:
             True si tiene empresas activas, False si no
-
-        Nota:
-            Este método se implementará completamente cuando exista la entidad Company.
-            Por ahora retorna False.
-        """
-        # TODO: Implementar cuando exista la entidad Company
-        # from app.entities.companies.models.company import Company
-        # return self.db.query(Company).filter(
-        #     Company.business_group_id == business_group_id,
-        #     Company.is_active == True
-        # ).count() > 0
-        return False
+        """
+        # EXISTS se detiene en la primera fila (a diferencia de COUNT(*) > 0)
+        stmt = select(exists().where(
+            Company.business_group_id == business_group_id,
+            Company.is_active == True,
+            Company.is_deleted == False
+        ))
+        return self.db.execute(stmt).scalar()
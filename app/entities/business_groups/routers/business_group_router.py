@@ -4,18 +4,21 @@ Router: BusinessGroup
 Endpoints REST para BusinessGroup.
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from database import get_db
-from auth import get_current_user, require_admin
+from auth import get_current_user_id, require_admin
 from database import User
 from app.entities.business_groups.controllers.business_group_controller import BusinessGroupController
 from app.entities.business_groups.schemas.business_group_schemas import (
     BusinessGroupCreate,
     BusinessGroupUpdate,
     BusinessGroupResponse,
-    BusinessGroupListResponse
+    BusinessGroupListResponse,
+    BusinessGroupCursorResponse,
+    BusinessGroupOrderBy
 )
 
 
@@ -24,6 +27,17 @@ router = APIRouter(
     tags=["Business Groups"]
 )
 
+# Autenticación:
+# - Lecturas: get_current_user_id (solo verifica el JWT, sin SELECT a users)
+# - Escrituras: require_admin (carga el usuario para validar rol y estado)
+
+
+# ==================== DEPENDENCIAS ====================
+
+def get_business_group_controller(db: Session = Depends(get_db)) -> BusinessGroupController:
+    """Dependencia para obtener el controller de BusinessGroup (uno por request)."""
+    return BusinessGroupController(db)
+
 
 @router.post(
     "",
@@ -34,7 +48,7 @@ router = APIRouter(
 )
 def create_business_group(
     business_group_data: BusinessGroupCreate,
-    db: Session = Depends(get_db),
+    controller: BusinessGroupController = Depends(get_business_group_controller),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -56,7 +70,6 @@ def create_business_group(
     }
     ```
     """
-    controller = BusinessGroupController(db)
     return controller.create_business_group(
         business_group_data,
         current_user_id=current_user.id
@@ -73,8 +86,8 @@ def get_all_business_groups(
     skip: int = Query(0, ge=0, description="Registros a saltar"),
     limit: int = Query(100, ge=1, le=500, description="Máximo de registros"),
     active_only: bool = Query(True, description="Solo registros activos"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    controller: BusinessGroupController = Depends(get_business_group_controller),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Obtiene lista de BusinessGroups con paginación simple.
@@ -86,10 +99,34 @@ def get_all_business_groups(
     - limit: Máximo de registros a retornar (default: 100, max: 500)
     - active_only: Si es True, solo retorna registros activos (default: True)
     """
-    controller = BusinessGroupController(db)
     return controller.get_all_business_groups(skip, limit, active_only)
 
 
+@router.get(
+    "/stream",
+    response_model=list[BusinessGroupResponse],
+    summary="Listar todos los BusinessGroups (streaming)",
+    description="Arreglo JSON completo enviado por fragmentos, con memoria constante."
+)
+def stream_all_business_groups(
+    active_only: bool = Query(True, description="Solo registros activos"),
+    controller: BusinessGroupController = Depends(get_business_group_controller),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    Obtiene TODOS los BusinessGroups como arreglo JSON en streaming.
+
+    **Permisos:** Usuario autenticado
+
+    Pensado para exportaciones: las filas se leen del cursor en bloques y se
+    envían conforme se serializan, sin el tope de 500 de GET "".
+    """
+    return StreamingResponse(
+        controller.stream_all_business_groups(active_only),
+        media_type="application/json"
+    )
+
+
 @router.get(
     "/paginated",
     response_model=BusinessGroupListResponse,
@@ -100,10 +137,11 @@ def get_business_groups_paginated(
     page: int = Query(1, ge=1, description="Número de página"),
     per_page: int = Query(20, ge=1, le=100, description="Registros por página"),
     active_only: bool = Query(True, description="Solo activos"),
-    order_by: str = Query("created_at", description="Campo de ordenamiento"),
+    order_by: BusinessGroupOrderBy = Query("created_at", description="Campo de ordenamiento"),
     order_direction: str = Query("desc", regex="^(asc|desc)$", description="Dirección de ordenamiento"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    use_estimate: bool = Query(False, description="Total aproximado (estadísticas de Postgres, ignora filtros) en lugar de COUNT exacto"),
+    controller: BusinessGroupController = Depends(get_business_group_controller),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Obtiene BusinessGroups con paginación avanzada.
@@ -117,16 +155,44 @@ def get_business_groups_paginated(
     - per_page: Registros por página
     - pages: Total de páginas
     """
-    controller = BusinessGroupController(db)
     return controller.paginate_business_groups(
         page=page,
         per_page=per_page,
         active_only=active_only,
         order_by=order_by,
-        order_direction=order_direction
+        order_direction=order_direction,
+        use_estimate=use_estimate
     )
 
 
+@router.get(
+    "/keyset",
+    response_model=BusinessGroupCursorResponse,
+    summary="Listar BusinessGroups por cursor",
+    description="Paginación keyset (más recientes primero): costo constante sin importar la página."
+)
+def get_business_groups_keyset(
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior (omitir en la primera)"),
+    per_page: int = Query(20, ge=1, le=100, description="Registros por página"),
+    active_only: bool = Query(True, description="Solo activos"),
+    controller: BusinessGroupController = Depends(get_business_group_controller),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    Obtiene BusinessGroups paginados por cursor.
+
+    **Permisos:** Usuario autenticado
+
+    **Retorna:**
+    - items: Lista de BusinessGroups
+    - next_cursor: Cursor para pedir la siguiente página (null si es la última)
+    - per_page: Registros por página
+
+    A diferencia de /paginated no calcula total ni pages (sin COUNT ni OFFSET).
+    """
+    return controller.paginate_business_groups_keyset(cursor, per_page, active_only)
+
+
 @router.get(
     "/search",
     response_model=list[BusinessGroupResponse],
@@ -136,8 +202,10 @@ def get_business_groups_paginated(
 def search_business_groups(
     name: str = Query(..., min_length=1, description="Término de búsqueda"),
     limit: int = Query(50, ge=1, le=200, description="Máximo de resultados"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    threshold: Optional[float] = Query(None, ge=0, le=1, description="Similitud mínima por palabra (default de Postgres: 0.5)"),
+    if_none_match: Optional[str] = Header(None),
+    controller: BusinessGroupController = Depends(get_business_group_controller),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Busca BusinessGroups por nombre o razón social.
@@ -147,9 +215,13 @@ def search_business_groups(
     **Búsqueda:**
     - Case-insensitive
     - Busca en campos: name, legal_name
+    - Coincidencia por palabras completas similares (tolera errores de tipeo),
+      más relevantes primero
+    - threshold: menor valor = más resultados, menos precisos
+
+    Responde con ETag; con If-None-Match igual retorna 304 sin cuerpo.
     """
-    controller = BusinessGroupController(db)
-    return controller.search_business_groups(name, limit)
+    return controller.search_business_groups(name, limit, threshold, if_none_match)
 
 
 @router.get(
@@ -160,19 +232,22 @@ def search_business_groups(
 )
 def get_business_group(
     business_group_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    if_none_match: Optional[str] = Header(None),
+    controller: BusinessGroupController = Depends(get_business_group_controller),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Obtiene un BusinessGroup por ID.
 
     **Permisos:** Usuario autenticado
 
+    **Caché:** responde con ETag; con If-None-Match igual retorna 304 sin
+    cuerpo (solo consulta updated_at).
+
     **Errores:**
     - 404: BusinessGroup no encontrado
     """
-    controller = BusinessGroupController(db)
-    return controller.get_business_group(business_group_id)
+    return controller.get_business_group(business_group_id, if_none_match)
 
 
 @router.put(
@@ -184,7 +259,7 @@ def get_business_group(
 def update_business_group(
     business_group_id: int,
     business_group_data: BusinessGroupUpdate,
-    db: Session = Depends(get_db),
+    controller: BusinessGroupController = Depends(get_business_group_controller),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -209,7 +284,6 @@ def update_business_group(
     - 422: Errores de validación
     - 409: tax_id duplicado
     """
-    controller = BusinessGroupController(db)
     return controller.update_business_group(
         business_group_id,
         business_group_data,
@@ -224,7 +298,7 @@ def update_business_group(
 )
 def delete_business_group(
     business_group_id: int,
-    db: Session = Depends(get_db),
+    controller: BusinessGroupController = Depends(get_business_group_controller),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -239,7 +313,6 @@ def delete_business_group(
     - 404: BusinessGroup no encontrado
     - 400: Tiene empresas activas asociadas
     """
-    controller = BusinessGroupController(db)
     return controller.delete_business_group(
         business_group_id,
         current_user_id=current_user.id
@@ -3,9 +3,14 @@ Schemas: BusinessGroup
 
 Schemas Pydantic v2 para validación de datos de entrada/salida.
 """
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
+
+
+# Campos permitidos en order_by de /paginated (deben coincidir con
+# BusinessGroupRepository.ORDERABLE_FIELDS)
+BusinessGroupOrderBy = Literal["created_at", "updated_at", "name", "id"]
 
 
 class BusinessGroupBase(BaseModel):
@@ -23,6 +28,7 @@ class BusinessGroupBase(BaseModel):
     )
     tax_id: Optional[str] = Field(
         None,
+        min_length=3,
         max_length=50,
         description="Identificación fiscal (RFC/RUT/NIT)"
     )
@@ -52,6 +58,7 @@ class BusinessGroupUpdate(BaseModel):
     )
     tax_id: Optional[str] = Field(
         None,
+        min_length=3,
         max_length=50,
         description="Identificación fiscal (RFC/RUT/NIT)"
     )
@@ -89,3 +96,19 @@ class BusinessGroupListResponse(BaseModel):
     pages: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BusinessGroupCursorResponse(BaseModel):
+    """Schema para página de BusinessGroups por cursor (keyset)."""
+    items: List[BusinessGroupResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor para la siguiente página (null si es la última)"
+    )
+    per_page: int
+
+
+# Adapter precompilado (el schema se construye una sola vez al importar).
+# Validar listas con un adapter evita la validación item por item.
+BUSINESS_GROUP_RESPONSE_ADAPTER = TypeAdapter(BusinessGroupResponse)
+BUSINESS_GROUP_LIST_ADAPTER = TypeAdapter(list[BusinessGroupResponse])
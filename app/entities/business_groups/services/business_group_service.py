@@ -3,16 +3,51 @@ Service: BusinessGroup
 
 Lógica de negocio y validaciones para BusinessGroup.
 """
-from typing import Optional, Dict, Any, List
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.entities.business_groups.repositories.business_group_repository import BusinessGroupRepository
 from app.entities.business_groups.models.business_group import BusinessGroup
+from app.shared.cache import cache
+from app.shared.pagination import encode_cursor, decode_cursor
 from app.shared.exceptions import (
     EntityNotFoundError,
     EntityAlreadyExistsError,
     EntityValidationError,
-    BusinessRuleError
+    BusinessRuleError,
+    handle_sqlalchemy_error
+)
+
+# Totales exactos de paginate_business_groups (se invalidan al escribir)
+COUNT_CACHE_PREFIX = "business_groups:count:"
+COUNT_CACHE_TTL_SECONDS = 30
+
+
+# ==================== VALIDADORES POR CAMPO ====================
+# Las longitudes las valida Pydantic (BusinessGroupCreate/BusinessGroupUpdate);
+# aquí solo las reglas que el schema no expresa.
+# Cada validador recibe el valor y retorna el mensaje de error o None.
+
+def _check_name(value: Any) -> Optional[str]:
+    # Vacío tras quitar espacios, o null explícito en actualización
+    if not (value or "").strip():
+        return "El nombre es obligatorio"
+    return None
+
+
+def _check_tax_id(value: str) -> Optional[str]:
+    if len(value.strip()) < 3:
+        return "El tax_id debe tener al menos 3 caracteres"
+    return None
+
+
+# (campo, obligatorio, validador)
+_FIELD_SPECS: Tuple[Tuple[str, bool, Callable[[Any], Optional[str]]], ...] = (
+    ("name", True, _check_name),
+    ("tax_id", False, _check_tax_id),
 )
 
 
@@ -39,7 +74,7 @@ class BusinessGroupService:
             created_by: ID del usuario que crea el registro
 
         Returns:
-            BusinessGroup creado
+            Fila RETURNING del BusinessGroup creado (mismos atributos que el modelo)
 
         Raises:
             EntityValidationError: Si los datos no son válidos
@@ -48,21 +83,22 @@ class BusinessGroupService:
         # Validar datos de entrada
         self._validate_business_group_data(data)
 
-        # Validar que tax_id sea único si se proporciona
-        if data.get("tax_id"):
-            if self.repository.tax_id_exists(data["tax_id"]):
-                raise EntityAlreadyExistsError(
-                    "BusinessGroup",
-                    "tax_id",
-                    data["tax_id"]
-                )
-
         # Agregar auditoría
         if created_by:
             data["created_by"] = created_by
 
-        # Crear el registro
-        return self.repository.create(data)
+        # Un solo INSERT ... ON CONFLICT (tax_id) DO NOTHING RETURNING:
+        # sin fila retornada significa que el tax_id ya existe
+        try:
+            business_group = self.repository.create_returning(data)
+        except IntegrityError as e:
+            raise self._translate_integrity_error(e, data)
+
+        if business_group is None:
+            raise EntityAlreadyExistsError("BusinessGroup", "tax_id", data.get("tax_id"))
+
+        cache.delete_prefix(COUNT_CACHE_PREFIX)
+        return business_group
 
     def get_business_group_by_id(self, business_group_id: int) -> BusinessGroup:
         """
@@ -82,6 +118,24 @@ class BusinessGroupService:
             raise EntityNotFoundError("BusinessGroup", business_group_id)
         return business_group
 
+    def get_business_group_updated_at(self, business_group_id: int) -> datetime:
+        """
+        Obtiene solo updated_at de un BusinessGroup (sin cargar la fila completa).
+
+        Args:
+            business_group_id: ID del BusinessGroup
+
+        Returns:
+            Fecha de última actualización
+
+        Raises:
+            EntityNotFoundError: Si no se encuentra el BusinessGroup
+        """
+        updated_at = self.repository.get_updated_at(business_group_id)
+        if updated_at is None:
+            raise EntityNotFoundError("BusinessGroup", business_group_id)
+        return updated_at
+
     def get_all_business_groups(
         self,
         skip: int = 0,
@@ -101,6 +155,18 @@ class BusinessGroupService:
         """
         return self.repository.get_all(skip, limit, active_only)
 
+    def iter_all_business_groups(self, active_only: bool = True) -> Iterator[RowMapping]:
+        """
+        Itera todos los BusinessGroups en bloques (streaming).
+
+        Args:
+            active_only: Solo activos
+
+        Returns:
+            Iterador de BusinessGroups como mappings de columnas (solo lectura)
+        """
+        return self.repository.iter_all(active_only)
+
     def update_business_group(
         self,
         business_group_id: int,
@@ -116,34 +182,33 @@ class BusinessGroupService:
             updated_by: ID del usuario que actualiza
 
         Returns:
-            BusinessGroup actualizado
+            Fila RETURNING del BusinessGroup actualizado (mismos atributos que el modelo)
 
         Raises:
-            EntityNotFoundError: Si no se encuentra el BusinessGroup
+            EntityNotFoundError: Si no se encuentra el BusinessGroup (o está eliminado)
             EntityAlreadyExistsError: Si el tax_id ya existe
             EntityValidationError: Si los datos no son válidos
         """
-        # Verificar que existe
-        business_group = self.get_business_group_by_id(business_group_id)
-
         # Validar datos de entrada
         self._validate_business_group_data(data, is_update=True)
 
-        # Validar tax_id único si se está actualizando
-        if "tax_id" in data and data["tax_id"]:
-            if self.repository.tax_id_exists(data["tax_id"], exclude_id=business_group_id):
-                raise EntityAlreadyExistsError(
-                    "BusinessGroup",
-                    "tax_id",
-                    data["tax_id"]
-                )
-
         # Agregar auditoría
         if updated_by:
             data["updated_by"] = updated_by
 
-        # Actualizar
-        return self.repository.update(business_group_id, data)
+        # Un solo UPDATE ... RETURNING: la existencia la indica la fila retornada
+        # y la unicidad de tax_id la garantiza el índice único
+        try:
+            business_group = self.repository.update_returning(business_group_id, data)
+        except IntegrityError as e:
+            raise self._translate_integrity_error(e, data)
+
+        if business_group is None:
+            raise EntityNotFoundError("BusinessGroup", business_group_id)
+
+        # is_active puede cambiar el total de activos
+        cache.delete_prefix(COUNT_CACHE_PREFIX)
+        return business_group
 
     def delete_business_group(
         self,
@@ -166,9 +231,6 @@ class BusinessGroupService:
             EntityNotFoundError: Si no se encuentra el BusinessGroup
             BusinessRuleError: Si tiene empresas activas asociadas
         """
-        # Verificar que existe
-        business_group = self.get_business_group_by_id(business_group_id)
-
         # Validar que no tenga empresas activas asociadas
         if self.repository.has_active_companies(business_group_id):
             raise BusinessRuleError(
@@ -176,31 +238,37 @@ class BusinessGroupService:
                 details={"business_group_id": business_group_id}
             )
 
-        # Si es soft delete, marcar deleted_by
-        if soft_delete and deleted_by:
-            self.repository.update(business_group_id, {
-                "is_active": False,
-                "is_deleted": True,
-                "deleted_by": deleted_by
-            })
-            return True
+        if soft_delete:
+            deleted = self.repository.soft_delete_returning(business_group_id, deleted_by) is not None
+        else:
+            deleted = self.repository.delete(business_group_id, soft_delete=False)
 
-        return self.repository.delete(business_group_id, soft_delete)
+        if not deleted:
+            raise EntityNotFoundError("BusinessGroup", business_group_id)
+
+        cache.delete_prefix(COUNT_CACHE_PREFIX)
+        return True
 
     # ==================== OPERACIONES AVANZADAS ====================
 
-    def search_business_groups(self, name: str, limit: int = 50) -> List[BusinessGroup]:
+    def search_business_groups(
+        self,
+        name: str,
+        limit: int = 50,
+        threshold: Optional[float] = None
+    ) -> List[BusinessGroup]:
         """
         Busca BusinessGroups por nombre (case-insensitive).
 
         Args:
             name: Término de búsqueda
             limit: Máximo de resultados
+            threshold: Similitud mínima por palabra (None = default de Postgres)
 
         Returns:
             Lista de BusinessGroups que coinciden
         """
-        return self.repository.search_by_name(name, limit)
+        return self.repository.search_by_name(name, limit, threshold)
 
     def get_business_group_by_tax_id(self, tax_id: str) -> Optional[BusinessGroup]:
         """
@@ -220,7 +288,8 @@ class BusinessGroupService:
         per_page: int = 20,
         filters: Optional[Dict[str, Any]] = None,
         order_by: str = "created_at",
-        order_direction: str = "desc"
+        order_direction: str = "desc",
+        use_estimate: bool = False
     ) -> Dict[str, Any]:
         """
         Obtiene BusinessGroups paginados.
@@ -231,27 +300,93 @@ class BusinessGroupService:
             filters: Filtros a aplicar
             order_by: Campo de ordenamiento
             order_direction: Dirección de ordenamiento
+            use_estimate: Usar total estimado (pg_class) en lugar de COUNT exacto
 
         Returns:
             Diccionario con items paginados y metadatos
+
+        El total exacto se cachea COUNT_CACHE_TTL_SECONDS por combinación de
+        filtros: mientras esté en cache la página se consulta sin COUNT.
         """
-        return self.repository.paginate(
+        key = None
+        total = None
+        if not use_estimate:
+            key = COUNT_CACHE_PREFIX + ",".join(f"{k}={v}" for k, v in sorted((filters or {}).items()))
+            total = cache.get(key)
+
+        result = self.repository.paginate(
             page=page,
             per_page=per_page,
             filters=filters,
             order_by=order_by,
-            order_direction=order_direction
+            order_direction=order_direction,
+            use_estimate=use_estimate,
+            total=total
         )
 
+        if key is not None and total is None:
+            cache.set(key, result["total"], ttl=COUNT_CACHE_TTL_SECONDS)
+        return result
+
+    def paginate_business_groups_keyset(
+        self,
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        active_only: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Obtiene BusinessGroups paginados por cursor (keyset), más recientes primero.
+
+        A diferencia de paginate_business_groups no ejecuta COUNT ni OFFSET.
+
+        Args:
+            cursor: Cursor de la página anterior (None para la primera página)
+            per_page: Registros por página
+            active_only: Solo activos
+
+        Returns:
+            Diccionario con items, next_cursor (None en la última página) y per_page
+
+        Raises:
+            EntityValidationError: Si el cursor no es válido
+        """
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                raise EntityValidationError("BusinessGroup", {"cursor": str(e)})
+
+        items, next_after = self.repository.paginate_keyset(after, per_page, active_only)
+
+        return {
+            "items": items,
+            "next_cursor": encode_cursor(*next_after) if next_after else None,
+            "per_page": per_page
+        }
+
     # ==================== VALIDACIONES ====================
 
+    def _translate_integrity_error(self, error: IntegrityError, data: Dict[str, Any]) -> Exception:
+        """
+        Convierte un IntegrityError de INSERT/UPDATE de BusinessGroup en excepción de aplicación.
+
+        Hace rollback de la sesión para que pueda seguir usándose.
+        """
+        self.db.rollback()
+
+        if "(tax_id)" in str(error.orig):
+            return EntityAlreadyExistsError("BusinessGroup", "tax_id", data.get("tax_id"))
+
+        return handle_sqlalchemy_error(error, "BusinessGroup")
+
     def _validate_business_group_data(
         self,
         data: Dict[str, Any],
         is_update: bool = False
     ) -> None:
         """
-        Valida los datos de un BusinessGroup.
+        Valida los datos de un BusinessGroup con la tabla _FIELD_SPECS.
 
         Args:
             data: Datos a validar
@@ -262,28 +397,18 @@ class BusinessGroupService:
         """
         errors = {}
 
-        # Validar name (obligatorio en creación)
-        if not is_update or "name" in data:
-            name = data.get("name", "").strip()
-            if not name:
-                errors["name"] = "El nombre es obligatorio"
-            elif len(name) < 2:
-                errors["name"] = "El nombre debe tener al menos 2 caracteres"
-            elif len(name) > 200:
-                errors["name"] = "El nombre no puede exceder 200 caracteres"
-
-        # Validar legal_name si se proporciona
-        if "legal_name" in data and data["legal_name"]:
-            if len(data["legal_name"]) > 200:
-                errors["legal_name"] = "La razón social no puede exceder 200 caracteres"
-
-        # Validar tax_id si se proporciona
-        if "tax_id" in data and data["tax_id"]:
-            tax_id = data["tax_id"].strip()
-            if len(tax_id) < 3:
-                errors["tax_id"] = "El tax_id debe tener al menos 3 caracteres"
-            elif len(tax_id) > 50:
-                errors["tax_id"] = "El tax_id no puede exceder 50 caracteres"
+        for field, required, check in _FIELD_SPECS:
+            # Obligatorios: se validan siempre en creación y si vienen en update.
+            # Opcionales: solo si se proporcionan con valor
+            if required:
+                if is_update and field not in data:
+                    continue
+            elif not data.get(field):
+                continue
+
+            message = check(data.get(field))
+            if message:
+                errors[field] = message
 
         if errors:
             raise EntityValidationError("BusinessGroup", errors)
@@ -0,0 +1,72 @@
+"""
+Cache: referencias de Company para validación de FKs
+
+Department, Position, Employee y Branch validan su company_id en cada
+alta/edición (existe, está activa, pertenece al BusinessGroup). Este módulo
+guarda por id una versión ligera de la fila
+({"id", "is_active", "is_deleted", "business_group_id"}) en memoria del
+proceso, con TTL, igual que app/entities/countries/cache.py.
+
+Invalidación:
+- Eventos after_update/after_delete del ORM eliminan la entrada al momento
+  (CompanyService actualiza y borra vía ORM).
+- Cambios fuera del ORM o en otro proceso se reflejan al expirar el TTL; por eso
+  es más corto que el de Country/State (el estado activo de una Company cambia más).
+
+Solo se cachean referencias existentes; un id inexistente se vuelve a consultar.
+"""
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import event
+
+from app.shared.cache import MemoryCacheBackend
+from app.entities.companies.models.company import Company
+
+
+COMPANY_REFERENCE_TTL_SECONDS = 60
+
+# Siempre en memoria (independiente de cache.enabled): filas pequeñas y por proceso
+_company_cache = MemoryCacheBackend()
+
+
+def _key(company_id: int) -> str:
+    return f"Company:{company_id}"
+
+
+def get_company_reference(company_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene la referencia cacheada de una Company.
+
+    Args:
+        company_id: ID de la Company
+
+    Returns:
+        Diccionario {"id", "is_active", "is_deleted", "business_group_id"}
+        o None si no está en cache
+    """
+    return _company_cache.get(_key(company_id))
+
+
+def set_company_reference(row: Mapping[str, Any]) -> None:
+    """Guarda la referencia de una Company (fila de CompanyRepository.get_reference)."""
+    _company_cache.set(
+        _key(row["id"]),
+        {
+            "id": row["id"],
+            "is_active": row["is_active"],
+            "is_deleted": row["is_deleted"],
+            "business_group_id": row["business_group_id"]
+        },
+        COMPANY_REFERENCE_TTL_SECONDS
+    )
+
+
+def invalidate_company_reference(company_id: int) -> None:
+    """Elimina la referencia cacheada de una Company."""
+    _company_cache.delete(_key(company_id))
+
+
+@event.listens_for(Company, "after_update")
+@event.listens_for(Company, "after_delete")
+def _invalidate_company(mapper, connection, target) -> None:
+    invalidate_company_reference(target.id)
@@ -3,21 +3,34 @@ Controller: Company
 
 Manejo de requests y responses para Company.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from fastapi import Response
 from sqlalchemy.orm import Session
 
 from app.entities.companies.services.company_service import CompanyService
 from app.entities.companies.models.company import Company
-from app.shared.exceptions import (
-    EntityNotFoundError,
-    EntityAlreadyExistsError,
-    EntityValidationError,
-    BusinessRuleError
+from app.entities.companies.schemas.company_schemas import (
+    COMPANY_LIST_ADAPTER,
+    COMPANY_RESPONSE_ADAPTER
 )
+from app.shared.cache import cache
+
+
+# Prefijo de claves de cache de Company. Cualquier escritura borra el prefijo
+# completo (equivale a subir una versión); con cache.backend = "redis" la
+# invalidación alcanza a todos los workers
+CACHE_PREFIX = "companies:"
+CACHE_TTL_SECONDS = 60
 
 
 class CompanyController:
-    """Controller para Company."""
+    """
+    Controller para Company.
+
+    Las excepciones de dominio (EntityNotFoundError, EntityValidationError, ...)
+    se propagan sin envolver; los handlers globales de main.py las convierten
+    en la respuesta HTTP correspondiente.
+    """
 
     def __init__(self, db: Session):
         """Inicializa el controller con el servicio."""
@@ -29,21 +42,34 @@ class CompanyController:
         current_user_id: Optional[int] = None
     ) -> Company:
         """Crea una nueva Company."""
-        try:
-            return self.service.create_company(data, created_by=current_user_id)
-        except (EntityValidationError, EntityAlreadyExistsError, EntityNotFoundError, BusinessRuleError) as e:
-            raise e
-        except Exception as e:
-            raise Exception(f"Error al crear company: {str(e)}")
-
-    def get_company(self, company_id: int) -> Company:
-        """Obtiene una Company por ID."""
-        try:
-            return self.service.get_company_by_id(company_id)
-        except EntityNotFoundError as e:
-            raise e
-        except Exception as e:
-            raise Exception(f"Error al obtener company: {str(e)}")
+        company = self.service.create_company(data, created_by=current_user_id)
+        cache.delete_prefix(CACHE_PREFIX)
+        return company
+
+    def bulk_create_companies(
+        self,
+        rows: List[Dict[str, Any]],
+        current_user_id: Optional[int] = None
+    ):
+        """Crea varias Companies en una sola operación."""
+        created = self.service.bulk_create_companies(rows, created_by=current_user_id)
+        cache.delete_prefix(CACHE_PREFIX)
+        return created
+
+    def get_company(self, company_id: int) -> Dict[str, Any]:
+        """Obtiene una Company por ID (cache-aside por id)."""
+        key = f"{CACHE_PREFIX}id:{company_id}"
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        company = self.service.get_company_by_id(company_id)
+        result = COMPANY_RESPONSE_ADAPTER.dump_python(
+            COMPANY_RESPONSE_ADAPTER.validate_python(company, from_attributes=True),
+            mode="json"
+        )
+        cache.set(key, result, ttl=CACHE_TTL_SECONDS)
+        return result
 
     def get_all_companies(
         self,
@@ -52,10 +78,7 @@ class CompanyController:
         active_only: bool = True
     ):
         """Obtiene todas las Companies."""
-        try:
-            return self.service.get_all_companies(skip, limit, active_only)
-        except Exception as e:
-            raise Exception(f"Error al listar companies: {str(e)}")
+        return self._json_list(self.service.get_all_companies(skip, limit, active_only))
 
     def update_company(
         self,
@@ -64,12 +87,9 @@ class CompanyController:
         current_user_id: Optional[int] = None
     ) -> Company:
         """Actualiza una Company."""
-        try:
-            return self.service.update_company(company_id, data, updated_by=current_user_id)
-        except (EntityValidationError, EntityAlreadyExistsError, EntityNotFoundError, BusinessRuleError) as e:
-            raise e
-        except Exception as e:
-            raise Exception(f"Error al actualizar company: {str(e)}")
+        company = self.service.update_company(company_id, data, updated_by=current_user_id)
+        cache.delete_prefix(CACHE_PREFIX)
+        return company
 
     def delete_company(
         self,
@@ -77,19 +97,13 @@ class CompanyController:
         current_user_id: Optional[int] = None
     ) -> bool:
         """Elimina una Company (soft delete)."""
-        try:
-            return self.service.delete_company(company_id, deleted_by=current_user_id)
-        except (EntityNotFoundError, BusinessRuleError) as e:
-            raise e
-        except Exception as e:
-            raise Exception(f"Error al eliminar company: {str(e)}")
+        deleted = self.service.delete_company(company_id, deleted_by=current_user_id)
+        cache.delete_prefix(CACHE_PREFIX)
+        return deleted
 
     def search_companies(self, name: str, limit: int = 50):
         """Busca Companies por nombre."""
-        try:
-            return self.service.search_companies(name, limit)
-        except Exception as e:
-            raise Exception(f"Error al buscar companies: {str(e)}")
+        return self.service.search_companies(name, limit)
 
     def paginate_companies(
         self,
@@ -98,7 +112,27 @@ class CompanyController:
         filters: Optional[Dict[str, Any]] = None
     ):
         """Obtiene Companies paginadas."""
-        try:
-            return self.service.paginate_companies(page, per_page, filters)
-        except Exception as e:
-            raise Exception(f"Error al paginar companies: {str(e)}")
+        return self.service.paginate_companies(page, per_page, filters)
+
+    def paginate_companies_keyset(
+        self,
+        cursor: Optional[int] = None,
+        per_page: int = 20,
+        active_only: bool = True
+    ):
+        """Obtiene Companies paginadas por cursor."""
+        return self.service.paginate_companies_keyset(cursor, per_page, active_only)
+
+    @staticmethod
+    def _json_list(companies) -> Response:
+        """
+        Serializa una lista de Companies directo a bytes JSON (pydantic-core).
+
+        Se retorna un Response para que FastAPI no vuelva a validar y
+        serializar el resultado con response_model.
+        """
+        items = COMPANY_LIST_ADAPTER.validate_python(companies)
+        return Response(
+            content=COMPANY_LIST_ADAPTER.dump_json(items),
+            media_type="application/json"
+        )
@@ -11,11 +11,10 @@ Relaciones:
 - 1 Company → N Position
 - 1 Company → N Employee
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index, inspect, text
 from sqlalchemy.orm import relationship
-from datetime import datetime
 
-from database import Base
+from database import Base, utc_now
 
 
 class Company(Base):
@@ -44,8 +43,7 @@ class Company(Base):
     code = Column(
         String(50),
         nullable=False,
-        index=True,
-        comment="Código único de la empresa"
+        comment="Código único de la empresa (entre empresas no eliminadas)"
     )
 
     name = Column(
@@ -87,7 +85,6 @@ class Company(Base):
         Boolean,
         default=True,
         nullable=False,
-        index=True,
         comment="Estado activo/inactivo (soft delete)"
     )
 
@@ -98,18 +95,18 @@ class Company(Base):
         comment="Soft delete flag"
     )
 
-    # Timestamps automáticos
+    # Timestamps automáticos (calculados por Postgres en UTC)
     created_at = Column(
         DateTime,
-        default=datetime.utcnow,
+        server_default=utc_now,
         nullable=False,
         comment="Fecha y hora de creación del registro"
     )
 
     updated_at = Column(
         DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        server_default=utc_now,
+        onupdate=utc_now,
         nullable=False,
         comment="Fecha y hora de última actualización"
     )
@@ -143,26 +140,36 @@ class Company(Base):
     )
 
     # ==================== RELATIONSHIPS ====================
+    # lazy="raise" en las relaciones N → 1: CompanyResponse solo expone columnas
+    # y FKs, así que un acceso accidental en un listado falla en lugar de emitir
+    # una consulta por fila; quien las necesite debe pedirlas con
+    # selectinload()/joinedload() en la query.
+
     # Relación con BusinessGroup (N → 1)
     business_group = relationship(
         "BusinessGroup",
-        foreign_keys=[business_group_id]
+        back_populates="companies",
+        foreign_keys=[business_group_id],
+        lazy="raise"
     )
 
     # Relaciones de auditoría con Usuario
     creator = relationship(
         "User",
-        foreign_keys=[created_by]
+        foreign_keys=[created_by],
+        lazy="raise"
     )
 
     updater = relationship(
         "User",
-        foreign_keys=[updated_by]
+        foreign_keys=[updated_by],
+        lazy="raise"
     )
 
     deleter = relationship(
         "User",
-        foreign_keys=[deleted_by]
+        foreign_keys=[deleted_by],
+        lazy="raise"
     )
 
     # Relaciones con entidades hijas (1 → N)
@@ -187,8 +194,33 @@ class Company(Base):
         foreign_keys="Employee.company_id"
     )
 
+    # ==================== INDEXES ====================
+    # Parciales sobre filas no eliminadas: las consultas de la app siempre filtran
+    # is_deleted = false, así que los índices son más chicos y no requieren combinar
+    # índices de una sola columna.
+    __table_args__ = (
+        # Companies de un grupo (get_by_business_group, con o sin active_only)
+        Index(
+            'ix_companies_bg_active', 'business_group_id', 'is_active',
+            postgresql_where=text('is_deleted = false')
+        ),
+        # Unicidad y búsqueda de code (find_conflicts, get_by_code, ON CONFLICT de create_returning)
+        Index(
+            'ix_companies_code_live', 'code', unique=True,
+            postgresql_where=text('is_deleted = false')
+        ),
+    )
+
+    def _loaded(self, name: str):
+        """Valor ya cargado del atributo, sin disparar lazy load ni refresh de expirados."""
+        return inspect(self).dict.get(name, "<unloaded>")
+
     def __repr__(self):
-        return f"<Company(id={self.id}, code='{self.code}', name='{self.name}', business_group_id={self.business_group_id})>"
+        # Solo lee el estado en memoria: seguro en logs, debugger e instancias desasociadas
+        return (
+            f"<Company(id={self._loaded('id')}, code='{self._loaded('code')}', "
+            f"name='{self._loaded('name')}', business_group_id={self._loaded('business_group_id')})>"
+        )
 
     def __str__(self):
-        return f"{self.name} ({self.code})"
\ No newline at end of file
+        return f"{self._loaded('name')} ({self._loaded('code')})"
\ No newline at end of file
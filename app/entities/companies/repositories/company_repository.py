@@ -4,11 +4,59 @@ Repository: Company
 Operaciones de base de datos para Company.
 Hereda de BaseRepository para operaciones CRUD estándar.
 """
-from typing import Optional, List
+import re
+from typing import Any, Dict, Iterable, Optional, List, Set, Tuple
+from sqlalchemy import and_, bindparam, exists, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row, RowMapping
 from sqlalchemy.orm import Session
 
 from app.shared.base_repository import BaseRepository
+from app.shared.unit_of_work import commit
 from app.entities.companies.models.company import Company
+from app.entities.companies.cache import get_company_reference, set_company_reference
+from app.entities.branches.models.branch import Branch
+from app.entities.departments.models.department import Department
+from app.entities.positions.models.position import Position
+from app.entities.employees.models.employee import Employee
+
+# SELECTs de lookups frecuentes construidos una sola vez: los valores viajan
+# como bindparam, así la clave del cache de compilación es estable y no se
+# arma un Query por llamada
+_SEL_BY_TAX_ID = select(Company).where(
+    Company.tax_id == bindparam("tax_id")
+).limit(1)
+
+_SEL_BY_CODE = select(Company).where(
+    Company.is_deleted.is_(False),
+    Company.code == bindparam("code")
+).limit(1)
+
+_SEL_BY_BG = select(Company).where(
+    Company.is_deleted.is_(False),
+    Company.business_group_id == bindparam("bg")
+)
+
+_SEL_BY_BG_ACTIVE = _SEL_BY_BG.where(Company.is_active.is_(True))
+
+_SEL_REFERENCE = select(
+    Company.id, Company.is_active, Company.is_deleted, Company.business_group_id
+).where(Company.id == bindparam("id"))
+
+# Términos con forma de código (TECH-MX, 1001, MFG_02): letras/dígitos con al menos
+# un dígito o separador. search_by_name intenta primero un prefijo sobre code
+_CODE_LIKE_RE = re.compile(r"(?=.*[0-9_-])[A-Za-z0-9_-]{1,50}")
+
+# Por debajo de 3 caracteres no hay trigramas completos que aprovechar en '%q%'
+_TRGM_MIN_LENGTH = 3
+
+# Columnas de Company para listados de solo lectura (mappings, sin instancias ORM)
+_COMPANY_COLUMNS = tuple(Company.__table__.columns)
+_COMPANY_COLUMN_NAMES = frozenset(c.name for c in _COMPANY_COLUMNS)
+
+# Filas por sentencia en cargas masivas: entre 1,000 y 10,000 filas el costo
+# por round-trip ya es despreciable y las listas IN / VALUES siguen siendo manejables
+BULK_CHUNK_SIZE = 1000
 
 
 class CompanyRepository(BaseRepository[Company]):
@@ -46,15 +94,8 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             Lista de Companies del BusinessGroup
         """
-        query = self.db.query(Company).filter(
-            Company.business_group_id == business_group_id,
-            Company.is_deleted == False
-        )
-
-        if active_only:
-            query = query.filter(Company.is_active == True)
-
-        return query.all()
+        stmt = _SEL_BY_BG_ACTIVE if active_only else _SEL_BY_BG
+        return list(self.db.execute(stmt, {"bg": business_group_id}).scalars())
 
     def get_by_tax_id(self, tax_id: str) -> Optional[Company]:
         """
@@ -66,13 +107,11 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             Company encontrada o None
         """
-        return self.db.query(Company).filter(
-            Company.tax_id == tax_id
-        ).first()
+        return self.db.execute(_SEL_BY_TAX_ID, {"tax_id": tax_id}).scalar_one_or_none()
 
     def get_by_code(self, code: str) -> Optional[Company]:
         """
-        Busca una Company por su código.
+        Busca una Company no eliminada por su código.
 
         Args:
             code: Código de la company
@@ -80,14 +119,41 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             Company encontrada o None
         """
-        return self.db.query(Company).filter(
-            Company.code == code
-        ).first()
+        return self.db.execute(_SEL_BY_CODE, {"code": code}).scalar_one_or_none()
+
+    def get_reference(self, company_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Referencia ligera de una Company para validar FKs (cache por proceso).
+
+        Lee primero de app.entities.companies.cache; si no está, consulta solo
+        las columnas necesarias y la guarda.
+
+        Args:
+            company_id: ID de la company
+
+        Returns:
+            Diccionario {"id", "is_active", "is_deleted", "business_group_id"}
+            o None si no existe
+        """
+        cached = get_company_reference(company_id)
+        if cached is not None:
+            return cached
+
+        row = self.db.execute(_SEL_REFERENCE, {"id": company_id}).mappings().one_or_none()
+        if row is None:
+            return None
+
+        set_company_reference(row)
+        return dict(row)
 
     def search_by_name(self, name: str, limit: int = 50) -> List[Company]:
         """
         Busca Companies por nombre (case-insensitive).
 
+        Si el término parece un código (o es muy corto para trigramas) se
+        intenta primero code ILIKE 'q%' sobre Companies no eliminadas; solo si
+        no hay coincidencias se busca '%q%' en name, legal_name y code.
+
         Args:
             name: Término a buscar en el nombre
             limit: Máximo de resultados
@@ -95,53 +161,245 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             Lista de Companies que coinciden
         """
+        if len(name) < _TRGM_MIN_LENGTH or _CODE_LIKE_RE.fullmatch(name):
+            # "_" es comodín en LIKE: se escapa para que el prefijo sea literal
+            prefix = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            companies = self.db.execute(
+                select(Company)
+                .where(Company.is_deleted.is_(False), Company.code.ilike(prefix + "%"))
+                .order_by(Company.code)
+                .limit(limit)
+            ).scalars().all()
+            if companies:
+                return list(companies)
+
         return self.search(
             search_term=name,
             search_fields=["name", "legal_name", "code"],
             limit=limit
         )
 
-    def tax_id_exists(self, tax_id: str, exclude_id: Optional[int] = None) -> bool:
+    def list_rows(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = True
+    ) -> List[RowMapping]:
         """
-        Verifica si un tax_id ya está en uso.
+        Equivalente a get_all() pero retorna mappings columna → valor.
+
+        No crea instancias ORM ni las registra en la sesión; para listados
+        que solo se serializan en la respuesta.
 
         Args:
-            tax_id: Tax ID a verificar
-            exclude_id: ID a excluir de la búsqueda (útil para updates)
+            skip: Registros a saltar
+            limit: Máximo de registros
+            active_only: Si True, solo companies activas
 
         Returns:
-            True si el tax_id ya existe, False si no
+            Lista de mappings de Company
         """
-        if not tax_id:
-            return False
+        stmt = select(*_COMPANY_COLUMNS)
 
-        query = self.db.query(Company).filter(Company.tax_id == tax_id)
+        if active_only:
+            stmt = stmt.where(Company.is_active == True)
 
-        if exclude_id:
-            query = query.filter(Company.id != exclude_id)
+        return self.db.execute(stmt.offset(skip).limit(limit)).mappings().all()
+
+    def page_after(
+        self,
+        last_id: Optional[int] = None,
+        per_page: int = 20,
+        active_only: bool = True
+    ) -> Tuple[List[RowMapping], bool]:
+        """
+        Paginación keyset por id (WHERE id > last_id ORDER BY id LIMIT n).
+
+        Recorre la PK desde el último id recibido: el costo no crece con la
+        profundidad de la página, a diferencia de OFFSET.
+
+        Args:
+            last_id: id de la última Company de la página anterior (None = primera)
+            per_page: Registros por página
+            active_only: Si True, solo companies activas
+
+        Returns:
+            Tupla (filas de la página como mappings, hay_más_páginas)
+        """
+        stmt = select(*_COMPANY_COLUMNS).where(Company.is_deleted.is_(False))
+
+        if active_only:
+            stmt = stmt.where(Company.is_active.is_(True))
+
+        if last_id is not None:
+            stmt = stmt.where(Company.id > last_id)
 
-        return query.first() is not None
+        # Una fila extra indica si existe página siguiente sin un COUNT
+        rows = self.db.execute(stmt.order_by(Company.id).limit(per_page + 1)).mappings().all()
+        return rows[:per_page], len(rows) > per_page
 
-    def code_exists(self, code: str, exclude_id: Optional[int] = None) -> bool:
+    def find_conflicts(
+        self,
+        code: Optional[str],
+        tax_id: Optional[str],
+        exclude_id: Optional[int] = None
+    ) -> Tuple[bool, bool]:
         """
-        Verifica si un código ya está en uso.
+        Verifica code y tax_id en una sola consulta.
+
+        Criterios de unicidad (los mismos de los índices únicos):
+        - code: solo choca con Companies no eliminadas; el código de una
+          Company eliminada puede reutilizarse (ix_companies_code_live)
+        - tax_id: choca con cualquier fila, incluso eliminadas (único global)
+
+        Como ambos son únicos, a lo sumo hay 2 filas en conflicto.
 
         Args:
-            code: Código a verificar
+            code: Código a verificar (None para omitir)
+            tax_id: Tax ID a verificar (None/vacío para omitir)
             exclude_id: ID a excluir de la búsqueda (útil para updates)
 
         Returns:
-            True si el código ya existe, False si no
+            Tupla (code_taken, tax_id_taken)
         """
-        query = self.db.query(Company).filter(Company.code == code)
+        conditions = []
+        if code is not None:
+            conditions.append(and_(Company.is_deleted == False, Company.code == code))
+        if tax_id:
+            conditions.append(Company.tax_id == tax_id)
+
+        if not conditions:
+            return False, False
+
+        query = self.db.query(Company.code, Company.tax_id, Company.is_deleted).filter(
+            or_(*conditions)
+        )
 
         if exclude_id:
             query = query.filter(Company.id != exclude_id)
 
-        return query.first() is not None
+        code_taken = tax_id_taken = False
+        for row_code, row_tax_id, row_deleted in query.limit(2).all():
+            if code is not None and row_code == code and not row_deleted:
+                code_taken = True
+            if tax_id and row_tax_id == tax_id:
+                tax_id_taken = True
+
+        return code_taken, tax_id_taken
+
+    def create_returning(self, data: Dict[str, Any]) -> Optional[Row]:
+        """
+        Crea con INSERT ... ON CONFLICT DO NOTHING RETURNING en un solo round-trip.
+
+        Sin conflict target: Postgres descarta la fila ante cualquier índice
+        único (ix_companies_code_live para code, el único global de tax_id),
+        de forma atómica y sin consulta previa.
+
+        Args:
+            data: Datos de la Company (se ignoran claves que no son columnas)
+
+        Returns:
+            Fila creada (atributos como el modelo), o None si code o tax_id ya existen
+        """
+        values = {k: v for k, v in data.items() if k in _COMPANY_COLUMN_NAMES}
+        row = self.db.execute(
+            insert(Company)
+            .values(**values)
+            .on_conflict_do_nothing()
+            .returning(*_COMPANY_COLUMNS)
+        ).one_or_none()
+        commit(self.db)
+        return row
+
+    def existing_codes_and_tax_ids(
+        self,
+        codes: Iterable[str],
+        tax_ids: Iterable[str],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Tuple[Set[str], Set[str]]:
+        """
+        Retorna cuáles de los codes y tax_ids ya están en uso.
+
+        Una consulta por bloque de chunk_size valores (code IN (...) OR
+        tax_id IN (...)), con los mismos criterios que find_conflicts.
+
+        Args:
+            codes: Códigos a verificar
+            tax_ids: Tax IDs a verificar
+            chunk_size: Valores de cada lista por consulta
+
+        Returns:
+            Tupla (codes_en_uso, tax_ids_en_uso)
+        """
+        codes = list(codes)
+        tax_ids = list(tax_ids)
+        taken_codes: Set[str] = set()
+        taken_tax_ids: Set[str] = set()
+
+        for start in range(0, max(len(codes), len(tax_ids)), chunk_size):
+            code_chunk = codes[start:start + chunk_size]
+            tax_id_chunk = tax_ids[start:start + chunk_size]
+
+            conditions = []
+            if code_chunk:
+                conditions.append(and_(Company.is_deleted == False, Company.code.in_(code_chunk)))
+            if tax_id_chunk:
+                conditions.append(Company.tax_id.in_(tax_id_chunk))
+
+            rows = self.db.execute(
+                select(Company.code, Company.tax_id, Company.is_deleted).where(or_(*conditions))
+            ).all()
+
+            for row in rows:
+                if not row.is_deleted and row.code in code_chunk:
+                    taken_codes.add(row.code)
+                if row.tax_id is not None and row.tax_id in tax_id_chunk:
+                    taken_tax_ids.add(row.tax_id)
+
+        return taken_codes, taken_tax_ids
+
+    def create_many_returning(
+        self,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> List[RowMapping]:
+        """
+        Crea varias Companies con un INSERT ... RETURNING por bloque.
+
+        Todos los bloques van en la misma transacción (un solo commit al
+        final): si uno falla no se inserta ninguna fila.
+
+        Args:
+            rows: Datos de cada Company (se ignoran claves que no son columnas)
+            chunk_size: Filas por sentencia INSERT
+
+        Returns:
+            Companies creadas como mappings de columnas, en el orden de rows
+        """
+        stmt = insert(Company).returning(*_COMPANY_COLUMNS, sort_by_parameter_order=True)
+        created: List[RowMapping] = []
+
+        for start in range(0, len(rows), chunk_size):
+            values = [
+                {k: v for k, v in row.items() if k in _COMPANY_COLUMN_NAMES}
+                for row in rows[start:start + chunk_size]
+            ]
+            created.extend(self.db.execute(stmt, values).mappings().all())
+
+        commit(self.db)
+        return created
 
     # ==================== MÉTODOS PARA VALIDACIÓN DE DEPENDENCIAS ====================
 
+    def _has_active(self, model, company_id: int) -> bool:
+        """EXISTS de filas activas y no eliminadas de model para la Company."""
+        stmt = select(exists().where(
+            model.company_id == company_id,
+            model.is_active == True,
+            model.is_deleted == False
+        ))
+        return self.db.execute(stmt).scalar()
+
     def has_active_branches(self, company_id: int) -> bool:
         """
         Verifica si la Company tiene Branches activas.
@@ -152,14 +410,7 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             True si tiene branches activas, False si no
         """
-        # TODO: Implementar cuando exista la entidad Branch
-        # from app.entities.branches.models.branch import Branch
-        # return self.db.query(Branch).filter(
-        #     Branch.company_id == company_id,
-        #     Branch.is_active == True,
-        #     Branch.is_deleted == False
-        # ).first() is not None
-        return False
+        return self._has_active(Branch, company_id)
 
     def has_active_departments(self, company_id: int) -> bool:
         """
@@ -171,14 +422,7 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             True si tiene departments activos, False si no
         """
-        # TODO: Implementar cuando exista la entidad Department
-        # from app.entities.departments.models.department import Department
-        # return self.db.query(Department).filter(
-        #     Department.company_id == company_id,
-        #     Department.is_active == True,
-        #     Department.is_deleted == False
-        # ).first() is not None
-        return False
+        return self._has_active(Department, company_id)
 
     def has_active_positions(self, company_id: int) -> bool:
         """
@@ -190,14 +434,7 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             True si tiene positions activas, False si no
         """
-        # TODO: Implementar cuando exista la entidad Position
-        # from app.entities.positions.models.position import Position
-        # return self.db.query(Position).filter(
-        #     Position.company_id == company_id,
-        #     Position.is_active == True,
-        #     Position.is_deleted == False
-        # ).first() is not None
-        return False
+        return self._has_active(Position, company_id)
 
     def has_active_employees(self, company_id: int) -> bool:
         """
@@ -209,11 +446,4 @@ class CompanyRepository(BaseRepository[Company]):
         Returns:
             True si tiene employees activos, False si no
         """
-        # TODO: Implementar cuando exista la entidad Employee
-        # from app.entities.employees.models.employee import Employee
-        # return self.db.query(Employee).filter(
-        #     Employee.company_id == company_id,
-        #     Employee.is_active == True,
-        #     Employee.is_deleted == False
-        # ).first() is not None
-        return False
+        return self._has_active(Employee, company_id)
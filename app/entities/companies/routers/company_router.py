@@ -3,8 +3,8 @@ Router: Company
 
 Endpoints REST API para gestión de Companies.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from database import get_db, User
@@ -12,46 +12,56 @@ from auth import get_current_user
 from app.entities.companies.controllers.company_controller import CompanyController
 from app.entities.companies.schemas.company_schemas import (
     CompanyCreate,
+    CompanyBulkCreate,
     CompanyUpdate,
     CompanyResponse,
     CompanyListResponse,
+    CompanyCursorResponse,
     CompanySearchResponse
 )
-from app.shared.exceptions import (
-    EntityNotFoundError,
-    EntityValidationError,
-    EntityAlreadyExistsError,
-    BusinessRuleError
-)
 
 router = APIRouter(
     prefix="/api/v1/companies",
     tags=["Companies"]
 )
 
+# OFFSET descarta page * per_page filas por request; más allá de este límite usar /keyset
+MAX_OFFSET_PAGE = 100
+
+
+# ==================== DEPENDENCIAS ====================
+
+def get_company_controller(db: Session = Depends(get_db)) -> CompanyController:
+    """Dependencia para obtener el controller de Company (uno por request)."""
+    return CompanyController(db)
+
 
 @router.post("/", response_model=CompanyResponse, status_code=201)
 def create_company(
     company_data: CompanyCreate,
-    db: Session = Depends(get_db),
+    controller: CompanyController = Depends(get_company_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Crea una nueva Company."""
-    try:
-        controller = CompanyController(db)
-        data = company_data.model_dump()
-        company = controller.create_company(data, current_user_id=current_user.id)
-        return company
-    except EntityValidationError as e:
-        raise HTTPException(status_code=422, detail={"message": e.message, "errors": e.details.get("validation_errors", {})})
-    except EntityAlreadyExistsError as e:
-        raise HTTPException(status_code=409, detail=e.message)
-    except EntityNotFoundError as e:
-        raise HTTPException(status_code=404, detail=e.message)
-    except BusinessRuleError as e:
-        raise HTTPException(status_code=400, detail=e.message)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = company_data.model_dump()
+    company = controller.create_company(data, current_user_id=current_user.id)
+    return company
+
+
+@router.post("/bulk", response_model=List[CompanyResponse], status_code=201)
+def bulk_create_companies(
+    bulk_data: CompanyBulkCreate,
+    controller: CompanyController = Depends(get_company_controller),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Crea varias Companies en una sola operación (todo o nada, hasta 10,000).
+
+    Valida todas las filas y las inserta con INSERT ... RETURNING por bloques
+    de 1,000. Los errores de validación se reportan como "[índice].campo".
+    """
+    rows = [company.model_dump() for company in bulk_data.companies]
+    return controller.bulk_create_companies(rows, current_user_id=current_user.id)
 
 
 @router.get("/", response_model=List[CompanyResponse])
@@ -59,103 +69,82 @@ def get_all_companies(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     active_only: bool = Query(True),
-    db: Session = Depends(get_db),
+    controller: CompanyController = Depends(get_company_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Obtiene lista de Companies."""
-    try:
-        controller = CompanyController(db)
-        return controller.get_all_companies(skip, limit, active_only)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return controller.get_all_companies(skip, limit, active_only)
 
 
 @router.get("/paginated", response_model=CompanyListResponse)
 def get_companies_paginated(
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, le=MAX_OFFSET_PAGE, description="Número de página (para recorridos profundos usar /keyset)"),
     per_page: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    controller: CompanyController = Depends(get_company_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Obtiene Companies paginadas."""
-    try:
-        controller = CompanyController(db)
-        result = controller.paginate_companies(page, per_page)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = controller.paginate_companies(page, per_page)
+    return result
+
+
+@router.get("/keyset", response_model=CompanyCursorResponse)
+def get_companies_keyset(
+    cursor: Optional[int] = Query(None, ge=0, description="next_cursor de la página anterior (omitir en la primera)"),
+    per_page: int = Query(20, ge=1, le=100),
+    active_only: bool = Query(True),
+    controller: CompanyController = Depends(get_company_controller),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Obtiene Companies paginadas por cursor (keyset sobre id).
+
+    A diferencia de /paginated no calcula total ni pages (sin COUNT ni OFFSET):
+    el costo es el mismo en cualquier página.
+    """
+    return controller.paginate_companies_keyset(cursor, per_page, active_only)
 
 
 @router.get("/search", response_model=CompanySearchResponse)
 def search_companies(
     q: str = Query(..., min_length=1),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    controller: CompanyController = Depends(get_company_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Busca Companies por nombre."""
-    try:
-        controller = CompanyController(db)
-        companies = controller.search_companies(q, limit)
-        return {"items": companies, "total": len(companies), "query": q}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    companies = controller.search_companies(q, limit)
+    return {"items": companies, "total": len(companies), "query": q}
 
 
 @router.get("/{company_id}", response_model=CompanyResponse)
 def get_company(
     company_id: int,
-    db: Session = Depends(get_db),
+    controller: CompanyController = Depends(get_company_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Obtiene una Company por ID."""
-    try:
-        controller = CompanyController(db)
-        return controller.get_company(company_id)
-    except EntityNotFoundError as e:
-        raise HTTPException(status_code=404, detail=e.message)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return controller.get_company(company_id)
 
 
 @router.put("/{company_id}", response_model=CompanyResponse)
 def update_company(
     company_id: int,
     company_data: CompanyUpdate,
-    db: Session = Depends(get_db),
+    controller: CompanyController = Depends(get_company_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Actualiza una Company."""
-    try:
-        controller = CompanyController(db)
-        data = company_data.model_dump(exclude_unset=True)
-        return controller.update_company(company_id, data, current_user_id=current_user.id)
-    except EntityNotFoundError as e:
-        raise HTTPException(status_code=404, detail=e.message)
-    except EntityValidationError as e:
-        raise HTTPException(status_code=422, detail={"message": e.message, "errors": e.details.get("validation_errors", {})})
-    except EntityAlreadyExistsError as e:
-        raise HTTPException(status_code=409, detail=e.message)
-    except BusinessRuleError as e:
-        raise HTTPException(status_code=400, detail=e.message)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = company_data.model_dump(exclude_unset=True)
+    return controller.update_company(company_id, data, current_user_id=current_user.id)
 
 
 @router.delete("/{company_id}", response_model=CompanyResponse)
 def delete_company(
     company_id: int,
-    db: Session = Depends(get_db),
+    controller: CompanyController = Depends(get_company_controller),
     current_user: User = Depends(get_current_user)
 ):
     """Elimina una Company (soft delete)."""
-    try:
-        controller = CompanyController(db)
-        controller.delete_company(company_id, current_user_id=current_user.id)
-        return controller.get_company(company_id)
-    except EntityNotFoundError as e:
-        raise HTTPException(status_code=404, detail=e.message)
-    except BusinessRuleError as e:
-        raise HTTPException(status_code=400, detail=e.message)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    controller.delete_company(company_id, current_user_id=current_user.id)
+    return controller.get_company(company_id)
@@ -3,7 +3,7 @@ Schemas: Company
 
 Schemas Pydantic v2 para validación de datos de entrada/salida de Company.
 """
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from datetime import datetime
 from typing import Optional, List
 
@@ -53,6 +53,16 @@ class CompanyCreate(CompanyBase):
     pass
 
 
+class CompanyBulkCreate(BaseModel):
+    """Schema para crear varias Companies en una sola operación (POST /bulk)."""
+    companies: List[CompanyCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=10000,
+        description="Companies a crear (todo o nada)"
+    )
+
+
 class CompanyUpdate(BaseModel):
     """Schema para actualizar una Company (PUT/PATCH)."""
     business_group_id: Optional[int] = Field(
@@ -123,6 +133,16 @@ class CompanyListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CompanyCursorResponse(BaseModel):
+    """Schema para página de Companies por cursor (keyset)."""
+    items: List[CompanyResponse]
+    next_cursor: Optional[int] = Field(
+        None,
+        description="Cursor para la siguiente página (null si es la última)"
+    )
+    per_page: int
+
+
 class CompanySearchResponse(BaseModel):
     """Schema para búsqueda de Companies."""
     items: List[CompanyResponse]
@@ -130,3 +150,9 @@ class CompanySearchResponse(BaseModel):
     query: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Adapter precompilado (el schema se construye una sola vez al importar).
+# Validar listas con un adapter evita la validación item por item.
+COMPANY_RESPONSE_ADAPTER = TypeAdapter(CompanyResponse)
+COMPANY_LIST_ADAPTER = TypeAdapter(list[CompanyResponse])
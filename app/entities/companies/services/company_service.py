@@ -4,6 +4,8 @@ Service: Company
 Lógica de negocio y validaciones para Company.
 """
 from typing import Optional, Dict, Any, List
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.entities.companies.repositories.company_repository import CompanyRepository
@@ -13,7 +15,9 @@ from app.shared.exceptions import (
     EntityNotFoundError,
     EntityAlreadyExistsError,
     EntityValidationError,
-    BusinessRuleError
+    BusinessRuleError,
+    DataIntegrityError,
+    handle_sqlalchemy_error
 )
 
 
@@ -41,7 +45,7 @@ class CompanyService:
             created_by: ID del usuario que crea el registro
 
         Returns:
-            Company creada
+            Fila RETURNING de la Company creada (mismos atributos que el modelo)
 
         Raises:
             EntityValidationError: Si los datos no son válidos
@@ -63,29 +67,115 @@ class CompanyService:
                 details={"business_group_id": data["business_group_id"]}
             )
 
-        # Validar que tax_id sea único si se proporciona
-        if data.get("tax_id"):
-            if self.repository.tax_id_exists(data["tax_id"]):
-                raise EntityAlreadyExistsError(
-                    "Company",
-                    "tax_id",
-                    data["tax_id"]
-                )
+        # Agregar auditoría
+        if created_by:
+            data["created_by"] = created_by
 
-        # Validar que code sea único
-        if self.repository.code_exists(data["code"]):
-            raise EntityAlreadyExistsError(
-                "Company",
-                "code",
-                data["code"]
+        # INSERT ... ON CONFLICT DO NOTHING RETURNING: los índices únicos validan
+        # code y tax_id en el mismo round-trip (sin carrera entre requests)
+        try:
+            company = self.repository.create_returning(data)
+        except IntegrityError as e:
+            self.db.rollback()
+            raise handle_sqlalchemy_error(e, "Company")
+
+        if company is None:
+            # Solo en el caso de conflicto: identificar qué campo chocó
+            self._check_unique_fields(data.get("code"), data.get("tax_id"))
+            raise DataIntegrityError(
+                "No se pudo crear la Company por un conflicto concurrente de code o tax_id",
+                details={"code": data.get("code"), "tax_id": data.get("tax_id")}
             )
 
-        # Agregar auditoría
+        return company
+
+    def bulk_create_companies(
+        self,
+        rows: List[Dict[str, Any]],
+        created_by: Optional[int] = None
+    ) -> List[RowMapping]:
+        """
+        Crea varias Companies en una sola operación (todo o nada).
+
+        Round-trips acotados sin importar el número de filas: una consulta
+        para los BusinessGroups, una por bloque para codes/tax_ids existentes
+        y un INSERT ... RETURNING por bloque.
+
+        Args:
+            rows: Datos de cada Company
+            created_by: ID del usuario que crea los registros
+
+        Returns:
+            Companies creadas (mappings de columnas), en el orden recibido
+
+        Raises:
+            EntityValidationError: Si alguna fila no es válida o hay valores repetidos en el lote
+            EntityAlreadyExistsError: Si algún tax_id o code ya existe
+            EntityNotFoundError: Si algún business_group_id no existe
+            BusinessRuleError: Si algún business_group no está activo
+        """
+        # 1. Validación de campos por fila (errores con prefijo de índice)
+        errors = {}
+        for index, data in enumerate(rows):
+            try:
+                self._validate_company_data(data)
+            except EntityValidationError as e:
+                for field, message in e.details.get("validation_errors", {}).items():
+                    errors[f"[{index}].{field}"] = message
+
+        # 2. code / tax_id repetidos dentro del mismo lote
+        seen_codes: Dict[str, int] = {}
+        seen_tax_ids: Dict[str, int] = {}
+        for index, data in enumerate(rows):
+            code = data.get("code")
+            if code in seen_codes:
+                errors[f"[{index}].code"] = f"Código repetido en el lote (fila {seen_codes[code]})"
+            else:
+                seen_codes[code] = index
+
+            tax_id = data.get("tax_id")
+            if tax_id:
+                if tax_id in seen_tax_ids:
+                    errors[f"[{index}].tax_id"] = f"tax_id repetido en el lote (fila {seen_tax_ids[tax_id]})"
+                else:
+                    seen_tax_ids[tax_id] = index
+
+        if errors:
+            raise EntityValidationError("Company", errors)
+
+        # 3. BusinessGroups de todas las filas en una sola consulta
+        active_map = self.business_group_repository.get_active_map(
+            {data["business_group_id"] for data in rows}
+        )
+        for data in rows:
+            business_group_id = data["business_group_id"]
+            if business_group_id not in active_map:
+                raise EntityNotFoundError("BusinessGroup", business_group_id)
+            if not active_map[business_group_id]:
+                raise BusinessRuleError(
+                    f"El BusinessGroup {business_group_id} no está activo",
+                    details={"business_group_id": business_group_id}
+                )
+
+        # 4. codes / tax_ids ya existentes en la BD
+        taken_codes, taken_tax_ids = self.repository.existing_codes_and_tax_ids(
+            seen_codes.keys(), seen_tax_ids.keys()
+        )
+        if taken_tax_ids:
+            raise EntityAlreadyExistsError("Company", "tax_id", min(taken_tax_ids, key=seen_tax_ids.get))
+        if taken_codes:
+            raise EntityAlreadyExistsError("Company", "code", min(taken_codes, key=seen_codes.get))
+
         if created_by:
-            data["created_by"] = created_by
+            for data in rows:
+                data["created_by"] = created_by
 
-        # Crear el registro
-        return self.repository.create(data)
+        # 5. INSERT ... RETURNING por bloques; los índices únicos cubren carreras
+        try:
+            return self.repository.create_many_returning(rows)
+        except IntegrityError as e:
+            self.db.rollback()
+            raise handle_sqlalchemy_error(e, "Company")
 
     def get_company_by_id(self, company_id: int) -> Company:
         """
@@ -110,7 +200,7 @@ class CompanyService:
         skip: int = 0,
         limit: int = 100,
         active_only: bool = True
-    ) -> List[Company]:
+    ) -> List[RowMapping]:
         """
         Obtiene todas las Companies con paginación.
 
@@ -120,9 +210,9 @@ class CompanyService:
             active_only: Solo activas
 
         Returns:
-            Lista de Companies
+            Lista de Companies como mappings de columnas (solo lectura)
         """
-        return self.repository.get_all(skip, limit, active_only)
+        return self.repository.list_rows(skip, limit, active_only)
 
     def get_companies_by_business_group(
         self,
@@ -182,23 +272,12 @@ class CompanyService:
                     details={"business_group_id": data["business_group_id"]}
                 )
 
-        # Validar tax_id único si se está actualizando
-        if "tax_id" in data and data["tax_id"]:
-            if self.repository.tax_id_exists(data["tax_id"], exclude_id=company_id):
-                raise EntityAlreadyExistsError(
-                    "Company",
-                    "tax_id",
-                    data["tax_id"]
-                )
-
-        # Validar code único si se está actualizando
-        if "code" in data:
-            if self.repository.code_exists(data["code"], exclude_id=company_id):
-                raise EntityAlreadyExistsError(
-                    "Company",
-                    "code",
-                    data["code"]
-                )
+        # Validar unicidad de code y tax_id si se están actualizando (una sola consulta)
+        self._check_unique_fields(
+            data.get("code"),
+            data.get("tax_id"),
+            exclude_id=company_id
+        )
 
         # Agregar auditoría
         if updated_by:
@@ -325,16 +404,41 @@ class CompanyService:
             order_direction: Dirección de ordenamiento
 
         Returns:
-            Diccionario con items paginados y metadatos
+            Diccionario con items paginados (mappings de columnas) y metadatos
         """
         return self.repository.paginate(
             page=page,
             per_page=per_page,
             filters=filters,
             order_by=order_by,
-            order_direction=order_direction
+            order_direction=order_direction,
+            rows=True
         )
 
+    def paginate_companies_keyset(
+        self,
+        cursor: Optional[int] = None,
+        per_page: int = 20,
+        active_only: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Obtiene Companies paginadas por cursor (keyset sobre id).
+
+        Args:
+            cursor: id de la última Company de la página anterior (None = primera)
+            per_page: Registros por página
+            active_only: Solo activas
+
+        Returns:
+            Diccionario con items (mappings de columnas), next_cursor y per_page
+        """
+        items, has_more = self.repository.page_after(cursor, per_page, active_only)
+        return {
+            "items": items,
+            "next_cursor": items[-1]["id"] if has_more else None,
+            "per_page": per_page
+        }
+
     # ==================== VALIDACIONES ====================
 
     def _validate_company_data(
@@ -400,3 +504,28 @@ class CompanyService:
 
         if errors:
             raise EntityValidationError("Company", errors)
+
+    def _check_unique_fields(
+        self,
+        code: Optional[str],
+        tax_id: Optional[str],
+        exclude_id: Optional[int] = None
+    ) -> None:
+        """
+        Valida que code y tax_id no estén en uso (una sola consulta).
+
+        Args:
+            code: Código a verificar (None si no se proporciona)
+            tax_id: Tax ID a verificar (None si no se proporciona)
+            exclude_id: ID de la Company a excluir (updates)
+
+        Raises:
+            EntityAlreadyExistsError: Si tax_id o code ya existen
+        """
+        code_taken, tax_id_taken = self.repository.find_conflicts(code, tax_id, exclude_id)
+
+        if tax_id_taken:
+            raise EntityAlreadyExistsError("Company", "tax_id", tax_id)
+
+        if code_taken:
+            raise EntityAlreadyExistsError("Company", "code", code)
@@ -0,0 +1,70 @@
+"""
+Cache: referencias geográficas (Country / State)
+
+Países y estados casi no cambian, pero se validan en cada alta/edición de
+Branch. Este módulo guarda por id una versión ligera de la fila
+({"id", "active", "country_id"}) en memoria del proceso, con TTL.
+
+Invalidación:
+- Eventos after_update/after_delete del ORM eliminan la entrada al momento.
+- Cambios fuera del ORM (SQL directo, query.update) se reflejan al expirar el TTL.
+
+Solo se cachean referencias existentes; un id inexistente se vuelve a consultar.
+"""
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import event
+
+from app.shared.cache import MemoryCacheBackend
+from app.entities.countries.models.country import Country
+from app.entities.states.models.state import State
+
+
+REFERENCE_CACHE_TTL_SECONDS = 300
+
+# Siempre en memoria (independiente de cache.enabled): son pocas filas y por proceso
+_reference_cache = MemoryCacheBackend()
+
+
+def _key(entity: str, entity_id: int) -> str:
+    return f"{entity}:{entity_id}"
+
+
+def get_reference(entity: str, entity_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene la referencia cacheada de un Country o State.
+
+    Args:
+        entity: "Country" o "State"
+        entity_id: ID de la entidad
+
+    Returns:
+        Diccionario {"id", "active", "country_id"} o None si no está en cache
+    """
+    return _reference_cache.get(_key(entity, entity_id))
+
+
+def set_reference(entity: str, row: Mapping[str, Any]) -> None:
+    """Guarda la referencia de un Country o State (fila de get_reference_rows)."""
+    _reference_cache.set(
+        _key(entity, row["id"]),
+        {"id": row["id"], "active": row["active"], "country_id": row["country_id"]},
+        REFERENCE_CACHE_TTL_SECONDS
+    )
+
+
+def invalidate_reference(entity: str, entity_id: int) -> None:
+    """Elimina la referencia cacheada de un Country o State."""
+    _reference_cache.delete(_key(entity, entity_id))
+
+
+@event.listens_for(Country, "after_update")
+@event.listens_for(Country, "after_delete")
+def _invalidate_country(mapper, connection, target) -> None:
+    invalidate_reference("Country", target.id)
+
+
+@event.listens_for(State, "after_update")
+@event.listens_for(State, "after_delete")
+def _invalidate_state(mapper, connection, target) -> None:
+    invalidate_reference("State", target.id)
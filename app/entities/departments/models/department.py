@@ -4,7 +4,7 @@ Model: Department
 Departamentos organizacionales con jerarquia auto-referenciada.
 Pueden ser corporativos (sin branch) o de sucursal especifica.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -65,6 +65,12 @@ class Department(Base):
             '(is_corporate = true AND branch_id IS NULL)',
             name='check_corporate_branch_logic'
         ),
+
+        # Índice parcial para verificar departamentos activos por sucursal
+        Index(
+            'idx_departments_active_branch', 'branch_id',
+            postgresql_where=text('is_active = true AND is_deleted = false')
+        ),
     )
 
     def __repr__(self):
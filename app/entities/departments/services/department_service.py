@@ -60,11 +60,11 @@ class DepartmentService:
         self._validate_department_data(data)
 
         # Validar que company_id existe y está activo
-        company = self.company_repository.get_by_id(data["company_id"])
+        company = self.company_repository.get_reference(data["company_id"])
         if not company:
             raise EntityNotFoundError("Company", data["company_id"])
 
-        if not company.is_active or company.is_deleted:
+        if not company["is_active"] or company["is_deleted"]:
             raise BusinessRuleError(
                 f"La Company {data['company_id']} no está activa",
                 details={"company_id": data["company_id"]}
@@ -249,11 +249,11 @@ class DepartmentService:
 
         # Si se actualiza company_id, validar que existe y está activo
         if "company_id" in data:
-            company = self.company_repository.get_by_id(data["company_id"])
+            company = self.company_repository.get_reference(data["company_id"])
             if not company:
                 raise EntityNotFoundError("Company", data["company_id"])
 
-            if not company.is_active or company.is_deleted:
+            if not company["is_active"] or company["is_deleted"]:
                 raise BusinessRuleError(
                     f"La Company {data['company_id']} no está activa",
                     details={"company_id": data["company_id"]}
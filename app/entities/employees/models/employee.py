@@ -2,7 +2,7 @@
 Employee Model - Empleados del sistema HR
 """
 import enum
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric, CheckConstraint, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -92,6 +92,12 @@ class Employee(Base):
 
         # hire_date no puede ser futura
         CheckConstraint('hire_date <= CURRENT_DATE', name='check_hire_date_not_future'),
+
+        # Índice parcial para verificar empleados activos por sucursal
+        Index(
+            'idx_employees_active_branch', 'branch_id',
+            postgresql_where=text('is_active = true AND is_deleted = false')
+        ),
     )
 
     def __repr__(self):
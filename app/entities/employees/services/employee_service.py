@@ -13,6 +13,7 @@ from app.shared.exceptions import (
     BusinessRuleError,
     EntityAlreadyExistsError
 )
+from app.shared.unit_of_work import atomic, commit
 from auth import hash_password
 
 
@@ -75,7 +76,7 @@ class EmployeeService:
         # Crear Employee
         employee = Employee(**data)
         self.db.add(employee)
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(employee)
 
         return employee
@@ -134,37 +135,38 @@ class EmployeeService:
             # (para fallar rápido si hay errores)
             self._validate_all(employee_data, skip_individual_check=True)
 
-            # 3. Crear Individual + User (si se proveen datos de user)
-            has_user_data = any(k in data for k in user_fields)
+            # 3-5. Individual + User + Employee en una sola transacción:
+            # los commits internos de IndividualService se vuelven flush
+            with atomic(self.db):
+                # 3. Crear Individual + User (si se proveen datos de user)
+                has_user_data = any(k in data for k in user_fields)
+
+                if has_user_data:
+                    # Usa el servicio de Individual para crear con User
+                    individual = self.individual_service.create_individual_with_user(
+                        individual_data,
+                        created_by
+                    )
+                else:
+                    # Crea solo Individual
+                    individual = self.individual_service.create_individual(
+                        individual_data,
+                        created_by
+                    )
+
+                # 4. Crear Employee vinculado al Individual
+                employee_data['individual_id'] = individual.id
+
+                # Si el Individual tiene user_id, lo propagamos al Employee
+                if individual.user_id:
+                    employee_data['user_id'] = individual.user_id
+
+                if created_by:
+                    employee_data['created_by'] = created_by
+
+                employee = Employee(**employee_data)
+                self.db.add(employee)
 
-            if has_user_data:
-                # Usa el servicio de Individual para crear con User
-                individual = self.individual_service.create_individual_with_user(
-                    individual_data,
-                    created_by
-                )
-            else:
-                # Crea solo Individual
-                individual = self.individual_service.create_individual(
-                    individual_data,
-                    created_by
-                )
-
-            # 4. Crear Employee vinculado al Individual
-            employee_data['individual_id'] = individual.id
-
-            # Si el Individual tiene user_id, lo propagamos al Employee
-            if individual.user_id:
-                employee_data['user_id'] = individual.user_id
-
-            if created_by:
-                employee_data['created_by'] = created_by
-
-            employee = Employee(**employee_data)
-            self.db.add(employee)
-
-            # 5. Commit de toda la transacción
-            self.db.commit()
             self.db.refresh(employee)
 
             return employee
@@ -205,7 +207,7 @@ class EmployeeService:
         if updated_by:
             employee.updated_by = updated_by
 
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(employee)
 
         return employee
@@ -242,7 +244,7 @@ class EmployeeService:
         if deleted_by:
             employee.deleted_by = deleted_by
 
-        self.db.commit()
+        commit(self.db)
 
     def get_employee(self, employee_id: int) -> Employee:
         """Obtiene un Employee por ID"""
@@ -331,17 +333,17 @@ class EmployeeService:
 
     def _validate_company_exists_and_belongs_to_bg(self, company_id: int, business_group_id: Optional[int]) -> None:
         """Validación 3: company_id debe existir, estar activo Y pertenecer a business_group"""
-        company = self.company_repository.get_by_id(company_id)
+        company = self.company_repository.get_reference(company_id)
         if not company:
             raise EntityNotFoundError("Company", company_id)
-        if not company.is_active:
+        if not company["is_active"]:
             raise BusinessRuleError(f"Company {company_id} no está activa")
 
         # Verificar que pertenece al business_group especificado
-        if business_group_id and company.business_group_id != business_group_id:
+        if business_group_id and company["business_group_id"] != business_group_id:
             raise BusinessRuleError(
                 f"Company {company_id} no pertenece al BusinessGroup {business_group_id}. "
-                f"Pertenece a BusinessGroup {company.business_group_id}."
+                f"Pertenece a BusinessGroup {company['business_group_id']}."
             )
 
     def _validate_branch_belongs_to_company(self, branch_id: int, company_id: Optional[int]) -> None:
@@ -8,6 +8,7 @@ from app.entities.individuals.repositories.individual_repository import Individu
 from app.entities.individuals.models.individual import Individual
 from app.shared.exceptions import EntityNotFoundError, EntityValidationError, BusinessRuleError, EntityAlreadyExistsError
 from app.shared.base_repository import BaseRepository
+from app.shared.unit_of_work import commit
 from database import User
 from auth import hash_password
 
@@ -242,8 +243,8 @@ class IndividualService:
             individual = Individual(**data)
             self.db.add(individual)
 
-            # 3. Commit de la transacción completa
-            self.db.commit()
+            # 3. Commit de la transacción completa (flush si hay un atomic() externo)
+            commit(self.db)
             self.db.refresh(individual)
 
             return individual
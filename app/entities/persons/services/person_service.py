@@ -684,6 +684,7 @@ class PersonService:
         """
         from datetime import datetime
         from database import User
+        from app.core.permissions import invalidate_user_permissions
 
         # Obtener la persona para verificar si tiene usuario asociado
         person = self.repository.get_by_id(person_id)
@@ -702,6 +703,7 @@ class PersonService:
                 user.updated_by = deleted_by
                 user.updated_at = datetime.utcnow()
                 # No hacer commit aquí, será parte de la transacción del delete de Person
+                invalidate_user_permissions(user.id)
 
     # ==================== MÉTODOS DE MAPEO PARA COMPATIBILIDAD ====================
 
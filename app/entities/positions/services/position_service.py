@@ -54,11 +54,11 @@ class PositionService:
         self._validate_position_data(data)
 
         # Validar que company_id existe y esta activo
-        company = self.company_repository.get_by_id(data["company_id"])
+        company = self.company_repository.get_reference(data["company_id"])
         if not company:
             raise EntityNotFoundError("Company", data["company_id"])
 
-        if not company.is_active or company.is_deleted:
+        if not company["is_active"] or company["is_deleted"]:
             raise BusinessRuleError(
                 f"La Company {data['company_id']} no esta activa",
                 details={"company_id": data["company_id"]}
@@ -153,10 +153,10 @@ class PositionService:
 
         # Si se actualiza company_id, validarlo
         if "company_id" in data and data["company_id"] != position.company_id:
-            company = self.company_repository.get_by_id(data["company_id"])
+            company = self.company_repository.get_reference(data["company_id"])
             if not company:
                 raise EntityNotFoundError("Company", data["company_id"])
-            if not company.is_active or company.is_deleted:
+            if not company["is_active"] or company["is_deleted"]:
                 raise BusinessRuleError(
                     f"La Company {data['company_id']} no esta activa",
                     details={"company_id": data["company_id"]}
@@ -5,11 +5,13 @@ Maneja las operaciones de base de datos para permisos granulares.
 Extiende BaseRepository con consultas específicas para validación híbrida.
 """
 
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.shared.base_repository import BaseRepository
+from app.shared.unit_of_work import commit
 from app.entities.user_permissions.models.user_permission import UserPermission
 
 
@@ -40,6 +42,37 @@ class UserPermissionRepository(BaseRepository[UserPermission]):
 
         return query.all()
 
+    def get_permission_rows(
+        self,
+        user_id: int,
+        active_only: bool = True
+    ) -> List[Tuple[str, str, bool]]:
+        """
+        Obtiene solo (endpoint, method, allowed) de los permisos de un usuario.
+
+        Consulta por columnas: no materializa objetos ORM completos.
+
+        Args:
+            user_id: ID del usuario
+            active_only: Si True, solo retorna permisos activos
+
+        Returns:
+            Lista de tuplas (endpoint, method, allowed)
+        """
+        query = self.db.query(
+            UserPermission.endpoint,
+            UserPermission.method,
+            UserPermission.allowed
+        ).filter(
+            UserPermission.user_id == user_id,
+            UserPermission.is_deleted == False
+        )
+
+        if active_only:
+            query = query.filter(UserPermission.is_active == True)
+
+        return query.all()
+
     def get_permission(
         self,
         user_id: int,
@@ -178,7 +211,7 @@ class UserPermissionRepository(BaseRepository[UserPermission]):
             self.db.add(permission)
             created_permissions.append(permission)
 
-        self.db.commit()
+        commit(self.db)
 
         # Refresh todos los permisos
         for perm in created_permissions:
@@ -224,9 +257,87 @@ class UserPermissionRepository(BaseRepository[UserPermission]):
                 perm.deleted_by = deleted_by
             count += 1
 
-        self.db.commit()
+        commit(self.db)
         return count
 
+    def bulk_replace_by_user(
+        self,
+        user_id: int,
+        permissions: List[dict],
+        updated_by: Optional[int] = None
+    ) -> int:
+        """
+        Reemplaza el set completo de permisos de un usuario en una transacción.
+
+        En lugar de soft delete + inserción fila por fila, ejecuta:
+        1. Un UPDATE que marca como eliminados los permisos actuales
+        2. Un INSERT ... ON CONFLICT (user_id, endpoint, method) DO UPDATE
+           que reactiva/actualiza las filas existentes y crea las nuevas
+
+        Las filas se reutilizan (respetando uq_user_endpoint_method), así que
+        no se acumulan registros eliminados por cada actualización masiva.
+
+        Args:
+            user_id: ID del usuario
+            permissions: Lista de diccionarios con endpoint, method y allowed
+            updated_by: ID del usuario que actualiza (Admin)
+
+        Returns:
+            Número de permisos activos tras el reemplazo
+        """
+        from datetime import datetime
+
+        now = datetime.utcnow()
+
+        # 1. Marcar permisos actuales como eliminados (una sola sentencia)
+        self.db.query(UserPermission).filter(
+            UserPermission.user_id == user_id,
+            UserPermission.is_deleted == False
+        ).update(
+            {
+                UserPermission.is_deleted: True,
+                UserPermission.is_active: False,
+                UserPermission.deleted_at: now,
+                UserPermission.deleted_by: updated_by
+            },
+            synchronize_session=False
+        )
+
+        # 2. Upsert del nuevo set de permisos
+        if permissions:
+            values = [
+                {
+                    "user_id": user_id,
+                    "endpoint": perm["endpoint"],
+                    "method": perm["method"],
+                    "allowed": perm["allowed"],
+                    "is_active": True,
+                    "is_deleted": False,
+                    "created_at": now,
+                    "updated_at": now,
+                    "created_by": updated_by,
+                    "updated_by": updated_by
+                }
+                for perm in permissions
+            ]
+            stmt = pg_insert(UserPermission).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "endpoint", "method"],
+                set_={
+                    "allowed": stmt.excluded.allowed,
+                    "is_active": True,
+                    "is_deleted": False,
+                    "deleted_at": None,
+                    "deleted_by": None,
+                    "updated_at": now,
+                    "updated_by": updated_by
+                }
+            )
+            self.db.execute(stmt)
+
+        commit(self.db)
+        return len(permissions)
+
     def get_allowed_endpoints(
         self,
         user_id: int,
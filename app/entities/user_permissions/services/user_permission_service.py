@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from app.entities.user_permissions.repositories.user_permission_repository import UserPermissionRepository
 from app.entities.user_permissions.models.user_permission import UserPermission
+from app.core.permissions import invalidate_user_permissions
 from app.shared.exceptions import (
     EntityNotFoundError,
     EntityValidationError,
@@ -107,7 +108,9 @@ class UserPermissionService:
             data["created_by"] = created_by
 
         # Crear permiso
-        return self.repository.create(data)
+        permission = self.repository.create(data)
+        invalidate_user_permissions(permission.user_id)
+        return permission
 
     def update_permission(
         self,
@@ -145,7 +148,9 @@ class UserPermissionService:
         if updated_by:
             data["updated_by"] = updated_by
 
-        return self.repository.update(permission_id, data)
+        updated = self.repository.update(permission_id, data)
+        invalidate_user_permissions(permission.user_id)
+        return updated
 
     def delete_permission(
         self,
@@ -169,7 +174,9 @@ class UserPermissionService:
         if not permission:
             raise EntityNotFoundError("UserPermission", permission_id)
 
-        return self.repository.soft_delete(permission_id, deleted_by)
+        deleted = self.repository.soft_delete(permission_id, deleted_by)
+        invalidate_user_permissions(permission.user_id)
+        return deleted
 
     def get_permission(self, permission_id: int) -> UserPermission:
         """
@@ -236,8 +243,8 @@ class UserPermissionService:
 
         Proceso:
         1. Valida estructura del JSON
-        2. Elimina (soft delete) permisos existentes
-        3. Crea nuevos permisos
+        2. Marca como eliminados los permisos existentes
+        3. Upsert de los nuevos permisos (reutiliza filas existentes)
 
         Args:
             user_id: ID del usuario
@@ -271,24 +278,18 @@ class UserPermissionService:
             raise EntityValidationError("BulkPermissionUpdate", errors)
 
         try:
-            # 1. Limpiar permisos existentes
-            self.repository.bulk_delete_by_user(user_id, deleted_by=updated_by)
-            self.repository.db.flush()  # Forzar aplicación de cambios
-
-            # 2. Crear nuevos permisos
-            permissions_to_create = []
-            for endpoint, methods in permissions.items():
-                for method, allowed in methods.items():
-                    permissions_to_create.append({
-                        "user_id": user_id,
-                        "endpoint": endpoint,
-                        "method": method,
-                        "allowed": allowed
-                    })
-
-            if permissions_to_create:
-                self.repository.bulk_create(permissions_to_create, created_by=updated_by)
+            permissions_to_upsert = [
+                {"endpoint": endpoint, "method": method, "allowed": allowed}
+                for endpoint, methods in permissions.items()
+                for method, allowed in methods.items()
+            ]
+
+            # Soft delete + upsert en una sola transacción
+            self.repository.bulk_replace_by_user(
+                user_id, permissions_to_upsert, updated_by=updated_by
+            )
 
+            invalidate_user_permissions(user_id)
             return True
 
         except Exception as e:
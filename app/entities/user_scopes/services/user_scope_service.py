@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from app.entities.user_scopes.repositories.user_scope_repository import UserScopeRepository
 from app.entities.user_scopes.models.user_scope import UserScope
 from app.entities.user_scopes.schemas.enums import ScopeTypeEnum
+from app.core.permissions import invalidate_user_permissions
 from app.shared.exceptions import (
     EntityNotFoundError,
     EntityValidationError,
@@ -168,8 +169,10 @@ class UserScopeService:
         if created_by:
             data["created_by"] = created_by
 
-        # Crear el scope
-        return self.repository.create(data)
+        # Crear el scope (un scope nuevo puede quitar el acceso de Admin global)
+        user_scope = self.repository.create(data)
+        invalidate_user_permissions(data["user_id"])
+        return user_scope
 
     def update_user_scope(
         self,
@@ -199,7 +202,11 @@ class UserScopeService:
         if updated_by:
             data["updated_by"] = updated_by
 
-        return self.repository.update(user_scope_id, data)
+        updated = self.repository.update(user_scope_id, data)
+        invalidate_user_permissions(user_scope.user_id)
+        if data.get("user_id") is not None:
+            invalidate_user_permissions(data["user_id"])
+        return updated
 
     def delete_user_scope(
         self,
@@ -223,7 +230,9 @@ class UserScopeService:
         if not user_scope:
             raise EntityNotFoundError("UserScope", user_scope_id)
 
-        return self.repository.soft_delete(user_scope_id, deleted_by)
+        deleted = self.repository.soft_delete(user_scope_id, deleted_by)
+        invalidate_user_permissions(user_scope.user_id)
+        return deleted
 
     def get_user_scope(self, user_scope_id: int) -> UserScope:
         """
@@ -13,14 +13,31 @@ Características:
 - Extensible para operaciones específicas
 """
 
+from functools import lru_cache
 from typing import TypeVar, Generic, List, Optional, Dict, Any, Type
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy import and_, or_, desc, asc, func, text
 from sqlalchemy.ext.declarative import DeclarativeMeta
 
+from app.shared.unit_of_work import commit
+
 # T representa cualquier modelo SQLAlchemy
 T = TypeVar('T', bound=DeclarativeMeta)
 
+
+@lru_cache(maxsize=256)
+def _order_clause(model: Type[T], field_name: str, descending: bool):
+    """
+    Cláusula ORDER BY para model.field_name, construida una vez por combinación.
+
+    Las combinaciones (modelo, campo, dirección) que llegan desde los
+    endpoints son pocas; reutilizar la misma expresión evita reconstruirla
+    en cada llamada a paginate().
+    """
+    field = getattr(model, field_name)
+    return desc(field) if descending else asc(field)
+
+
 class BaseRepository(Generic[T]):
     """
     Repositorio base genérico para operaciones CRUD estándar.
@@ -59,7 +76,10 @@ class BaseRepository(Generic[T]):
         Ejemplo:
             user = user_repository.get_by_id(123)
         """
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        # Session.get() usa el identity map: si la entidad ya se cargó en
+        # esta sesión se retorna sin consultar la BD. Preferirlo para
+        # verificaciones de existencia de solo lectura.
+        return self.db.get(self.model, id)
 
     def get_all(
         self,
@@ -111,7 +131,7 @@ class BaseRepository(Generic[T]):
                 setattr(db_obj, field, value)
 
         self.db.add(db_obj)
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(db_obj)
         return db_obj
 
@@ -144,7 +164,7 @@ class BaseRepository(Generic[T]):
             from datetime import datetime
             db_obj.updated_at = datetime.utcnow()
 
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(db_obj)
         return db_obj
 
@@ -176,11 +196,11 @@ class BaseRepository(Generic[T]):
             if hasattr(db_obj, 'updated_at'):
                 from datetime import datetime
                 db_obj.updated_at = datetime.utcnow()
-            self.db.commit()
+            commit(self.db)
         else:
             # Hard delete: eliminar físicamente
             self.db.delete(db_obj)
-            self.db.commit()
+            commit(self.db)
 
         return True
 
@@ -224,7 +244,7 @@ class BaseRepository(Generic[T]):
             from datetime import datetime
             db_obj.updated_at = datetime.utcnow()
 
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(db_obj)
         return db_obj
 
@@ -266,6 +286,28 @@ class BaseRepository(Generic[T]):
 
         return query.count()
 
+    def estimated_count(self) -> Optional[int]:
+        """
+        Número estimado de filas de la tabla según las estadísticas de Postgres.
+
+        Lee pg_class.reltuples (actualizado por ANALYZE/autovacuum): no recorre
+        la tabla. No aplica filtros.
+
+        Returns:
+            Estimación de filas, o None si la tabla aún no tiene estadísticas
+
+        Ejemplo:
+            approx_users = user_repository.estimated_count()
+        """
+        estimate = self.db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": self.model.__tablename__}
+        ).scalar()
+
+        if estimate is None or estimate < 0:
+            return None
+        return estimate
+
     def find_by_field(self, field_name: str, value: Any) -> List[T]:
         """
         Busca entidades por un campo específico.
@@ -361,7 +403,10 @@ class BaseRepository(Generic[T]):
         per_page: int = 20,
         filters: Optional[Dict[str, Any]] = None,
         order_by: Optional[str] = None,
-        order_direction: str = "asc"
+        order_direction: str = "asc",
+        use_estimate: bool = False,
+        total: Optional[int] = None,
+        rows: bool = False
     ) -> Dict[str, Any]:
         """
         Paginación avanzada con filtros y ordenamiento.
@@ -372,6 +417,15 @@ class BaseRepository(Generic[T]):
             filters: Filtros a aplicar
             order_by: Campo por el cual ordenar
             order_direction: "asc" o "desc"
+            use_estimate: Si True, total es la estimación de filas de la tabla
+                (estimated_count, ignora filtros) en lugar de un conteo exacto.
+                Útil en tablas grandes donde el total solo se muestra en la UI
+            total: Total ya conocido para estos filtros (ej. cacheado); si se
+                indica no se calcula el conteo
+            rows: Si True, items son mappings columna → valor (columnas de la
+                tabla, sin las calculadas) en lugar de entidades ORM: no se
+                crean instancias ni se registran en la sesión. Para listados
+                que solo se serializan en la respuesta
 
         Returns:
             Diccionario con:
@@ -392,7 +446,20 @@ class BaseRepository(Generic[T]):
             users = result["items"]
             total_pages = result["pages"]
         """
-        query = self.db.query(self.model)
+        if total is None and use_estimate:
+            total = self.estimated_count()
+
+        if rows:
+            entities = [c for c in self.model.__table__.columns if c.computed is None]
+        else:
+            entities = [self.model]
+
+        if total is None:
+            # COUNT(*) OVER () trae el total junto con cada fila de la página:
+            # una sola consulta en lugar de COUNT + SELECT
+            query = self.db.query(*entities, func.count().over().label("total"))
+        else:
+            query = self.db.query(*entities)
 
         # Aplicar filtros
         if filters:
@@ -403,16 +470,31 @@ class BaseRepository(Generic[T]):
 
         # Aplicar ordenamiento
         if order_by and hasattr(self.model, order_by):
-            field = getattr(self.model, order_by)
-            if order_direction.lower() == "desc":
-                query = query.order_by(desc(field))
-            else:
-                query = query.order_by(asc(field))
+            query = query.order_by(
+                _order_clause(self.model, order_by, order_direction.lower() == "desc")
+            )
 
         # Calcular paginación
-        total = query.count()
         offset = (page - 1) * per_page
-        items = query.offset(offset).limit(per_page).all()
+        results = query.offset(offset).limit(per_page).all()
+
+        if rows:
+            # Sin la columna "total" de la ventana
+            width = len(entities)
+            items = [dict(zip(row._fields[:width], row[:width])) for row in results]
+        elif total is not None:
+            items = results
+        else:
+            items = [row[0] for row in results]
+
+        if total is None:
+            if results:
+                total = results[0].total
+            elif offset > 0:
+                # Página fuera de rango: no hay filas de donde leer el total
+                total = query.with_entities(func.count(self.model.id)).order_by(None).scalar()
+            else:
+                total = 0
 
         # Calcular número de páginas
         pages = (total + per_page - 1) // per_page
@@ -0,0 +1,133 @@
+"""
+Cache de aplicación (patrón cache-aside)
+
+Backend configurable desde config.toml [cache]:
+- memory: dict en memoria por proceso (default)
+- redis: servidor Redis compartido entre workers (requiere paquete `redis`)
+
+Si cache.enabled = false, get() siempre retorna None y set() no hace nada,
+por lo que el código que lo usa funciona igual con o sin cache.
+
+Los valores deben ser serializables a JSON (dicts/listas ya serializados
+con model_dump(mode="json")).
+
+Uso:
+    from app.shared.cache import cache
+
+    key = f"branches:all:{skip}:{limit}"
+    data = cache.get(key)
+    if data is None:
+        data = [...]
+        cache.set(key, data, ttl=60)
+
+    # Al escribir, invalidar por prefijo
+    cache.delete_prefix("branches:")
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+
+
+class MemoryCacheBackend:
+    """Backend en memoria con TTL (por proceso)."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+
+class RedisCacheBackend:
+    """Backend Redis (compartido entre workers)."""
+
+    def __init__(self, url: str):
+        import redis  # Dependencia opcional, solo si cache.backend = "redis"
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._client.setex(key, ttl, json.dumps(value))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        keys = list(self._client.scan_iter(match=f"{prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class AppCache:
+    """Fachada de cache: aplica enabled/TTL por defecto sobre el backend."""
+
+    def __init__(self, enabled: bool, backend: str, default_ttl: int, redis_url: str):
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self._backend = None
+
+        if enabled:
+            if backend == "redis":
+                self._backend = RedisCacheBackend(redis_url)
+            else:
+                self._backend = MemoryCacheBackend()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retorna el valor cacheado o None si no existe / expiró / cache deshabilitado."""
+        if self._backend is None:
+            return None
+        return self._backend.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Guarda un valor con TTL en segundos (default: cache.default_ttl)."""
+        if self._backend is None:
+            return
+        self._backend.set(key, value, ttl or self.default_ttl)
+
+    def delete(self, key: str) -> None:
+        """Invalida una clave."""
+        if self._backend is None:
+            return
+        self._backend.delete(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Invalida todas las claves que comienzan con prefix."""
+        if self._backend is None:
+            return
+        self._backend.delete_prefix(prefix)
+
+
+cache = AppCache(
+    enabled=settings.cache_enabled,
+    backend=settings.cache_backend,
+    default_ttl=settings.cache_default_ttl,
+    redis_url=settings.cache_redis_url
+)
@@ -0,0 +1,61 @@
+"""
+Paginación keyset (por cursor)
+
+En lugar de OFFSET (que obliga a Postgres a recorrer y descartar todas las
+filas anteriores), cada página continúa después de la última fila vista:
+
+    WHERE (created_at, id) < (:last_created_at, :last_id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :per_page
+
+El cliente recibe esa última posición como un cursor opaco (base64 de JSON)
+y lo envía para pedir la siguiente página.
+
+Uso:
+    from app.shared.pagination import encode_cursor, decode_cursor
+
+    next_cursor = encode_cursor(last.created_at, last.id)
+    created_at, last_id = decode_cursor(next_cursor)
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Codifica la posición (created_at, id) como cursor opaco.
+
+    Args:
+        created_at: created_at de la última fila de la página
+        id: id de la última fila de la página
+
+    Returns:
+        Cursor url-safe
+    """
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Args:
+        cursor: Cursor recibido del cliente
+
+    Returns:
+        Tupla (created_at, id)
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, json.JSONDecodeError, TypeError, ValueError) as e:
+        raise ValueError("Cursor inválido") from e
@@ -0,0 +1,82 @@
+"""
+Unit of Work - Transacciones que abarcan varias operaciones
+
+Por defecto cada operación de escritura de los repositories hace commit
+inmediato. Cuando un flujo necesita varias escrituras atómicas (ej. crear
+Individual + User + Employee), se envuelve en atomic(): dentro del bloque
+los commits se convierten en flush (se obtienen IDs pero nada se confirma)
+y al salir se hace UN solo commit, o rollback completo si hubo excepción.
+
+Uso:
+    from app.shared.unit_of_work import atomic
+
+    with atomic(db):
+        individual = individual_service.create_individual(data)
+        employee = employee_repository.create({...})
+    # Commit único aquí
+
+Bloques anidados usan SAVEPOINT (db.begin_nested()): un error dentro del
+bloque interno solo revierte hasta el savepoint.
+
+Los repositories/services deben usar commit(db) en lugar de db.commit()
+para respetar el bloque atómico activo.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+# Clave en Session.info que marca un bloque atomic() activo
+_ATOMIC_KEY = "atomic_depth"
+
+
+def in_atomic(db: Session) -> bool:
+    """Indica si la sesión está dentro de un bloque atomic()."""
+    return db.info.get(_ATOMIC_KEY, 0) > 0
+
+
+def commit(db: Session) -> None:
+    """
+    Confirma los cambios, o solo hace flush si hay un bloque atomic() activo.
+
+    Args:
+        db: Sesión de base de datos
+    """
+    if in_atomic(db):
+        db.flush()
+    else:
+        db.commit()
+
+
+@contextmanager
+def atomic(db: Session) -> Iterator[Session]:
+    """
+    Ejecuta el bloque en una sola transacción (SAVEPOINT si ya hay una activa).
+
+    Args:
+        db: Sesión de base de datos
+
+    Yields:
+        La misma sesión
+    """
+    if in_atomic(db):
+        # Bloque anidado: SAVEPOINT, el commit final lo hace el bloque externo
+        db.info[_ATOMIC_KEY] += 1
+        try:
+            with db.begin_nested():
+                yield db
+        finally:
+            db.info[_ATOMIC_KEY] -= 1
+        return
+
+    db.info[_ATOMIC_KEY] = 1
+    try:
+        yield db
+        db.info[_ATOMIC_KEY] = 0
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.info[_ATOMIC_KEY] = 0
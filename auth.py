@@ -4,7 +4,11 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from collections import OrderedDict
+from typing import Optional, Tuple
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # Cargar variables de entorno (opcional)
@@ -43,15 +47,44 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     except JWTError:
         raise HTTPException(status_code=401, detail="Token inválido")
 
-def get_current_user_id(token: str = Depends(OAuth2PasswordBearer(tokenUrl="token"))):
+# Cache LRU de tokens ya verificados: token → (user_id, exp en epoch)
+# Evita repetir la verificación de firma en requests consecutivos del mismo cliente.
+# Las dependencias síncronas corren en varios hilos del threadpool: todo acceso
+# al OrderedDict va bajo _token_cache_lock.
+TOKEN_CACHE_MAXSIZE = 10_000
+_token_cache: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+def decode_access_token(token: str) -> Optional[int]:
+    """Decodifica un JWT y retorna el user_id (claim sub), o None si es inválido/expirado."""
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            if time.time() < cached[1]:
+                _token_cache.move_to_end(token)
+                return cached[0]
+            _token_cache.pop(token, None)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-        return int(user_id)
-    except JWTError:
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+    exp = payload.get("exp")
+    if exp is not None:
+        with _token_cache_lock:
+            _token_cache[token] = (user_id, float(exp))
+            _token_cache.move_to_end(token)
+            if len(_token_cache) > TOKEN_CACHE_MAXSIZE:
+                _token_cache.popitem(last=False)
+    return user_id
+
+def get_current_user_id(token: str = Depends(OAuth2PasswordBearer(tokenUrl="token"))):
+    user_id = decode_access_token(token)
+    if user_id is None:
         raise HTTPException(status_code=401, detail="Token inválido")
+    return user_id
 
 # Funciones de autorización por roles
 def get_current_user(current_user_id: int = Depends(get_current_user_id)):
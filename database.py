@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -9,20 +9,30 @@ from app.config import settings
 # Configuración de la base de datos usando el sistema híbrido
 DATABASE_URL = settings.get_database_url()
 
-# Crear engine con configuración del pool desde settings
+# Crear engine con configuración del pool desde settings.
+# Es un singleton por proceso: controllers/services/repositories reciben la
+# Session de get_db() y NUNCA deben crear su propio engine (cada engine abre
+# su propio pool y agotaría max_connections de Postgres).
 engine = create_engine(
     DATABASE_URL,
     pool_size=settings.db_pool_size,
     max_overflow=settings.db_max_overflow,
     pool_timeout=settings.db_pool_timeout,
     pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,  # Detectar conexiones caídas antes de usarlas
+    pool_use_lifo=settings.db_pool_use_lifo,
     echo=settings.db_echo_sql,  # Mostrar queries SQL en logs si está habilitado
+    query_cache_size=settings.db_query_cache_size,  # Cache de SQL compilado (default SQLAlchemy: 500)
     connect_args={"client_encoding": "utf8"}  # Fix para Windows + psycopg2
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Timestamp UTC calculado por Postgres (equivalente en BD a datetime.utcnow()).
+# Usar como server_default/onupdate en columnas DateTime sin zona horaria.
+utc_now = func.timezone("UTC", func.now())
+
 # Modelo User
 class User(Base):
     __tablename__ = "users"
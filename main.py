@@ -1,5 +1,6 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from typing import Optional
@@ -8,6 +9,7 @@ from database import get_db, create_tables, User, ExampleEntity
 # COMENTADO TEMPORALMENTE: Conflicto con nuevo modelo Person
 # from modules.persons.models import Person
 from auth import hash_password, verify_password, create_access_token, verify_token, get_current_user_id, get_current_user, require_admin, require_manager_or_admin, require_collaborator_or_better, require_any_user
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -45,10 +47,16 @@ from app.entities.positions.models.position import Position
 from app.entities.individuals.models.individual import Individual
 from app.entities.employees.models.employee import Employee
 
+from app.shared.exceptions import BaseAppException, EntityValidationError
+from app.core.permissions import invalidate_user_permissions
+
+logger = logging.getLogger(__name__)
+
 # Crear aplicación FastAPI con configuración de seguridad para Swagger
 app = FastAPI(
     title=os.getenv("APP_NAME", "HR System API"),
     version=os.getenv("VERSION", "1.0.0"),
+    default_response_class=ORJSONResponse,  # orjson: serialización más rápida que json stdlib
     openapi_tags=[
         {"name": "auth", "description": "Operaciones de autenticación"},
         {"name": "users", "description": "Gestión de usuarios"},
@@ -83,6 +91,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Handlers globales de excepciones: los controllers/routers dejan propagar
+# las excepciones de dominio y aquí se traducen a HTTP una sola vez.
+@app.exception_handler(BaseAppException)
+async def app_exception_handler(request: Request, exc: BaseAppException):
+    """Excepciones de dominio → status_code de la excepción (404, 409, 422, ...)."""
+    if isinstance(exc, EntityValidationError):
+        detail = {"message": exc.message, "errors": exc.details.get("validation_errors", {})}
+    else:
+        detail = exc.message
+    return ORJSONResponse(status_code=exc.status_code, content={"detail": detail})
+
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Errores no esperados → 500 genérico; el detalle queda solo en el log."""
+    logger.exception("Error no controlado en %s %s", request.method, request.url.path)
+    return ORJSONResponse(status_code=500, content={"detail": "Error interno del servidor"})
+
 # Configuración OAuth2 para Swagger
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -254,6 +280,8 @@ def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_d
         setattr(user, field, value)
 
     db.commit()
+    # Rol / is_active pueden cambiar el acceso de Admin global cacheado
+    invalidate_user_permissions(user_id)
     db.refresh(user)
     return {"id": user.id, "email": user.email, "name": user.name, "is_active": user.is_active}
 
@@ -266,6 +294,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user = Depe
     # Soft delete usando is_deleted
     user.is_deleted = True
     db.commit()
+    invalidate_user_permissions(user_id)
     return {"message": "Usuario eliminado exitosamente (soft delete)"}
 
 @app.delete("/users/{user_id}/hard", tags=["users"], summary="Eliminar usuario permanentemente (hard delete)")
@@ -277,6 +306,7 @@ def hard_delete_user(user_id: int, db: Session = Depends(get_db), current_user =
     # Hard delete - eliminación permanente
     db.delete(user)
     db.commit()
+    invalidate_user_permissions(user_id)
     return {"message": "Usuario eliminado permanentemente (hard delete)"}
 
 @app.patch("/users/{user_id}/activate", tags=["users"], summary="Activar usuario")
@@ -287,6 +317,7 @@ def activate_user(user_id: int, db: Session = Depends(get_db), current_user = De
 
     user.is_active = True
     db.commit()
+    invalidate_user_permissions(user_id)
     return {"message": "Usuario activado exitosamente"}
 
 @app.patch("/users/{user_id}/deactivate", tags=["users"], summary="Desactivar usuario")
@@ -297,6 +328,7 @@ def deactivate_user(user_id: int, db: Session = Depends(get_db), current_user =
 
     user.is_active = False
     db.commit()
+    invalidate_user_permissions(user_id)
     return {"message": "Usuario desactivado exitosamente"}
 
 # Endpoints de ExampleEntity (plantilla para replicar)
@@ -432,6 +464,14 @@ def create_example_with_user(data: ExampleWithUserCreate, db: Session = Depends(
 def health_check(db: Session = Depends(get_db)):
     return {"status": "ok", "database": "connected"}
 
+# Ajustar el threadpool donde corren los endpoints síncronos (def).
+# Debe ejecutarse dentro del event loop, por eso es async.
+@app.on_event("startup")
+async def configure_threadpool():
+    import anyio.to_thread
+    from app.config import settings
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
 # Crear admin por defecto al iniciar
 @app.on_event("startup")
 def startup_event():
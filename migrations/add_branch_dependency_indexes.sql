@@ -0,0 +1,13 @@
+-- Migration: Partial indexes for active branch dependencies
+-- Date: 2026-10-16
+-- Description: BranchRepository.has_active_departments / has_active_employees ejecutan
+--              SELECT 1 ... WHERE branch_id = :id AND is_active AND NOT is_deleted LIMIT 1;
+--              estos índices parciales lo resuelven con un solo index probe
+
+CREATE INDEX IF NOT EXISTS idx_departments_active_branch
+    ON departments (branch_id)
+    WHERE is_active = true AND is_deleted = false;
+
+CREATE INDEX IF NOT EXISTS idx_employees_active_branch
+    ON employees (branch_id)
+    WHERE is_active = true AND is_deleted = false;
@@ -0,0 +1,12 @@
+-- Migration: Partial composite indexes for active branch listings
+-- Date: 2026-10-16
+-- Description: Cubre exactamente el filtro de get_by_company/get_by_country con active_only=True
+--              (is_active AND NOT is_deleted) y su ORDER BY id, en lugar de combinar 3 índices simples
+
+CREATE INDEX IF NOT EXISTS idx_branches_active_company
+    ON branches (company_id, id)
+    WHERE is_active = true AND is_deleted = false;
+
+CREATE INDEX IF NOT EXISTS idx_branches_active_country
+    ON branches (country_id, id)
+    WHERE is_active = true AND is_deleted = false;
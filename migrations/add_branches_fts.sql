@@ -0,0 +1,13 @@
+-- Migration: Add full-text search column to branches
+-- Date: 2026-10-16
+-- Description: Columna generada search_vector (tsvector de name, code y city) con índice GIN.
+--              BranchRepository.search la usa con websearch_to_tsquery + ts_rank
+--              en lugar de tres ILIKE combinados con OR. Requiere PostgreSQL 12+.
+
+ALTER TABLE branches
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(code, '') || ' ' || coalesce(city, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_branches_fts ON branches USING GIN (search_vector);
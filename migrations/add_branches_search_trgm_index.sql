@@ -0,0 +1,15 @@
+-- Migration: Trigram expression index for branch search
+-- Date: 2026-10-16
+-- Description: BranchRepository.search combina full-text (idx_branches_fts) con similitud de
+--              trigramas (operador %>) sobre name || code || city. Este índice GIN sobre la
+--              misma expresión reemplaza a los índices de trigramas por columna, que ya no se usan
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- La expresión debe ser idéntica a _SEARCH_TEXT en branch_repository.py
+CREATE INDEX IF NOT EXISTS ix_branches_trgm ON branches
+    USING GIN ((coalesce(name, '') || ' ' || coalesce(code, '') || ' ' || coalesce(city, '')) gin_trgm_ops);
+
+DROP INDEX IF EXISTS idx_branches_name_trgm;
+DROP INDEX IF EXISTS idx_branches_code_trgm;
+DROP INDEX IF EXISTS idx_branches_city_trgm;
@@ -0,0 +1,12 @@
+-- Migration: Add trigram GIN indexes for branch search
+-- Date: 2026-10-16
+-- Description: Permite que BranchRepository.search (ILIKE '%q%' sobre name, code y city)
+--              use índices GIN en lugar de un sequential scan de branches
+
+-- Extensión de trigramas (requiere permisos para crear extensiones)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Índices GIN por columna buscada
+CREATE INDEX IF NOT EXISTS idx_branches_name_trgm ON branches USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_branches_code_trgm ON branches USING GIN (code gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_branches_city_trgm ON branches USING GIN (city gin_trgm_ops);
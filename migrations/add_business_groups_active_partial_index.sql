@@ -0,0 +1,10 @@
+-- Migration: Partial index for active business group listings
+-- Date: 2026-10-16
+-- Description: GET /api/v1/business-groups (active_only=true), /paginated y /keyset filtran
+--              is_active = true AND is_deleted = false y ordenan por created_at DESC, id DESC.
+--              Un índice sobre is_active (baja cardinalidad) no se usa; este índice parcial
+--              cubre exactamente ese predicado y el orden
+
+CREATE INDEX IF NOT EXISTS idx_business_groups_active_created
+    ON business_groups (created_at DESC, id DESC)
+    WHERE is_active = true AND is_deleted = false;
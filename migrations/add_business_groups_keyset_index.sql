@@ -0,0 +1,9 @@
+-- Migration: Keyset pagination index for business_groups
+-- Date: 2026-10-16
+-- Description: Soporta GET /api/v1/business-groups/keyset:
+--              WHERE (created_at, id) < (:ts, :id) AND is_deleted = false
+--              ORDER BY created_at DESC, id DESC LIMIT :n
+
+CREATE INDEX IF NOT EXISTS idx_business_groups_created_id
+    ON business_groups (created_at DESC, id DESC)
+    WHERE is_deleted = false;
@@ -0,0 +1,11 @@
+-- Migration: Trigram index for business group name search
+-- Date: 2026-10-16
+-- Description: BusinessGroupRepository.search_by_name filtra con el operador de similitud %
+--              sobre lower(name) y lower(legal_name). Las expresiones del índice deben ser
+--              idénticas a las de la consulta para que el planner lo use
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- CONCURRENTLY no bloquea escrituras; no ejecutar dentro de una transacción
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_business_groups_name_trgm ON business_groups
+    USING GIN (lower(name) gin_trgm_ops, lower(legal_name) gin_trgm_ops);
@@ -0,0 +1,19 @@
+-- Migration: Generated search column for business groups
+-- Date: 2026-10-16
+-- Description: Columna generada search_blob (lower(name) || ' ' || lower(legal_name)) con un solo
+--              índice GIN de trigramas. BusinessGroupRepository.search_by_name filtra con %> sobre
+--              esta columna; reemplaza al índice de dos expresiones idx_business_groups_name_trgm.
+--              Requiere PostgreSQL 12+ (columnas generadas).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE business_groups
+    ADD COLUMN IF NOT EXISTS search_blob TEXT
+    GENERATED ALWAYS AS (lower(name) || ' ' || lower(coalesce(legal_name, ''))) STORED;
+
+COMMENT ON COLUMN business_groups.search_blob IS 'lower(name || legal_name) para búsqueda por trigramas';
+
+CREATE INDEX IF NOT EXISTS idx_business_groups_search_trgm ON business_groups
+    USING GIN (search_blob gin_trgm_ops);
+
+DROP INDEX IF EXISTS idx_business_groups_name_trgm;
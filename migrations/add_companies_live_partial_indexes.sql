@@ -0,0 +1,21 @@
+-- Migration: Partial indexes on live companies
+-- Date: 2026-10-16
+-- Description: Las consultas de CompanyRepository siempre filtran is_deleted = false.
+--              Reemplaza los índices de una sola columna sobre code e is_active por
+--              índices parciales sobre filas no eliminadas. code pasa a ser único entre
+--              empresas no eliminadas. tax_id conserva su UNIQUE global.
+--              CONCURRENTLY no bloquea escrituras; no ejecutar dentro de una transacción
+
+-- Companies de un grupo (get_by_business_group)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_companies_bg_active
+    ON companies (business_group_id, is_active)
+    WHERE is_deleted = false;
+
+-- Unicidad y búsqueda de code (code_exists, get_by_code).
+-- Falla si ya hay códigos duplicados entre empresas no eliminadas: corregirlos antes
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_companies_code_live
+    ON companies (code)
+    WHERE is_deleted = false;
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_companies_code;
+DROP INDEX CONCURRENTLY IF EXISTS ix_companies_is_active;
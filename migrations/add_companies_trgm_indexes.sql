@@ -0,0 +1,12 @@
+-- Migration: Add trigram GIN indexes for company search
+-- Date: 2026-10-16
+-- Description: CompanyRepository.search_by_name resuelve por índice tanto el prefijo sobre code
+--              (code ILIKE 'q%') como la búsqueda general (ILIKE '%q%' sobre name, legal_name y code)
+
+-- Extensión de trigramas (requiere permisos para crear extensiones)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- CONCURRENTLY: no bloquea escrituras mientras se construyen (no usar dentro de una transacción)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_companies_code_trgm ON companies USING GIN (code gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_companies_name_trgm ON companies USING GIN (name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_companies_legal_name_trgm ON companies USING GIN (legal_name gin_trgm_ops);
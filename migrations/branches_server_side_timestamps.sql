@@ -0,0 +1,7 @@
+-- Migration: Server-side defaults for branches timestamps
+-- Date: 2026-10-16
+-- Description: created_at/updated_at de branches se calculan en Postgres (UTC, sin zona horaria),
+--              igual que el valor que antes enviaba la aplicación con datetime.utcnow()
+
+ALTER TABLE branches ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE branches ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now());
@@ -0,0 +1,7 @@
+-- Migration: Server-side defaults for business_groups timestamps
+-- Date: 2026-10-16
+-- Description: created_at/updated_at de business_groups se calculan en Postgres (UTC, sin zona horaria),
+--              igual que el valor que antes enviaba la aplicación con datetime.utcnow()
+
+ALTER TABLE business_groups ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE business_groups ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now());